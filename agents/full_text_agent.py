@@ -3,25 +3,38 @@
 import os
 from pathlib import Path
 from agents.shared_enhanced_dqn import EnhancedDQNAgent
+from agents.inference_export import inference_path, has_fresh_export
 
 class FullTextAgent:
-    def __init__(self, state_dim=384, action_dim=2, model_dir="models"):
-        self.agent = EnhancedDQNAgent(state_dim, action_dim)
+    def __init__(self, state_dim=384, action_dim=2, model_dir="models", inference_only=False):
+        self.agent = EnhancedDQNAgent(state_dim, action_dim, inference_only=inference_only)
         self.model_path = Path(model_dir) / "full_text_agent.pth"
         self.load_model()
 
     def act(self, state, training=True):
         return self.agent.act(state, training)
 
+    def act_batch(self, states, training=False):
+        return self.agent.act_batch(states, training)
+
     def remember(self, state, action, reward, next_state, done):
         self.agent.remember(state, action, reward, next_state, done)
 
+    def remember_batch(self, states, actions, rewards, next_states, dones):
+        self.agent.remember_batch(states, actions, rewards, next_states, dones)
+
     def train(self):
         self.agent.replay()
 
     def save_model(self):
         self.agent.save_model(str(self.model_path))
 
+    def export_inference(self, quantize=True, states=None, min_agreement=0.98):
+        return self.agent.export_inference(inference_path(self.model_path), quantize, states, min_agreement)
+
     def load_model(self):
+        if self.agent.inference_only and has_fresh_export(self.model_path):
+            self.agent.load_inference(inference_path(self.model_path))
+            return
         if self.model_path.exists():
             self.agent.load_model(str(self.model_path))
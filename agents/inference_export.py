@@ -0,0 +1,106 @@
+# agents/inference_export.py
+
+import os
+import sys
+import argparse
+import numpy as np
+import torch
+from pathlib import Path
+from typing import Dict, Optional
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import get_logger
+
+logger = get_logger("inference_export")
+
+
+def inference_path(model_path) -> Path:
+    """Path of the exported inference artifact next to a training checkpoint."""
+    return Path(model_path).with_suffix(".inference.pt")
+
+
+def has_fresh_export(model_path) -> bool:
+    """True if an inference artifact exists and is not older than the training checkpoint."""
+    exported, model_path = inference_path(model_path), Path(model_path)
+    return exported.exists() and (not model_path.exists() or exported.stat().st_mtime >= model_path.stat().st_mtime)
+
+
+def script_q_network(q_network: torch.nn.Module, state_dim: int, quantize: bool = True) -> torch.jit.ScriptModule:
+    """
+    Trace a Q-network into a weights-only TorchScript module, optionally with its Linear
+    layers dynamically quantized to int8.
+    """
+    model = q_network.eval()
+    if quantize:
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    with torch.no_grad():
+        scripted = torch.jit.trace(model, torch.zeros(1, state_dim))
+    return torch.jit.freeze(scripted)
+
+
+def parity_check(reference: torch.nn.Module, exported: torch.nn.Module, states: np.ndarray) -> Dict[str, float]:
+    """Compare Q-values and greedy actions of an exported network against the eager one."""
+    states = torch.from_numpy(np.asarray(states, dtype=np.float32))
+    with torch.inference_mode():
+        expected = reference.eval()(states)
+        actual = exported(states)
+    return {
+        "max_abs_diff": float((expected - actual).abs().max()),
+        "action_agreement": float((expected.argmax(1) == actual.argmax(1)).float().mean()),
+    }
+
+
+def export_agent(agent, path, quantize: bool = True, states: Optional[np.ndarray] = None,
+                 min_agreement: float = 0.98) -> Dict[str, float]:
+    """
+    Export an EnhancedDQNAgent's Q-network for inference and verify it.
+    Args:
+        agent: EnhancedDQNAgent
+        path: Output file
+        quantize: Dynamically quantize Linear layers to int8
+        states: States for the parity check (defaults to 1024 random unit vectors)
+        min_agreement: Minimum fraction of states on which greedy actions must agree
+    Returns:
+        Parity report
+    Raises:
+        ValueError: If the exported network fails the parity check (nothing is written)
+    """
+    if states is None:
+        states = np.random.default_rng(0).standard_normal((1024, agent.state_dim)).astype(np.float32)
+        states /= np.linalg.norm(states, axis=1, keepdims=True)
+    exported = script_q_network(agent.q_network, agent.state_dim, quantize)
+    report = parity_check(agent.q_network, exported, states)
+    if report["action_agreement"] < min_agreement:
+        raise ValueError(f"Exported network agrees on {report['action_agreement']:.3f} of actions "
+                         f"(< {min_agreement}); max |dQ| = {report['max_abs_diff']:.4f}")
+    torch.jit.save(exported, str(path))
+    logger.info(f"Exported {'int8' if quantize else 'float32'} Q-network to {path}: "
+                f"agreement={report['action_agreement']:.3f}, max |dQ|={report['max_abs_diff']:.4f}")
+    return report
+
+
+def load_inference_network(path) -> torch.jit.ScriptModule:
+    return torch.jit.load(str(path), map_location="cpu").eval()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the agents' Q-networks for inference")
+    parser.add_argument("--model-dir", default=os.getenv("MODEL_DIR", "models"))
+    parser.add_argument("--no-quantize", action="store_true", help="Keep float32 weights")
+    parser.add_argument("--trajectory-dir", default=None, help="Use recorded states for the parity check")
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    args = parser.parse_args()
+
+    from agents.search_agent import SearchAgent
+    from agents.title_abstract_filter import TitleAbstractFilterAgent
+    from agents.full_text_agent import FullTextAgent
+    from agents.trajectory_log import iter_shards
+
+    for name, wrapper in (("search", SearchAgent(model_dir=args.model_dir)),
+                          ("title_abstract", TitleAbstractFilterAgent(model_dir=args.model_dir)),
+                          ("full_text", FullTextAgent(model_dir=args.model_dir))):
+        states = None
+        if args.trajectory_dir:
+            shards = [np.asarray(shard["states"][:1024]) for shard in iter_shards(args.trajectory_dir, name)]
+            states = np.concatenate(shards)[:4096] if shards else None
+        wrapper.export_inference(quantize=not args.no_quantize, states=states, min_agreement=args.min_agreement)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from typing import Dict, List, Sequence, Tuple
+
+# How a checklist item is scored when the checklist PDF does not provide it.
+#   constant          always if_true
+#   metadata          metadata[arg] is truthy
+#   metadata_set      metadata[arg] is not None
+#   metadata_all      every key in arg is truthy in metadata
+#   has_results       the results table has rows
+#   column_complete   results column arg has no missing values
+#   abstract_matches  any abstract matches regex arg (case-insensitive)
+Rule = namedtuple("Rule", ["item", "kind", "arg", "if_true", "if_false"])
+
+PRISMA_RULES = [
+    Rule("title_identifiable", "metadata", "query", 1.0, 0.0),
+    Rule("abstract_structured", "abstract_matches", "background|method|result", 0.8, 0.5),
+    Rule("protocol_registered", "constant", None, 0.5, 0.5),
+    Rule("eligibility_criteria", "metadata", "inclusion_criteria_clear", 1.0, 0.5),
+    Rule("information_sources", "metadata", "databases_searched", 1.0, 0.8),
+    Rule("search_strategy_documented", "metadata_set", "search_action", 1.0, 0.0),
+    Rule("study_selection_process", "column_complete", "Decision", 0.8, 0.5),
+    Rule("data_collection_process", "constant", None, 0.7, 0.7),
+    Rule("data_items_listed", "constant", None, 0.6, 0.6),
+    Rule("effect_measures", "constant", None, 0.5, 0.5),
+    Rule("synthesis_methods", "constant", None, 0.5, 0.5),
+    Rule("study_bias_assessment", "abstract_matches", "bias", 0.8, 0.5),
+    Rule("certainty_assessment", "abstract_matches", "confidence", 0.7, 0.5),
+    Rule("results_study_selection", "has_results", None, 1.0, 0.0),
+    Rule("results_study_characteristics", "column_complete", "Authors", 1.0, 0.5),
+    Rule("results_synthesis", "constant", None, 0.6, 0.6),
+    Rule("results_risk_of_bias", "constant", None, 0.5, 0.5),
+    Rule("results_certainty_of_evidence", "constant", None, 0.5, 0.5),
+    Rule("limitations_discussed", "constant", None, 0.7, 0.7),
+    Rule("funding_reported", "constant", None, 0.5, 0.5),
+    Rule("inclusion_criteria_clear", "metadata", "inclusion_criteria_clear", 1.0, 0.5),
+    Rule("exclusion_criteria_clear", "metadata", "exclusion_criteria_clear", 1.0, 0.5),
+    Rule("quality_assessment_performed", "column_complete", "Score", 0.8, 0.5),
+    Rule("results_synthesized", "constant", None, 0.6, 0.6),
+    Rule("search_date_reported", "metadata_all", ("from_year", "to_year"), 1.0, 0.0),
+    Rule("databases_searched", "constant", None, 1.0, 1.0),
+    Rule("grey_literature_included", "constant", None, 0.5, 0.5),
+    Rule("language_restrictions", "constant", None, 0.5, 0.5),
+    Rule("publication_restrictions", "constant", None, 0.5, 0.5),
+    Rule("data_availability_statement", "constant", None, 0.5, 0.5),
+    Rule("conflict_of_interest", "constant", None, 0.5, 0.5),
+    Rule("reviewer_agreement", "constant", None, 0.5, 0.5),
+    Rule("screening_process_described", "constant", None, 0.8, 0.8),
+    Rule("data_extraction_systematic", "constant", None, 0.7, 0.7),
+    Rule("study_flow_diagram", "constant", None, 0.5, 0.5),
+    Rule("sensitivity_analysis", "constant", None, 0.5, 0.5),
+    Rule("subgroup_analysis", "constant", None, 0.5, 0.5),
+    Rule("publication_bias_assessed", "constant", None, 0.5, 0.5),
+    Rule("certainty_assessment_method", "constant", None, 0.5, 0.5),
+    Rule("synthesis_exploration", "constant", None, 0.5, 0.5),
+    Rule("additional_analyses", "constant", None, 0.5, 0.5),
+]
+
+
+def _required_columns(rules: Sequence[Rule]) -> List[str]:
+    columns = {rule.arg for rule in rules if rule.kind == "column_complete"}
+    if any(rule.kind == "abstract_matches" for rule in rules):
+        columns.add("Abstract")
+    return sorted(columns)
+
+
+def _is_text(column: pd.Series) -> bool:
+    # The if-chain these rules replaced could not score a review whose abstracts are not a
+    # string column, e.g. the float columns of an empty table; such reviews still score 0.0
+    return pd.api.types.is_string_dtype(column.dtype)
+
+
+def score_rules(reviews: Sequence[Tuple[Dict, pd.DataFrame]], rules: Sequence[Rule] = PRISMA_RULES) -> np.ndarray:
+    """
+    Evaluate rules for many reviews at once. The results tables are concatenated so each
+    distinct abstract pattern is scanned once over all rows, and per-review flags are
+    reduced with bincount.
+    Args:
+        reviews: (metadata, results_df) pairs
+        rules: Rules to evaluate
+    Returns:
+        Float matrix (len(reviews), len(rules)); rows of reviews whose results table lacks
+        a column the rules need, or whose abstracts are not a string column, are NaN
+        (missing abstracts within a string column count as empty text)
+    """
+    n = len(reviews)
+    scores = np.full((n, len(rules)), np.nan)
+    columns = _required_columns(rules)
+    valid = np.array([all(column in df.columns for column in columns)
+                      and ("Abstract" not in columns or _is_text(df["Abstract"])) for _, df in reviews], dtype=bool)
+    frames = [df for (_, df), ok in zip(reviews, valid) if ok]
+    review_ids = np.repeat(np.flatnonzero(valid), [len(df) for df in frames])
+    # Column-wise concatenation avoids building (and aligning) a DataFrame per review
+    table = {
+        column: pd.Series(np.concatenate([df[column].to_numpy(dtype=object) for df in frames]) if frames else [],
+                          dtype=object)
+        for column in columns
+    }
+
+    def any_row(mask) -> np.ndarray:
+        return np.bincount(review_ids[np.asarray(mask, dtype=bool)], minlength=n) > 0
+
+    abstract_hits = {}
+    if "Abstract" in columns:
+        abstracts = table["Abstract"].fillna("").astype(str)
+        for pattern in {rule.arg for rule in rules if rule.kind == "abstract_matches"}:
+            abstract_hits[pattern] = any_row(abstracts.str.contains(pattern, case=False, regex=True))
+    missing = {column: any_row(table[column].isnull()) for column in columns if column != "Abstract"}
+    has_rows = np.array([not df.empty for _, df in reviews], dtype=bool)
+
+    for j, rule in enumerate(rules):
+        if rule.kind == "constant":
+            passed = np.ones(n, dtype=bool)
+        elif rule.kind == "metadata":
+            passed = np.array([bool(metadata.get(rule.arg)) for metadata, _ in reviews], dtype=bool)
+        elif rule.kind == "metadata_set":
+            passed = np.array([metadata.get(rule.arg) is not None for metadata, _ in reviews], dtype=bool)
+        elif rule.kind == "metadata_all":
+            passed = np.array([all(metadata.get(key) for key in rule.arg) for metadata, _ in reviews], dtype=bool)
+        elif rule.kind == "has_results":
+            passed = has_rows
+        elif rule.kind == "column_complete":
+            passed = ~missing[rule.arg]
+        elif rule.kind == "abstract_matches":
+            passed = abstract_hits[rule.arg]
+        else:
+            raise ValueError(f"Unknown rule kind '{rule.kind}' for {rule.item}")
+        scores[valid, j] = np.where(passed, rule.if_true, rule.if_false)[valid]
+    return scores
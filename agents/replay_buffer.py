@@ -0,0 +1,156 @@
+# agents/replay_buffer.py
+
+import numpy as np
+from collections import namedtuple
+
+ReplayBatch = namedtuple("ReplayBatch", ["indices", "states", "actions", "rewards", "next_states", "dones", "weights"])
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer backed by preallocated arrays. Inserts are O(1) and
+    sampling draws a vector of indices. Terminal transitions do not store next_state
+    (its Q-value is masked out), so the next_states array is only allocated once a
+    non-terminal transition arrives.
+    """
+    def __init__(self, capacity, state_dim, state_dtype=np.float32, seed=None):
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.state_dtype = np.dtype(state_dtype)
+        self.states = np.zeros((capacity, state_dim), dtype=self.state_dtype)
+        self.next_states = None
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.pos = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        idx = self.pos
+        self.states[idx] = state
+        self.actions[idx] = action
+        self.rewards[idx] = reward
+        self.dones[idx] = done
+        if not done:
+            if self.next_states is None:
+                self.next_states = np.zeros_like(self.states)
+            self.next_states[idx] = next_state
+        self.pos = (self.pos + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return idx
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Insert many transitions with array writes."""
+        n = len(actions)
+        if n > self.capacity:
+            states, actions, rewards = states[-self.capacity:], actions[-self.capacity:], rewards[-self.capacity:]
+            next_states, dones = next_states[-self.capacity:], dones[-self.capacity:]
+            n = self.capacity
+        idx = (self.pos + np.arange(n)) % self.capacity
+        dones = np.asarray(dones, dtype=bool)
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.dones[idx] = dones
+        if not dones.all():
+            if self.next_states is None:
+                self.next_states = np.zeros_like(self.states)
+            self.next_states[idx[~dones]] = np.asarray(next_states)[~dones]
+        self.pos = int((self.pos + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+        return idx
+
+    def sample(self, batch_size):
+        indices = self.rng.integers(0, self.size, size=batch_size)
+        return self._gather(indices, np.ones(batch_size, dtype=np.float32))
+
+    def _gather(self, indices, weights):
+        states = self.states[indices]
+        next_states = states if self.next_states is None else self.next_states[indices]
+        return ReplayBatch(indices, states, self.actions[indices], self.rewards[indices],
+                           next_states, self.dones[indices], weights)
+
+    def update_priorities(self, indices, td_errors):
+        pass
+
+
+class SumTree:
+    """Binary tree of priorities whose internal nodes hold the sum of their children."""
+    def __init__(self, capacity):
+        self.leaves = 1
+        while self.leaves < capacity:
+            self.leaves *= 2
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def get(self, indices):
+        return self.tree[self.leaves + np.asarray(indices)]
+
+    def update(self, indices, priorities):
+        nodes = self.leaves + np.asarray(indices)
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        """Leaf index for each prefix-sum value, descending all values level by level."""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while nodes[0] < self.leaves:
+            left = self.tree[2 * nodes]
+            go_right = values > left
+            values -= left * go_right
+            nodes = 2 * nodes + go_right
+        return nodes - self.leaves
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Proportional prioritized replay (Schaul et al., 2016). New transitions get the current
+    maximum priority; sampling is stratified over a sum tree and returns importance weights.
+    """
+    def __init__(self, capacity, state_dim, state_dtype=np.float32, alpha=0.6, beta=0.4,
+                 beta_increment=1e-4, epsilon=1e-6, seed=None):
+        super().__init__(capacity, state_dim, state_dtype, seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def add(self, state, action, reward, next_state, done):
+        idx = super().add(state, action, reward, next_state, done)
+        self.tree.update([idx], [self.max_priority])
+        return idx
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        idx = super().add_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(idx, np.full(len(idx), self.max_priority))
+        return idx
+
+    def sample(self, batch_size):
+        total = self.tree.total
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+        probs = self.tree.get(indices) / total
+        weights = (self.size * np.maximum(probs, 1e-12)) ** (-self.beta)
+        weights = (weights / weights.max()).astype(np.float32)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return self._gather(indices, weights)
+
+    def update_priorities(self, indices, td_errors):
+        priorities = (np.abs(td_errors) + self.epsilon) ** self.alpha
+        self.tree.update(indices, priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
@@ -0,0 +1,275 @@
+import time
+import queue
+import threading
+import numpy as np
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional
+from utils.arxiv_interface import search_arxiv
+from utils.full_text_parser import parse_arxiv_pdfs
+from utils.pdf_fetcher import PDF_MAX_CONCURRENCY
+from utils.logger import get_logger
+
+logger = get_logger("review_pipeline")
+
+# metadata: PRISMA metadata of the review; papers: papers of the (modified) search;
+# results: result rows keyed by paper entry_id, in search order; stage_seconds: busy time per stage
+ReviewResult = namedtuple("ReviewResult", ["metadata", "papers", "results", "stage_seconds"])
+
+_DONE = object()
+
+
+def modify_query(topic: str, action: int) -> str:
+    """Map SearchAgent actions to query modifications."""
+    if action == 0:
+        return topic
+    elif action == 1:
+        return f"{topic} machine learning"
+    elif action == 2:
+        terms = topic.split()
+        return " ".join(terms[:2]) if len(terms) > 2 else topic
+    elif action == 3:
+        return f"{topic} reinforcement learning" if "reinforcement" not in topic.lower() else topic
+    elif action == 4:
+        return f"{topic} artificial intelligence"
+    return topic
+
+
+class ReviewPipeline:
+    """
+    Runs one review as four stages connected by bounded queues:
+
+        search -> title/abstract screening -> PDF fetch/parse -> full-text screening
+
+    Abstracts are screened in batches as soon as they are queued, PDFs of Maybe/Include
+    papers download while later abstracts are still being screened, and parsed full texts
+    are embedded and screened in micro-batches. End-to-end latency is therefore close to
+    that of the slowest stage rather than the sum of all stages. The agents, checker and
+    embedder are only read, so one pipeline can be shared by several threads.
+    """
+    def __init__(self, search_agent, abstract_agent, fulltext_agent, prisma_checker, reward_system,
+                 recorder=None, max_results: int = 30, screen_batch_size: int = 16,
+                 fetch_workers: int = PDF_MAX_CONCURRENCY, queue_size: int = 32):
+        self.search_agent = search_agent
+        self.abstract_agent = abstract_agent
+        self.fulltext_agent = fulltext_agent
+        self.prisma_checker = prisma_checker
+        self.reward_system = reward_system
+        self.recorder = recorder
+        self.max_results = max_results
+        self.screen_batch_size = screen_batch_size
+        self.fetch_workers = max(1, fetch_workers)
+        self.queue_size = queue_size
+
+    def run(self, topic: str, from_year: int, to_year: int,
+            on_result: Optional[Callable[[Dict], None]] = None,
+            on_search: Optional[Callable[[List, str], None]] = None) -> ReviewResult:
+        """
+        Review a topic.
+        Args:
+            topic: Research topic
+            from_year: First publication year
+            to_year: Last publication year
+            on_result: Called with each result row as soon as its decision is final; runs on
+                pipeline threads, so it must be thread-safe
+            on_search: Called with the papers to screen and the modified query once the
+                search stage is done
+        Returns:
+            ReviewResult; results is empty if the search found no papers
+        """
+        prisma_data = self.prisma_checker.checklist_data
+        abstract_queue = queue.Queue(maxsize=self.queue_size)
+        fetch_queue = queue.Queue(maxsize=self.queue_size)
+        parsed_queue = queue.Queue(maxsize=self.queue_size)
+        rows = {}
+        kept = {}  # entry_id -> (paper, abstract action, abstract reward) awaiting full-text screening
+        rows_lock = threading.Lock()
+        stage_seconds = {"search": 0.0, "title_abstract": 0.0, "fetch": 0.0, "full_text": 0.0}
+        search = {"papers": [], "query": topic, "action": None}
+
+        def finish(entry_id, row):
+            with rows_lock:
+                rows[entry_id] = row
+            if on_result:
+                on_result(row)
+
+        def search_stage():
+            start = time.perf_counter()
+            try:
+                query_embedding = self.reward_system.embed_text(topic)
+                papers = search_arxiv(topic, from_year, to_year, max_results=self.max_results)
+                if not papers:
+                    logger.error(f"No papers found for '{topic}'")
+                    return
+                logger.info(f"Retrieved {len(papers)} papers")
+                search_state = np.concatenate([query_embedding, [len(papers), 0.0]])
+                search_action = self.search_agent.act(search_state, training=False)
+                modified_query = modify_query(topic, search_action)
+                search_reward = self.prisma_checker.evaluate_search_reward(papers, query_embedding, prisma_data)
+                logger.info(f"Search action {search_action}: Query='{modified_query}', Reward={search_reward:.3f}")
+                if self.recorder:
+                    self.recorder.record("search", search_state, search_action, search_reward, search_state, True, {"query": topic})
+                if modified_query != topic:
+                    papers = search_arxiv(modified_query, from_year, to_year, max_results=self.max_results)
+                    logger.info(f"Retrieved {len(papers)} papers with modified query")
+                search.update(papers=papers, query=modified_query, action=search_action)
+                if on_search:
+                    on_search(papers, modified_query)
+            except Exception as e:
+                logger.error(f"Search failed: {e}")
+            finally:
+                stage_seconds["search"] += time.perf_counter() - start
+                papers = search["papers"]
+                for i in range(0, len(papers), self.screen_batch_size):
+                    abstract_queue.put(papers[i:i + self.screen_batch_size])
+                abstract_queue.put(_DONE)
+
+        def abstract_stage():
+            try:
+                while True:
+                    batch = abstract_queue.get()
+                    if batch is _DONE:
+                        return
+                    start = time.perf_counter()
+                    try:
+                        self._screen_abstracts(batch, search["query"], prisma_data, kept, rows_lock, fetch_queue, finish)
+                    except Exception as e:
+                        logger.error(f"Abstract evaluation failed: {e}")
+                    stage_seconds["title_abstract"] += time.perf_counter() - start
+            finally:
+                fetch_queue.put(_DONE)
+
+        def fetch_stage():
+            # One parse_arxiv_pdfs call serves the whole review: it pulls entry ids from the
+            # fetch queue as they arrive and keeps fetch_workers downloads in flight
+            fetching = {}
+            state = {"done": False, "busy_since": None}
+
+            def entry_ids():
+                while True:
+                    paper = fetch_queue.get()
+                    if paper is _DONE:
+                        state["done"] = True
+                        return
+                    with rows_lock:
+                        if not fetching:
+                            state["busy_since"] = time.perf_counter()
+                        fetching[paper.entry_id] = paper
+                    yield paper.entry_id
+
+            try:
+                for entry_id, full_text in parse_arxiv_pdfs(entry_ids(), max_concurrency=self.fetch_workers):
+                    with rows_lock:
+                        paper = fetching.pop(entry_id)
+                        if not fetching:
+                            stage_seconds["fetch"] += time.perf_counter() - state["busy_since"]
+                    parsed_queue.put((paper, full_text or paper.summary))
+            except Exception as e:
+                logger.error(f"Full-text fetch failed: {e}")
+            finally:
+                # Unblock the abstract stage if fetching stopped early; unfetched papers keep their abstract decision
+                # (the id feeder may still be reading too, so poll rather than block)
+                while not state["done"]:
+                    try:
+                        state["done"] = fetch_queue.get(timeout=0.1) is _DONE or state["done"]
+                    except queue.Empty:
+                        pass
+                parsed_queue.put(_DONE)
+
+        def fulltext_stage():
+            done = False
+            while not done:
+                batch = []
+                # Block for one item, then take whatever else is ready as a micro-batch
+                item = parsed_queue.get()
+                while True:
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.screen_batch_size:
+                        break
+                    try:
+                        item = parsed_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if not batch:
+                    continue
+                start = time.perf_counter()
+                try:
+                    self._screen_full_texts(batch, search["query"], prisma_data, kept, rows_lock, finish)
+                except Exception as e:
+                    logger.error(f"Full-text evaluation failed: {e}")
+                stage_seconds["full_text"] += time.perf_counter() - start
+
+        threads = [threading.Thread(target=search_stage, name="review-search", daemon=True),
+                   threading.Thread(target=abstract_stage, name="review-abstract", daemon=True),
+                   threading.Thread(target=fetch_stage, name="review-fetch", daemon=True),
+                   threading.Thread(target=fulltext_stage, name="review-fulltext", daemon=True)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Papers whose full text could not be screened keep their abstract decision
+        for entry_id, (paper, action, reward) in list(kept.items()):
+            finish(entry_id, self._row(paper, "title_abstract", "Include" if action == 2 else "Maybe", reward))
+        if self.recorder:
+            self.recorder.flush()
+
+        papers = search["papers"]
+        metadata = {
+            "query": search["query"],
+            "modified_query": search["query"],
+            "from_year": from_year,
+            "to_year": to_year,
+            "search_action": search["action"],
+            "inclusion_criteria_clear": 1.0,
+            "exclusion_criteria_clear": 1.0
+        }
+        results = {paper.entry_id: rows[paper.entry_id] for paper in papers if paper.entry_id in rows}
+        return ReviewResult(metadata, papers, results, stage_seconds)
+
+    def _screen_abstracts(self, papers, query, prisma_data, kept, rows_lock, fetch_queue, finish):
+        abstracts = [paper.summary for paper in papers]
+        abstract_embeds = self.reward_system.embed_many(abstracts)
+        abstract_actions, _ = self.abstract_agent.act_batch(abstract_embeds, training=False)
+        abstract_rewards = self.prisma_checker.evaluate_abstract_rewards(abstracts, abstract_actions, prisma_data=prisma_data)
+        for i, (paper, action, reward) in enumerate(zip(papers, abstract_actions.tolist(), abstract_rewards.tolist())):
+            if self.recorder:
+                self.recorder.record("title_abstract", abstract_embeds[i], action, reward, abstract_embeds[i],
+                                     True, {"query": query, "entry_id": paper.entry_id})
+            if action in [1, 2]:  # Maybe or Include
+                with rows_lock:
+                    kept[paper.entry_id] = (paper, action, reward)
+                fetch_queue.put(paper)
+            else:
+                finish(paper.entry_id, self._row(paper, "title_abstract", "Exclude", reward))
+
+    def _screen_full_texts(self, batch, query, prisma_data, kept, rows_lock, finish):
+        papers = [paper for paper, _ in batch]
+        full_texts = [full_text for _, full_text in batch]
+        embeds = self.reward_system.embed_many(full_texts)
+        actions, _ = self.fulltext_agent.act_batch(embeds, training=False)
+        citation_counts = [getattr(paper, "citation_count", 0) for paper in papers]
+        rewards = self.prisma_checker.evaluate_fulltext_rewards(full_texts, actions, None, citation_counts, prisma_data)
+        for i, (paper, action, reward) in enumerate(zip(papers, actions.tolist(), rewards.tolist())):
+            if self.recorder:
+                self.recorder.record("full_text", embeds[i], action, reward, embeds[i],
+                                     True, {"query": query, "entry_id": paper.entry_id})
+            with rows_lock:
+                _, _, abstract_reward = kept.pop(paper.entry_id)
+            finish(paper.entry_id, self._row(paper, "full_text", "Include" if action == 1 else "Exclude",
+                                             (abstract_reward + reward) / 2))
+
+    @staticmethod
+    def _row(paper, stage: str, decision: str, score: float) -> Dict:
+        return {
+            "Title": paper.title,
+            "Year": paper.published.year,
+            "URL": paper.entry_id,
+            "Stage": stage,
+            "Decision": decision,
+            "Score": round(float(score), 3),
+            "Authors": ", ".join([a.name for a in paper.authors]),
+            "Abstract": paper.summary
+        }
@@ -2,20 +2,26 @@
 
 import torch
 import numpy as np
-import random
-from collections import deque
+from agents.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
 
 class EnhancedDQNAgent:
-    def __init__(self, state_dim, action_dim, lr=1e-3):
+    def __init__(self, state_dim, action_dim, lr=1e-3, memory_size=10000,
+                 prioritized_replay=False, state_dtype=np.float32, inference_only=False):
         self.state_dim = state_dim
         self.action_dim = action_dim
         self.lr = lr
-
-        self.q_network = self.build_network()
-        self.target_network = self.build_network()
-        self.optimizer = torch.optim.Adam(self.q_network.parameters(), lr=lr)
-
-        self.memory = deque(maxlen=10000)
+        self.inference_only = inference_only
+
+        # Networks stay in eval mode (no dropout) except during the replay update
+        self.q_network = self.build_network().eval()
+        if inference_only:
+            # Acting only needs the Q-network
+            self.target_network = self.optimizer = self.memory = None
+        else:
+            self.target_network = self.build_network().eval()
+            self.optimizer = torch.optim.Adam(self.q_network.parameters(), lr=lr)
+            buffer_cls = PrioritizedReplayBuffer if prioritized_replay else ReplayBuffer
+            self.memory = buffer_cls(memory_size, state_dim, state_dtype=state_dtype)
         self.batch_size = 64
         self.gamma = 0.99
         self.epsilon = 1.0
@@ -40,37 +46,60 @@ class EnhancedDQNAgent:
     def act(self, state, training=True):
         if training and np.random.rand() < self.epsilon:
             return np.random.randint(self.action_dim)
-        state_tensor = torch.FloatTensor(state).unsqueeze(0)
-        with torch.no_grad():
-            q_values = self.q_network(state_tensor)
-        return torch.argmax(q_values).item()
+        actions, _ = self.act_batch(np.asarray(state)[None, :], training=False)
+        return int(actions[0])
+
+    def act_batch(self, states, training=False):
+        """
+        Choose actions for a batch of states with one forward pass.
+        Args:
+            states: Array of shape (n, state_dim)
+            training: Apply epsilon-greedy exploration per row
+        Returns:
+            (actions, q_values): int64 array of shape (n,) and float32 array of shape (n, action_dim)
+        """
+        states = np.asarray(states, dtype=np.float32).reshape(-1, self.state_dim)
+        with torch.inference_mode():
+            q_values = self.q_network(torch.from_numpy(states)).numpy()
+        actions = q_values.argmax(axis=1)
+        if training:
+            explore = np.random.rand(len(actions)) < self.epsilon
+            actions[explore] = np.random.randint(self.action_dim, size=int(explore.sum()))
+        return actions, q_values
 
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.add(state, action, reward, next_state, done)
+
+    def remember_batch(self, states, actions, rewards, next_states, dones):
+        self.memory.add_batch(states, actions, rewards, next_states, dones)
 
     def replay(self):
         if len(self.memory) < self.batch_size:
             return
-        batch = random.sample(self.memory, self.batch_size)
-        states, actions, rewards, next_states, dones = zip(*batch)
+        batch = self.memory.sample(self.batch_size)
 
-        states = torch.FloatTensor(states)
-        actions = torch.LongTensor(actions)
-        rewards = torch.FloatTensor(rewards)
-        next_states = torch.FloatTensor(next_states)
-        dones = torch.BoolTensor(dones)
+        states = torch.from_numpy(batch.states.astype(np.float32, copy=False))
+        actions = torch.from_numpy(batch.actions)
+        rewards = torch.from_numpy(batch.rewards)
+        next_states = torch.from_numpy(batch.next_states.astype(np.float32, copy=False))
+        dones = torch.from_numpy(batch.dones)
+        weights = torch.from_numpy(batch.weights)
 
-        q_values = self.q_network(states).gather(1, actions.unsqueeze(1)).squeeze()
+        self.q_network.train()
+        q_values = self.q_network(states).gather(1, actions.unsqueeze(1)).squeeze(1)
         with torch.no_grad():
             next_q_values = self.target_network(next_states).max(1)[0]
             target_q_values = rewards + self.gamma * next_q_values * (~dones)
 
-        loss = torch.nn.functional.mse_loss(q_values, target_q_values)
+        td_errors = q_values - target_q_values
+        loss = (weights * td_errors.pow(2)).mean()
+        self.memory.update_priorities(batch.indices, td_errors.detach().numpy())
 
         self.optimizer.zero_grad()
         loss.backward()
         torch.nn.utils.clip_grad_norm_(self.q_network.parameters(), 1.0)
         self.optimizer.step()
+        self.q_network.eval()
 
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
@@ -94,7 +123,21 @@ class EnhancedDQNAgent:
     def load_model(self, path):
         checkpoint = torch.load(path, map_location='cpu')
         self.q_network.load_state_dict(checkpoint['q_network'])
+        if self.inference_only:
+            self.epsilon = checkpoint['epsilon']
+            return
         self.target_network.load_state_dict(checkpoint['target_network'])
         self.optimizer.load_state_dict(checkpoint['optimizer'])
         self.epsilon = checkpoint['epsilon']
         self.training_step = checkpoint['training_step']
+
+    def export_inference(self, path, quantize=True, states=None, min_agreement=0.98):
+        """Write a weights-only TorchScript Q-network (int8 if quantize) after a parity check."""
+        from agents.inference_export import export_agent
+        return export_agent(self, path, quantize, states, min_agreement)
+
+    def load_inference(self, path):
+        """Act with an exported Q-network; the agent can no longer be trained."""
+        from agents.inference_export import load_inference_network
+        self.q_network = load_inference_network(path)
+        self.inference_only = True
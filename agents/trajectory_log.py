@@ -0,0 +1,139 @@
+# agents/trajectory_log.py
+
+import os
+import json
+import time
+import threading
+import numpy as np
+from typing import Dict, Iterator, List, Optional
+from utils.logger import get_logger
+
+logger = get_logger("trajectory_log")
+
+TRAJECTORY_DIR = os.getenv("TRAJECTORY_DIR")  # recording is off unless set
+COLUMNS = ("states", "actions", "rewards", "next_states", "dones")
+
+
+class TrajectoryRecorder:
+    """
+    Appends (state, action, reward, next_state, done, metadata) transitions to a columnar
+    on-disk log. Each agent has its own directory of shards; a shard is a directory of .npy
+    columns plus a metadata.jsonl file, so shards can be memory-mapped when loaded.
+
+        log_dir/<agent>/<shard>/{states,actions,rewards,next_states,dones}.npy, metadata.jsonl
+
+    Shard names include the process id, so several processes may record into one log.
+    """
+    def __init__(self, log_dir: str, shard_size: int = 4096):
+        self.log_dir = log_dir
+        self.shard_size = shard_size
+        self._pending: Dict[str, Dict[str, list]] = {}
+        self._shard_count = 0
+        self._lock = threading.Lock()
+
+    def record(self, agent: str, state, action: int, reward: float, next_state, done: bool,
+               metadata: Optional[Dict] = None):
+        with self._lock:
+            pending = self._pending.setdefault(agent, {name: [] for name in COLUMNS + ("metadata",)})
+            pending["states"].append(np.asarray(state, dtype=np.float32))
+            pending["actions"].append(int(action))
+            pending["rewards"].append(float(reward))
+            pending["next_states"].append(np.asarray(next_state, dtype=np.float32))
+            pending["dones"].append(bool(done))
+            pending["metadata"].append(metadata or {})
+            if len(pending["actions"]) >= self.shard_size:
+                self._write_shard(agent)
+
+    def record_batch(self, agent: str, states, actions, rewards, next_states, dones,
+                     metadata: Optional[List[Dict]] = None):
+        metadata = metadata or [None] * len(actions)
+        for row in zip(states, actions, rewards, next_states, dones, metadata):
+            self.record(agent, *row)
+
+    def flush(self):
+        with self._lock:
+            for agent in list(self._pending):
+                self._write_shard(agent)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_shard(self, agent: str):
+        pending = self._pending.pop(agent, None)
+        if not pending or not pending["actions"]:
+            return
+        shard_dir = os.path.join(self.log_dir, agent,
+                                 f"{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{self._shard_count:05d}")
+        tmp_dir = shard_dir + ".tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        np.save(os.path.join(tmp_dir, "states.npy"), np.stack(pending["states"]))
+        np.save(os.path.join(tmp_dir, "next_states.npy"), np.stack(pending["next_states"]))
+        np.save(os.path.join(tmp_dir, "actions.npy"), np.array(pending["actions"], dtype=np.int64))
+        np.save(os.path.join(tmp_dir, "rewards.npy"), np.array(pending["rewards"], dtype=np.float32))
+        np.save(os.path.join(tmp_dir, "dones.npy"), np.array(pending["dones"], dtype=bool))
+        with open(os.path.join(tmp_dir, "metadata.jsonl"), "w", encoding="utf-8") as f:
+            for item in pending["metadata"]:
+                f.write(json.dumps(item, default=str) + "\n")
+        # Readers only see complete shards
+        os.replace(tmp_dir, shard_dir)
+        self._shard_count += 1
+        logger.info(f"Wrote {len(pending['actions'])} {agent} transitions to {shard_dir}")
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_trajectory_recorder() -> Optional[TrajectoryRecorder]:
+    """Process-wide recorder writing to TRAJECTORY_DIR, or None when recording is disabled."""
+    global _recorder
+    if not TRAJECTORY_DIR:
+        return None
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = TrajectoryRecorder(TRAJECTORY_DIR)
+        return _recorder
+
+
+def list_shards(log_dir: str, agent: str) -> List[str]:
+    agent_dir = os.path.join(log_dir, agent)
+    if not os.path.isdir(agent_dir):
+        return []
+    return [os.path.join(agent_dir, name) for name in sorted(os.listdir(agent_dir)) if not name.endswith(".tmp")]
+
+
+def iter_shards(log_dir: str, agent: str) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield each shard of an agent's log as a dict of memory-mapped column arrays."""
+    for shard_dir in list_shards(log_dir, agent):
+        yield {name: np.load(os.path.join(shard_dir, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+
+
+def load_shard_metadata(shard_dir: str) -> List[Dict]:
+    with open(os.path.join(shard_dir, "metadata.jsonl"), "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def load_into_buffer(buffer, log_dir: str, agent: str, chunk_size: int = 65536) -> int:
+    """
+    Copy an agent's recorded transitions into a replay buffer, reading the memory-mapped
+    shards chunk by chunk. When the log is larger than the buffer, the newest transitions win.
+    Returns:
+        Number of transitions loaded
+    """
+    loaded = 0
+    for shard in iter_shards(log_dir, agent):
+        if shard["states"].shape[1] != buffer.state_dim:
+            logger.warning(f"Skipping {agent} shard with state dim {shard['states'].shape[1]} (expected {buffer.state_dim})")
+            continue
+        for start in range(0, len(shard["actions"]), chunk_size):
+            chunk = {name: shard[name][start:start + chunk_size] for name in COLUMNS}
+            buffer.add_batch(chunk["states"], chunk["actions"], chunk["rewards"], chunk["next_states"], chunk["dones"])
+            loaded += len(chunk["actions"])
+    logger.info(f"Loaded {loaded} {agent} transitions from {log_dir}")
+    return loaded
@@ -0,0 +1,207 @@
+import os
+import sys
+import csv
+import json
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from utils.logger import get_logger
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from main import MODEL_DIR, CHECKLIST_PATH, MAX_RESULTS
+
+logger = get_logger("batch_review")
+
+RESULT_COLUMNS = ["Topic", "FromYear", "ToYear", "Title", "Year", "URL", "Stage", "Decision", "Score", "Authors", "Abstract"]
+
+
+def load_topics(path: str, default_from_year: int = 2000, default_to_year: int = 2025) -> List[Dict]:
+    """
+    Read review topics from a CSV file (columns topic, from_year, to_year; years optional)
+    or a JSON-lines file with the same keys.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".json")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    topics = []
+    for row in rows:
+        topic = (row.get("topic") or "").strip()
+        if not topic:
+            continue
+        topics.append({
+            "topic": topic,
+            "from_year": int(row.get("from_year") or default_from_year),
+            "to_year": int(row.get("to_year") or default_to_year),
+        })
+    return topics
+
+
+def topic_key(topic: Dict) -> str:
+    return f"{topic['topic']}|{topic['from_year']}|{topic['to_year']}"
+
+
+class ReviewResources:
+    """Agents, checker and embedder shared read-only by all review threads."""
+    def __init__(self, model_dir: str = MODEL_DIR, checklist_path: str = CHECKLIST_PATH, max_results: int = MAX_RESULTS):
+        from agents.search_agent import SearchAgent
+        from agents.title_abstract_filter import TitleAbstractFilterAgent
+        from agents.full_text_agent import FullTextAgent
+        from agents.prisma_checker import PRISMAChecker
+        from agents.review_pipeline import ReviewPipeline
+        from rewards.enhanced_reward_system import EnhancedRewardSystem
+        self.search_agent = SearchAgent(state_dim=386, model_dir=model_dir, inference_only=True)
+        self.abstract_agent = TitleAbstractFilterAgent(model_dir=model_dir, inference_only=True)
+        self.fulltext_agent = FullTextAgent(model_dir=model_dir, inference_only=True)
+        self.prisma_checker = PRISMAChecker(checklist_pdf_path=checklist_path)
+        self.reward_system = EnhancedRewardSystem()
+        self.pipeline = ReviewPipeline(self.search_agent, self.abstract_agent, self.fulltext_agent,
+                                       self.prisma_checker, self.reward_system, max_results=max_results)
+
+
+def review_topic(topic: Dict, resources: ReviewResources, emit: Callable[[Dict], None]) -> Dict:
+    """
+    Review one topic with the shared pipeline. Each paper's row is passed to emit as soon
+    as its decision is final: excluded abstracts right after screening, Maybe/Include
+    papers after their full-text decision.
+    Returns:
+        Topic summary with the number of papers and the PRISMA score
+    """
+    import pandas as pd
+
+    subject, from_year, to_year = topic["topic"], topic["from_year"], topic["to_year"]
+    metadata, papers, results, _ = resources.pipeline.run(
+        subject, from_year, to_year, on_result=lambda row: emit({"Topic": subject, "FromYear": from_year, "ToYear": to_year, **row}))
+    if not papers:
+        logger.warning(f"No papers found for topic '{subject}'")
+        return {**topic, "query": metadata["query"], "papers": 0, "prisma_score": 0.0}
+    prisma_score = resources.prisma_checker.evaluate_prisma_score(papers, metadata, pd.DataFrame(list(results.values())))
+    return {**topic, "query": metadata["query"], "papers": len(results), "prisma_score": round(float(prisma_score), 4)}
+
+
+class ResultWriter:
+    """
+    Thread-safe streaming output with resume support. CSV output is appended and flushed
+    one row at a time. Parquet output is a directory with one file per finished topic,
+    since Parquet files cannot be appended to. Finished topics are listed, with their
+    modified query and PRISMA score, in a '<output>.done.jsonl' sidecar.
+    """
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.parquet = output_path.endswith(".parquet")
+        self.done_path = output_path.rstrip("/") + ".done.jsonl"
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[Dict]] = {}
+        self.done = set()
+        if os.path.exists(self.done_path):
+            with open(self.done_path, "r", encoding="utf-8") as f:
+                self.done = {json.loads(line)["key"] for line in f if line.strip()}
+        if self.parquet:
+            os.makedirs(output_path, exist_ok=True)
+            self._file = None
+        else:
+            self._drop_unfinished_rows()
+            new_file = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+            self._file = open(output_path, "a", newline="", encoding="utf-8")
+            self._csv = csv.DictWriter(self._file, fieldnames=RESULT_COLUMNS)
+            if new_file:
+                self._csv.writeheader()
+                self._file.flush()
+
+    def _drop_unfinished_rows(self):
+        """Remove rows of topics an interrupted run did not finish, so they are not duplicated."""
+        if not os.path.exists(self.output_path):
+            return
+        with open(self.output_path, "r", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        finished = [r for r in rows if topic_key({"topic": r["Topic"], "from_year": r["FromYear"], "to_year": r["ToYear"]}) in self.done]
+        if len(finished) == len(rows):
+            return
+        logger.info(f"Dropping {len(rows) - len(finished)} rows of unfinished topics from {self.output_path}")
+        tmp_path = self.output_path + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(finished)
+        os.replace(tmp_path, self.output_path)
+
+    def write(self, key: str, row: Dict):
+        with self._lock:
+            if self.parquet:
+                self._pending.setdefault(key, []).append(row)
+            else:
+                self._csv.writerow(row)
+                self._file.flush()
+
+    def finish_topic(self, key: str, summary: Dict):
+        with self._lock:
+            rows = self._pending.pop(key, [])
+            if self.parquet and rows:
+                import pandas as pd
+                name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+                pd.DataFrame(rows, columns=RESULT_COLUMNS).to_parquet(os.path.join(self.output_path, f"{name}.parquet"), index=False)
+            with open(self.done_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, **summary}) + "\n")
+            self.done.add(key)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def run_batch(topics: List[Dict], output_path: str, workers: int = 4, max_results: int = MAX_RESULTS,
+              resources: Optional[ReviewResources] = None) -> List[Dict]:
+    """
+    Review many topics concurrently, streaming results to output_path. Topics already listed
+    in the output's .done.jsonl sidecar are skipped, so an interrupted run can be resumed.
+    Returns:
+        Summaries of the topics reviewed in this run
+    """
+    writer = ResultWriter(output_path)
+    todo = [topic for topic in topics if topic_key(topic) not in writer.done]
+    logger.info(f"{len(topics) - len(todo)} of {len(topics)} topics already done; reviewing {len(todo)} with {workers} workers")
+    if not todo:
+        writer.close()
+        return []
+    resources = resources or ReviewResources(max_results=max_results)
+    summaries = []
+
+    def run(topic):
+        key = topic_key(topic)
+        summary = review_topic(topic, resources, lambda row: writer.write(key, row))
+        writer.finish_topic(key, summary)
+        return summary
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run, topic): topic for topic in todo}
+            for future in as_completed(futures):
+                topic = futures[future]
+                try:
+                    summary = future.result()
+                    summaries.append(summary)
+                    logger.info(f"[{len(summaries)}/{len(todo)}] '{topic['topic']}': {summary['papers']} papers, "
+                                f"PRISMA Score={summary['prisma_score']:.2f}")
+                except Exception as e:
+                    logger.error(f"Review failed for topic '{topic['topic']}': {e}")
+    finally:
+        writer.close()
+    return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run PRISMA reviews for a file of topics")
+    parser.add_argument("topics", help="CSV (topic,from_year,to_year) or JSON-lines file of topics")
+    parser.add_argument("--output", default="batch_results.csv", help="CSV file, or a directory ending in .parquet")
+    parser.add_argument("--workers", type=int, default=4, help="Topics reviewed concurrently")
+    parser.add_argument("--max-results", type=int, default=MAX_RESULTS)
+    parser.add_argument("--from-year", type=int, default=2000, help="Default start year")
+    parser.add_argument("--to-year", type=int, default=2025, help="Default end year")
+    args = parser.parse_args()
+
+    summaries = run_batch(load_topics(args.topics, args.from_year, args.to_year), args.output, args.workers, args.max_results)
+    print(f"✅ Reviewed {len(summaries)} topics; results in {args.output}")
@@ -1,57 +1,360 @@
 # env/prisma_env.py
 
-from pettingzoo import AECEnv
+from pettingzoo import AECEnv, ParallelEnv
 from gymnasium import spaces
 import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
 
-class PRISMAEnv(AECEnv):
+AGENTS = ["search", "title_abstract", "full_text", "prisma_checker"]
+NUM_ACTIONS = {
+    "search": 5,            # query modifications, see agents.review_pipeline.modify_query
+    "title_abstract": 3,    # exclude/maybe/include
+    "full_text": 2,         # exclude/include
+    "prisma_checker": 1,    # no-op
+}
+
+
+class ReviewEpisode:
+    """
+    One review (query plus retrieved papers) with everything an environment step needs
+    precomputed: paper embeddings and the reward of every action for every paper. Stepping
+    an environment is then only array indexing.
+    """
+    def __init__(self, query: str, papers: List, query_embedding: np.ndarray,
+                 abstract_embeddings: np.ndarray, fulltext_embeddings: np.ndarray,
+                 abstract_rewards: np.ndarray, fulltext_rewards: np.ndarray,
+                 search_rewards: np.ndarray, metadata: Optional[Dict] = None):
+        self.query = query
+        self.papers = papers
+        self.query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        self.search_state = np.concatenate([self.query_embedding, [len(papers), 0.0]]).astype(np.float32)
+        self.abstract_embeddings = np.asarray(abstract_embeddings, dtype=np.float32)
+        self.fulltext_embeddings = np.asarray(fulltext_embeddings, dtype=np.float32)
+        self.abstract_rewards = np.asarray(abstract_rewards, dtype=np.float32)
+        self.fulltext_rewards = np.asarray(fulltext_rewards, dtype=np.float32)
+        self.search_rewards = np.asarray(search_rewards, dtype=np.float32)
+        n = len(papers)
+        expected = {
+            "abstract_embeddings": (self.abstract_embeddings.shape[:1], (n,)),
+            "fulltext_embeddings": (self.fulltext_embeddings.shape[:1], (n,)),
+            "abstract_rewards": (self.abstract_rewards.shape, (n, NUM_ACTIONS["title_abstract"])),
+            "fulltext_rewards": (self.fulltext_rewards.shape, (n, NUM_ACTIONS["full_text"])),
+            "search_rewards": (self.search_rewards.shape, (NUM_ACTIONS["search"],)),
+        }
+        for name, (shape, wanted) in expected.items():
+            if shape != wanted:
+                raise ValueError(f"ReviewEpisode {name} has shape {shape}, expected {wanted} for {n} papers")
+        self.metadata = metadata or {
+            "query": query,
+            "modified_query": query,
+            "from_year": 2000,
+            "to_year": 2025,
+            "search_action": 0,
+            "inclusion_criteria_clear": 1.0,
+            "exclusion_criteria_clear": 1.0
+        }
+
+    def __len__(self):
+        return len(self.papers)
+
+    @classmethod
+    def from_training_data(cls, data: Dict, prisma_checker, full_texts: Optional[Dict[str, str]] = None) -> "ReviewEpisode":
+        """
+        Build an episode from one PRISMAAgentTrainer training_data entry.
+        Args:
+            data: Dict with 'query', 'papers' and optionally 'ground_truth_labels', 'human_feedback'
+                and 'search_rewards' (one reward per search action)
+            prisma_checker: PRISMAChecker used for all rewards
+            full_texts: Optional entry_id -> full text; abstracts are used where missing
+        """
+        reward_system = prisma_checker.reward_system
+        query, papers = data["query"], data["papers"]
+        ground_truth = data.get("ground_truth_labels", {})
+        summaries = [paper.summary for paper in papers]
+        texts = [(full_texts or {}).get(paper.entry_id) or paper.summary for paper in papers]
+
+        query_embedding = reward_system.embed_text(query)
+        abstract_embeddings = reward_system.embed_many(summaries)
+        fulltext_embeddings = abstract_embeddings if texts == summaries else reward_system.embed_many(texts)
+        labels = [ground_truth.get(i) for i in range(len(papers))]
+        citation_counts = [getattr(paper, "citation_count", 0) for paper in papers]
+        abstract_rewards = np.stack([
+            prisma_checker.evaluate_abstract_rewards(summaries, np.full(len(papers), action), labels)
+            for action in range(3)
+        ], axis=1)
+        fulltext_rewards = np.stack([
+            prisma_checker.evaluate_fulltext_rewards(texts, np.full(len(papers), action), labels, citation_counts)
+            for action in range(2)
+        ], axis=1)
+        search_rewards = data.get("search_rewards")
+        if search_rewards is None:
+            # Without re-running the search per variant, every action earns the query's reward
+            search_rewards = np.full(NUM_ACTIONS["search"], prisma_checker.evaluate_search_reward(
+                papers, query_embedding, data.get("human_feedback")))
+        return cls(query, papers, query_embedding, abstract_embeddings, fulltext_embeddings,
+                   abstract_rewards, fulltext_rewards, search_rewards)
+
+
+def episode_review(episode: ReviewEpisode, abstract_actions: np.ndarray, fulltext_actions: np.ndarray,
+                   metadata: Optional[Dict] = None):
+    """(metadata, results_df) of a finished episode, the same results table the trainer builds."""
+    screened = np.flatnonzero(np.isin(abstract_actions, (1, 2)))
+    rows = [{
+        "Title": episode.papers[i].title,
+        "Abstract": episode.papers[i].summary,
+        "Authors": ", ".join(a.name for a in episode.papers[i].authors),
+        "Decision": "Include" if fulltext_actions[i] == 1 else "Exclude",
+        "Score": round(float(episode.abstract_rewards[i, abstract_actions[i]]
+                             + episode.fulltext_rewards[i, fulltext_actions[i]]) / 2, 3)
+    } for i in screened]
+    return metadata or episode.metadata, pd.DataFrame(rows)
+
+
+def prisma_episode_score(prisma_checker, episode: ReviewEpisode, abstract_actions: np.ndarray,
+                         fulltext_actions: np.ndarray, metadata: Optional[Dict] = None) -> float:
+    """PRISMA compliance of a finished episode."""
+    return float(prisma_checker.evaluate_prisma_scores([episode_review(episode, abstract_actions, fulltext_actions, metadata)])[0])
+
+
+class VectorPRISMAEnv:
+    """
+    Steps num_envs review episodes at once. Each step screens one paper per episode: every
+    agent receives a batched observation and returns a batch of actions.
+
+    - search acts on the query state; its reward only counts on an episode's first step
+    - title_abstract acts on the abstract embedding of the current paper
+    - full_text acts on the full-text embedding; its reward only counts for papers the
+      abstract agent kept (Maybe/Include)
+    - prisma_checker is rewarded with the PRISMA compliance score when an episode ends
+
+    `infos` carries the per-env masks ("search_mask", "full_text_mask") that say which
+    rewards are real. Finished episodes are replaced by new ones automatically.
+    """
     metadata = {"render_modes": []}
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, episodes: List[ReviewEpisode], prisma_checker, num_envs: int = 8, seed: Optional[int] = None):
+        self.episodes = [episode for episode in episodes if len(episode)]
+        if not self.episodes:
+            raise ValueError("VectorPRISMAEnv needs at least one non-empty episode")
+        if num_envs < 1:
+            raise ValueError(f"VectorPRISMAEnv needs num_envs >= 1, got {num_envs}")
+        self.prisma_checker = prisma_checker
+        self.num_envs = num_envs
+        self.agents = AGENTS[:]
+        self.possible_agents = AGENTS[:]
+        self.rng = np.random.default_rng(seed)
 
-        self.agents = ["search", "title_abstract", "full_text", "prisma_checker"]
-        self.possible_agents = self.agents[:]
-        self.agent_idx = 0
+        # All episodes are concatenated so that observations and rewards are gathered with one index
+        self.lengths = np.array([len(e) for e in self.episodes])
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)[:-1]])
+        self.abstract_embeddings = np.concatenate([e.abstract_embeddings for e in self.episodes])
+        self.fulltext_embeddings = np.concatenate([e.fulltext_embeddings for e in self.episodes])
+        self.abstract_rewards = np.concatenate([e.abstract_rewards for e in self.episodes])
+        self.fulltext_rewards = np.concatenate([e.fulltext_rewards for e in self.episodes])
+        self.search_states = np.stack([e.search_state for e in self.episodes])
+        self.query_embeddings = np.stack([e.query_embedding for e in self.episodes])
+        self.search_rewards = np.stack([e.search_rewards for e in self.episodes])
 
+        dim = self.abstract_embeddings.shape[1]
         self.observation_spaces = {
-            agent: spaces.Dict({
-                "text": spaces.Box(low=0, high=1, shape=(768,), dtype=np.float32)
-            }) for agent in self.agents
+            agent: spaces.Box(low=-np.inf, high=np.inf, shape=(dim + 2 if agent == "search" else dim,), dtype=np.float32)
+            for agent in AGENTS
+        }
+        self.action_spaces = {agent: spaces.Discrete(n) for agent, n in NUM_ACTIONS.items()}
+
+        max_len = int(self.lengths.max())
+        self._abstract_history = np.zeros((num_envs, max_len), dtype=np.int64)
+        self._fulltext_history = np.zeros((num_envs, max_len), dtype=np.int64)
+
+    def observation_space(self, agent):
+        return self.observation_spaces[agent]
+
+    def action_space(self, agent):
+        return self.action_spaces[agent]
+
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.episode_ids = self.rng.integers(len(self.episodes), size=self.num_envs)
+        self.cursors = np.zeros(self.num_envs, dtype=np.int64)
+        return self._observe(), {}
+
+    def _observe(self) -> Dict[str, np.ndarray]:
+        rows = self.offsets[self.episode_ids] + self.cursors
+        return {
+            "search": self.search_states[self.episode_ids],
+            "title_abstract": self.abstract_embeddings[rows],
+            "full_text": self.fulltext_embeddings[rows],
+            "prisma_checker": self.query_embeddings[self.episode_ids],
         }
 
-        self.action_spaces = {
-            "search": spaces.Discrete(5),             # e.g. modify query, change source
-            "title_abstract": spaces.Discrete(3),      # include/exclude/maybe
-            "full_text": spaces.Discrete(2),           # include/exclude
-            "prisma_checker": spaces.Discrete(1),      # no-op or accept
+    def step(self, actions: Dict[str, np.ndarray]):
+        envs = np.arange(self.num_envs)
+        rows = self.offsets[self.episode_ids] + self.cursors
+        abstract_actions = np.asarray(actions["title_abstract"], dtype=np.int64)
+        fulltext_actions = np.asarray(actions["full_text"], dtype=np.int64)
+        search_actions = np.asarray(actions["search"], dtype=np.int64)
+
+        search_mask = self.cursors == 0
+        full_text_mask = np.isin(abstract_actions, (1, 2))
+        rewards = {
+            "search": np.where(search_mask, self.search_rewards[self.episode_ids, search_actions], 0.0).astype(np.float32),
+            "title_abstract": self.abstract_rewards[rows, abstract_actions],
+            "full_text": np.where(full_text_mask, self.fulltext_rewards[rows, fulltext_actions], 0.0).astype(np.float32),
+            "prisma_checker": np.zeros(self.num_envs, dtype=np.float32),
         }
+        self._abstract_history[envs, self.cursors] = abstract_actions
+        self._fulltext_history[envs, self.cursors] = fulltext_actions
+
+        self.cursors += 1
+        done = self.cursors >= self.lengths[self.episode_ids]
+        prisma_scores = np.full(self.num_envs, np.nan, dtype=np.float32)
+        finished = np.flatnonzero(done)
+        if len(finished):
+            reviews = []
+            for env in finished:
+                episode = self.episodes[self.episode_ids[env]]
+                n = len(episode)
+                reviews.append(episode_review(episode, self._abstract_history[env, :n], self._fulltext_history[env, :n]))
+            prisma_scores[finished] = self.prisma_checker.evaluate_prisma_scores(reviews)
+        rewards["prisma_checker"][done] = prisma_scores[done]
+
+        # Auto-reset finished episodes
+        self.episode_ids[done] = self.rng.integers(len(self.episodes), size=int(done.sum()))
+        self.cursors[done] = 0
+
+        terminations = {agent: done.copy() for agent in AGENTS}
+        truncations = {agent: np.zeros(self.num_envs, dtype=bool) for agent in AGENTS}
+        infos = {"search_mask": search_mask, "full_text_mask": full_text_mask, "prisma_score": prisma_scores}
+        return self._observe(), rewards, terminations, truncations, infos
+
+
+class PRISMAParallelEnv(ParallelEnv):
+    """PettingZoo ParallelEnv over a single review episode; one paper is screened per step."""
+    metadata = {"render_modes": [], "name": "prisma_parallel_v0"}
+
+    def __init__(self, episodes: List[ReviewEpisode], prisma_checker, seed: Optional[int] = None):
+        self.vector_env = VectorPRISMAEnv(episodes, prisma_checker, num_envs=1, seed=seed)
+        self.possible_agents = AGENTS[:]
+        self.agents = []
+
+    def observation_space(self, agent):
+        return self.vector_env.observation_space(agent)
+
+    def action_space(self, agent):
+        return self.vector_env.action_space(agent)
 
     def reset(self, seed=None, options=None):
-        self.agent_idx = 0
-        self.agents = self.possible_agents[:]
+        obs, _ = self.vector_env.reset(seed)
+        self.agents = AGENTS[:]
+        return {agent: obs[agent][0] for agent in self.agents}, {agent: {} for agent in self.agents}
+
+    def step(self, actions):
+        batched = {agent: np.array([actions.get(agent, 0)]) for agent in AGENTS}
+        obs, rewards, terminations, truncations, infos = self.vector_env.step(batched)
+        done = bool(terminations["search"][0])
+        info = {key: value[0] for key, value in infos.items()}
+        result = (
+            {agent: obs[agent][0] for agent in self.agents},
+            {agent: float(rewards[agent][0]) for agent in self.agents},
+            {agent: done for agent in self.agents},
+            {agent: False for agent in self.agents},
+            {agent: info for agent in self.agents},
+        )
+        if done:
+            self.agents = []
+        return result
+
+
+class PRISMAEnv(AECEnv):
+    """
+    Turn-based review episode: the search agent acts once, the title/abstract agent screens
+    every paper, the full-text agent decides on the papers it kept, and the PRISMA checker
+    closes the episode and is rewarded with the compliance score.
+    """
+    metadata = {"render_modes": [], "name": "prisma_v0"}
+
+    def __init__(self, episodes: List[ReviewEpisode], prisma_checker, seed: Optional[int] = None):
+        super().__init__()
+        self.episodes = [episode for episode in episodes if len(episode)]
+        if not self.episodes:
+            raise ValueError("PRISMAEnv needs at least one non-empty episode")
+        self.prisma_checker = prisma_checker
+        self.rng = np.random.default_rng(seed)
+        self.possible_agents = AGENTS[:]
+        self.agents = AGENTS[:]
+        dim = self.episodes[0].abstract_embeddings.shape[1]
+        self.observation_spaces = {
+            agent: spaces.Box(low=-np.inf, high=np.inf, shape=(dim + 2 if agent == "search" else dim,), dtype=np.float32)
+            for agent in AGENTS
+        }
+        self.action_spaces = {agent: spaces.Discrete(n) for agent, n in NUM_ACTIONS.items()}
+
+    def observation_space(self, agent):
+        return self.observation_spaces[agent]
+
+    def action_space(self, agent):
+        return self.action_spaces[agent]
+
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.episode = self.episodes[self.rng.integers(len(self.episodes))]
+        n = len(self.episode)
+        self.abstract_actions = np.zeros(n, dtype=np.int64)
+        self.fulltext_actions = np.zeros(n, dtype=np.int64)
+        self.review_metadata = dict(self.episode.metadata)
+        # Turn order: (agent, paper index)
+        self.turns = [("search", 0)] + [("title_abstract", i) for i in range(n)]
+        self.turn = 0
+        self.agents = AGENTS[:]
         self.rewards = {agent: 0.0 for agent in self.agents}
-        self.dones = {agent: False for agent in self.agents}
+        self._cumulative_rewards = {agent: 0.0 for agent in self.agents}
+        self.terminations = {agent: False for agent in self.agents}
         self.truncations = {agent: False for agent in self.agents}
-        self.observations = {
-            agent: {"text": np.random.rand(768).astype(np.float32)}
-            for agent in self.agents
-        }
         self.infos = {agent: {} for agent in self.agents}
-        self.agent_selection = self.agents[self.agent_idx]
+        self.agent_selection = self.turns[0][0]
+
+    def observe(self, agent):
+        _, paper = self.turns[min(self.turn, len(self.turns) - 1)]
+        if agent == "search":
+            return self.episode.search_state
+        if agent == "title_abstract":
+            return self.episode.abstract_embeddings[paper]
+        if agent == "full_text":
+            return self.episode.fulltext_embeddings[paper]
+        return self.episode.query_embedding
 
     def step(self, action):
         agent = self.agent_selection
-
-        # Dummy reward logic (you'll replace this later)
-        self.rewards[agent] = float(np.random.rand())
-        self.dones[agent] = True
-        self.agent_idx += 1
-
-        if self.agent_idx >= len(self.agents):
-            self.agents = []
+        if self.terminations[agent] or self.truncations[agent]:
+            self._was_dead_step(action)
+            return
+        self._cumulative_rewards[agent] = 0.0
+        self.rewards = {a: 0.0 for a in self.agents}
+        _, paper = self.turns[self.turn]
+        if agent == "search":
+            self.rewards[agent] = float(self.episode.search_rewards[action])
+            self.review_metadata["search_action"] = int(action)
+        elif agent == "title_abstract":
+            self.abstract_actions[paper] = action
+            self.rewards[agent] = float(self.episode.abstract_rewards[paper, action])
+            if action in (1, 2):
+                self.turns.append(("full_text", paper))
+        elif agent == "full_text":
+            self.fulltext_actions[paper] = action
+            self.rewards[agent] = float(self.episode.fulltext_rewards[paper, action])
         else:
-            self.agent_selection = self.agents[self.agent_idx]
+            self.rewards[agent] = prisma_episode_score(
+                self.prisma_checker, self.episode, self.abstract_actions, self.fulltext_actions, self.review_metadata)
+            self.terminations = {a: True for a in self.agents}
 
-    def observe(self, agent):
-        return self.observations[agent]
+        self.turn += 1
+        if self.turn == len(self.turns) and agent != "prisma_checker":
+            self.turns.append(("prisma_checker", 0))
+        self._accumulate_rewards()
+        if self.turn < len(self.turns):
+            self.agent_selection = self.turns[self.turn][0]
+        else:
+            self.agents = []
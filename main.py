@@ -1,21 +1,11 @@
 import sys
 import os
-import pandas as pd
-import numpy as np
-from agents.search_agent import SearchAgent
-from agents.title_abstract_filter import TitleAbstractFilterAgent
-from agents.full_text_agent import FullTextAgent
-from agents.prisma_checker import PRISMAChecker
-from rewards.enhanced_reward_system import EnhancedRewardSystem
-from utils.arxiv_interface import search_arxiv
-from utils.full_text_parser import parse_arxiv_pdf
+import time
+import argparse
+from contextlib import contextmanager
 from utils.logger import get_logger
 
-try:
-    from trainer.train_agents import PRISMAAgentTrainer
-except ImportError:
-    PRISMAAgentTrainer = None
-    print("⚠ Warning: Training module not found. Training mode disabled.")
+_PROCESS_START = time.perf_counter()
 
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
@@ -26,64 +16,85 @@ MAX_RESULTS = 30
 
 logger = get_logger("prisma_main")
 
-def modify_query(topic, action):
-    """Map SearchAgent actions to query modifications."""
-    if action == 0:
-        return topic
-    elif action == 1:
-        return f"{topic} machine learning"
-    elif action == 2:
-        terms = topic.split()
-        return " ".join(terms[:2]) if len(terms) > 2 else topic
-    elif action == 3:
-        return f"{topic} reinforcement learning" if "reinforcement" not in topic.lower() else topic
-    elif action == 4:
-        return f"{topic} artificial intelligence"
-    return topic
-
-def main():
+# Heavy modules (torch, sentence_transformers, arxiv, PDF parsers) are imported by the
+# stage that first needs them; timed() records how long each stage took to get ready
+_startup_timings = []
+
+@contextmanager
+def timed(label):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _startup_timings.append((label, time.perf_counter() - start))
+
+def report_startup_profile():
+    print("\n⏱ Startup profile")
+    for label, seconds in _startup_timings:
+        print(f"  {label:<40} {seconds * 1000:8.1f} ms")
+    loaded = [name for name in ("torch", "sentence_transformers", "pandas", "arxiv", "PyPDF2", "pdfplumber")
+              if name in sys.modules]
+    print(f"  Heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PRISMA literature review system")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report how long imports and model loading took for each stage")
+    args = parser.parse_args(argv)
+    _startup_timings.append(("Ready for mode prompt", time.perf_counter() - _PROCESS_START))
+
     logger.info("Starting PRISMA literature review system")
-    mode = input("Enter mode (train/infer): ").lower()
-    
-    # Initialize agents
-    search_agent = SearchAgent(state_dim=386, model_dir=MODEL_DIR)
-    abstract_agent = TitleAbstractFilterAgent(model_dir=MODEL_DIR)
-    fulltext_agent = FullTextAgent(model_dir=MODEL_DIR)
-    prisma_checker = PRISMAChecker(checklist_pdf_path=CHECKLIST_PATH)
-    reward_system = EnhancedRewardSystem()
-
-    if mode == "train":
-        if PRISMAAgentTrainer is None:
-            logger.error("Training mode not available: PRISMAAgentTrainer not found")
-            print("❌ Training mode not available.")
-            return
-        logger.info("Entering training mode")
-        trainer = PRISMAAgentTrainer()
-        query = input("Enter training query: ")
+    try:
+        mode = input("Enter mode (train/infer): ").lower()
+        if mode == "train":
+            run_training()
+        else:
+            run_inference()
+    finally:
+        if args.profile_startup:
+            report_startup_profile()
+
+def run_training():
+    with timed("Import trainer"):
         try:
+            from trainer.train_agents import PRISMAAgentTrainer
+            from utils.arxiv_interface import search_arxiv
+            import numpy as np
+        except ImportError:
+            PRISMAAgentTrainer = None
+            print("⚠ Warning: Training module not found. Training mode disabled.")
+    if PRISMAAgentTrainer is None:
+        logger.error("Training mode not available: PRISMAAgentTrainer not found")
+        print("❌ Training mode not available.")
+        return
+    logger.info("Entering training mode")
+    with timed("Load agents and checklist"):
+        trainer = PRISMAAgentTrainer()
+    query = input("Enter training query: ")
+    try:
+        with timed("Search arXiv"):
             papers = search_arxiv(query, 2000, 2025, MAX_RESULTS)
-            if not papers:
-                logger.error("No papers found")
-                print("❌ No papers found.")
-                return
-            training_data = [{
-                'query': query,
-                'papers': papers,
-                'search_action': search_agent.act(
-                    np.concatenate([reward_system.embed_text(query), [len(papers), 0.0]]), training=True),
-                'filter_decisions': [1] * len(papers),
-                'ground_truth_labels': {i: 1 for i in range(len(papers))},
-                'human_feedback': {'relevance': 0.8, 'quality': 0.7}
-            }]
-            trainer.train(training_data, epochs=10)
-            logger.info("Training completed")
-            return
-        except Exception as e:
-            logger.error(f"Training failed: {e}")
-            print(f"❌ Training failed: {e}")
+        if not papers:
+            logger.error("No papers found")
+            print("❌ No papers found.")
             return
+        with timed("Load embedding model and embed query"):
+            search_state = np.concatenate([trainer.reward_system.embed_text(query), [len(papers), 0.0]])
+        training_data = [{
+            'query': query,
+            'papers': papers,
+            'search_action': trainer.search_agent.act(search_state, training=True),
+            'filter_decisions': [1] * len(papers),
+            'ground_truth_labels': {i: 1 for i in range(len(papers))},
+            'human_feedback': {'relevance': 0.8, 'quality': 0.7}
+        }]
+        trainer.train(training_data, epochs=10)
+        logger.info("Training completed")
+    except Exception as e:
+        logger.error(f"Training failed: {e}")
+        print(f"❌ Training failed: {e}")
 
-    # Inference mode
+def run_inference():
     topic = input("🔍 Enter research topic: ")
     try:
         from_year = int(input("📅 Start year: "))
@@ -92,72 +103,37 @@ def main():
         logger.error("Invalid year input, using default range 2000-2025")
         from_year, to_year = 2000, 2025
 
-    # Step 1: Search Agent
-    try:
-        query_embedding = reward_system.embed_text(topic)
-        papers = search_arxiv(topic, from_year, to_year, max_results=MAX_RESULTS)
-        if not papers:
-            logger.error("No papers found")
-            print("❌ No papers found.")
-            return
-        logger.info(f"Retrieved {len(papers)} papers")
-        search_state = np.concatenate([query_embedding, [len(papers), 0.0]])
-        search_action = search_agent.act(search_state, training=False)
-        modified_query = modify_query(topic, search_action)
-        prisma_data = prisma_checker.checklist_data
-        search_reward = prisma_checker.evaluate_search_reward(papers, query_embedding, prisma_data)
-        logger.info(f"Search action {search_action}: Query='{modified_query}', Reward={search_reward:.3f}")
-        if modified_query != topic:
-            papers = search_arxiv(modified_query, from_year, to_year, max_results=MAX_RESULTS)
-            logger.info(f"Retrieved {len(papers)} papers with modified query")
-    except Exception as e:
-        logger.error(f"Search evaluation failed: {e}")
-        print("❌ Failed to retrieve papers.")
-        return
-
-    # Step 2: Title/Abstract Filter Agent
-    filtered_papers = []
-    results = []
-    try:
-        for i, paper in enumerate(papers):
-            paper_embed = reward_system.embed_text(paper.summary)
-            abstract_action = abstract_agent.act(paper_embed, training=False)
-            abstract_reward = prisma_checker.evaluate_abstract_reward(paper.summary, abstract_action, prisma_data=prisma_data)
-            if abstract_action in [1, 2]:  # Maybe or Include
-                filtered_papers.append((paper, i))
-            results.append({
-                "Title": paper.title,
-                "Year": paper.published.year,
-                "URL": paper.entry_id,
-                "Decision": "Include" if abstract_action == 2 else "Maybe" if abstract_action == 1 else "Exclude",
-                "Abstract": paper.summary,
-                "Score": abstract_reward,
-                "Authors": ", ".join([a.name for a in paper.authors])
-            })
-    except Exception as e:
-        logger.error(f"Abstract evaluation failed: {e}")
-        print("❌ Failed to evaluate abstracts.")
+    with timed("Import agents"):
+        from agents.search_agent import SearchAgent
+        from agents.title_abstract_filter import TitleAbstractFilterAgent
+        from agents.full_text_agent import FullTextAgent
+        from agents.prisma_checker import PRISMAChecker
+        from agents.review_pipeline import ReviewPipeline
+        from agents.trajectory_log import get_trajectory_recorder
+        from rewards.enhanced_reward_system import EnhancedRewardSystem
+    with timed("Load agents and checklist"):
+        search_agent = SearchAgent(state_dim=386, model_dir=MODEL_DIR, inference_only=True)
+        abstract_agent = TitleAbstractFilterAgent(model_dir=MODEL_DIR, inference_only=True)
+        fulltext_agent = FullTextAgent(model_dir=MODEL_DIR, inference_only=True)
+        prisma_checker = PRISMAChecker(checklist_pdf_path=CHECKLIST_PATH)
+        reward_system = EnhancedRewardSystem()
+    # Transitions are recorded when TRAJECTORY_DIR is set
+    recorder = get_trajectory_recorder()
+    pipeline = ReviewPipeline(search_agent, abstract_agent, fulltext_agent, prisma_checker, reward_system,
+                              recorder=recorder, max_results=MAX_RESULTS)
 
-    # Step 3: Full Text Agent
-    try:
-        for paper, idx in filtered_papers:
-            full_text = parse_arxiv_pdf(paper.entry_id) or paper.summary
-            full_text_embed = reward_system.embed_text(full_text)
-            fulltext_action = fulltext_agent.act(full_text_embed, training=False)
-            citation_count = paper.citation_count if hasattr(paper, 'citation_count') else 0
-            fulltext_reward = prisma_checker.evaluate_fulltext_reward(full_text, fulltext_action, None, citation_count, prisma_data)
-            for res in results:
-                if res["Title"] == paper.title:
-                    res["Score"] = round((res["Score"] + fulltext_reward) / 2, 3)
-                    res["Decision"] = "Include" if fulltext_action == 1 else "Exclude"
-                    break
-    except Exception as e:
-        logger.error(f"Full-text evaluation failed: {e}")
-        print("❌ Failed to evaluate full texts.")
+    # Steps 1-3: search, title/abstract and full-text screening run as overlapping stages
+    with timed("Run review pipeline"):
+        metadata, papers, results, stage_seconds = pipeline.run(topic, from_year, to_year)
+    if not papers:
+        print("❌ No papers found.")
+        return
+    logger.info("Stage busy time: " + ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in stage_seconds.items()))
 
     # Step 4: Save Results and Compute PRISMA Score
     try:
-        df = pd.DataFrame(results).sort_values(by="Score", ascending=False).head(20)
+        import pandas as pd
+        df = pd.DataFrame(list(results.values())).sort_values(by="Score", ascending=False).head(20)
         output_path = "results.csv"
         output_dir = os.path.dirname(output_path) or "."
         if not os.access(output_dir, os.W_OK):
@@ -168,15 +144,6 @@ def main():
         logger.info(f"Saved top 20 papers to {output_path}")
         print(f"✅ Saved top 20 papers to {output_path}")
 
-        metadata = {
-            "query": modified_query,
-            "modified_query": modified_query,
-            "from_year": from_year,
-            "to_year": to_year,
-            "search_action": search_action,
-            "inclusion_criteria_clear": 1.0,
-            "exclusion_criteria_clear": 1.0
-        }
         prisma_score = prisma_checker.evaluate_prisma_score(papers, metadata, df)
         print(f"📊 PRISMA Compliance Score: {prisma_score:.2f}")
     except PermissionError as e:
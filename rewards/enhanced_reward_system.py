@@ -1,7 +1,15 @@
+import re
+import hashlib
+import threading
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from collections import deque
-from typing import List, Dict, Optional
+from collections import deque, OrderedDict
+from typing import List, Dict, Optional, Sequence, Tuple
+from utils.embedding_service import get_embedding_service
+
+# Methodology and results terms found in one scan; each match reports which group it hit
+_FEATURE_TERMS = re.compile(
+    r"(?P<methodology>method|approach|algorithm|framework)|(?P<results>result|performance|evaluation|experiment)"
+)
 
 class EnhancedRewardSystem:
     """
@@ -13,7 +21,15 @@ class EnhancedRewardSystem:
         self.human_feedback_weight = 0.3
         self.prisma_weight = 0.4
         self.feedback_history = deque(maxlen=1000)
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.embedder = get_embedding_service()
+        # Summaries are embedded and reduced this many at a time, which bounds memory
+        # for bulk result sets; set max_reward_papers to score a random sample instead
+        self.embedding_chunk_size = 512
+        self.max_reward_papers = None
+        # Keyword features of recently scored texts, keyed by a hash of the text
+        self.feature_cache_size = 100000
+        self._feature_cache = OrderedDict()
+        self._feature_lock = threading.Lock()
         self.checklist_items = [
             'search_strategy_documented', 'inclusion_criteria_clear', 'exclusion_criteria_clear',
             'study_selection_process', 'data_extraction_systematic', 'quality_assessment_performed',
@@ -25,16 +41,7 @@ class EnhancedRewardSystem:
         if not papers:
             return -1.0
 
-        relevance_scores = []
-        for paper in papers:
-            paper_embedding = self.embed_text(paper.summary)
-            similarity = np.dot(query_embedding, paper_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(paper_embedding)
-            )
-            relevance_scores.append(similarity)
-
-        avg_relevance = np.mean(relevance_scores)
-        diversity_score = self.calculate_diversity(papers)
+        avg_relevance, diversity_score = self.summary_statistics(papers, query_embedding)
         prisma_score = np.mean([prisma_data.get(item, 0.0) for item in ['search_strategy_documented', 'information_sources']])
 
         feedback_score = 0.0
@@ -51,10 +58,7 @@ class EnhancedRewardSystem:
     def compute_filter_reward(self, paper_data: Dict, decision: int, 
                              prisma_data: Dict, ground_truth: Optional[int] = None) -> float:
         base_reward = 0.0
-        has_methodology = any(word in paper_data.get('abstract', '').lower()
-                              for word in ['method', 'approach', 'algorithm', 'framework'])
-        has_results = any(word in paper_data.get('abstract', '').lower()
-                          for word in ['result', 'performance', 'evaluation', 'experiment'])
+        has_methodology, has_results = self.text_features(paper_data.get('abstract', ''))
         citation_count = paper_data.get('citation_count', 0)
 
         if decision == 1 or decision == 2:  # Include or Maybe
@@ -79,26 +83,118 @@ class EnhancedRewardSystem:
 
         return np.clip(reward, -1.0, 1.0)
 
+    def compute_filter_rewards(self, texts: Sequence[str], decisions: Sequence[int], prisma_data: Dict,
+                               ground_truths: Optional[Sequence[Optional[int]]] = None,
+                               citation_counts: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        compute_filter_reward for many papers at once.
+        Args:
+            texts: Abstracts or full texts
+            decisions: Decision per text (0 exclude, 1 maybe, 2 include)
+            prisma_data: Parsed checklist
+            ground_truths: Optional label per text (None where unknown)
+            citation_counts: Optional citation count per text
+        Returns:
+            Float array of rewards
+        """
+        features = np.array([self.text_features(text) for text in texts], dtype=bool).reshape(-1, 2)
+        complete = features[:, 0] & features[:, 1]
+        decisions = np.asarray(decisions, dtype=np.int64)
+        citations = np.zeros(len(decisions)) if citation_counts is None else np.asarray(citation_counts, dtype=np.float64)
+
+        kept = (decisions == 1) | (decisions == 2)
+        base_rewards = np.where(kept, 0.5 + 0.3 * complete + 0.2 * (citations > 10),
+                                np.where(decisions == 0, 0.1 + 0.2 * ~complete, 0.0))
+        if ground_truths is not None:
+            labelled = np.array([label is not None for label in ground_truths], dtype=bool)
+            labels = np.array([-1 if label is None else label for label in ground_truths], dtype=np.int64)
+            base_rewards += np.where(labelled, np.where(decisions == labels, 0.5, -0.3), 0.0)
+
+        prisma_score = np.mean([prisma_data.get(item, 0.0) for item in ['inclusion_criteria_clear', 'exclusion_criteria_clear', 'study_selection_process']])
+        return np.clip(base_rewards * 0.6 + self.prisma_weight * prisma_score, -1.0, 1.0)
+
+    def text_features(self, text: str) -> Tuple[bool, bool]:
+        """(has methodology terms, has results terms), from one scan and cached by text hash."""
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._feature_lock:
+            features = self._feature_cache.get(key)
+            if features is not None:
+                self._feature_cache.move_to_end(key)
+                return features
+        found = {match.lastgroup for match in _FEATURE_TERMS.finditer(text.lower())}
+        features = ("methodology" in found, "results" in found)
+        with self._feature_lock:
+            if len(self._feature_cache) >= self.feature_cache_size:
+                self._feature_cache.popitem(last=False)
+            self._feature_cache[key] = features
+        return features
+
     def compute_prisma_reward(self, review_data: Dict) -> float:
         compliance_score = np.mean([review_data.get(item, 0.0) for item in self.checklist_items])
         if compliance_score > 0.8:
             compliance_score += 0.2
         return np.clip(compliance_score, 0.0, 1.0)
 
+    def compute_prisma_rewards(self, review_matrix: np.ndarray, items: List[str]) -> np.ndarray:
+        """compute_prisma_reward for each row of item scores; columns are ordered as items."""
+        review_matrix = np.asarray(review_matrix, dtype=np.float64)
+        columns = [review_matrix[:, items.index(item)] if item in items else np.zeros(len(review_matrix))
+                   for item in self.checklist_items]
+        compliance_scores = np.mean(columns, axis=0)
+        compliance_scores = np.where(compliance_scores > 0.8, compliance_scores + 0.2, compliance_scores)
+        return np.clip(compliance_scores, 0.0, 1.0)
+
     def calculate_diversity(self, papers: List) -> float:
         if len(papers) < 2:
             return 0.0
-        embeddings = [self.embed_text(p.summary) for p in papers]
-        similarities = []
-        for i in range(len(embeddings)):
-            for j in range(i + 1, len(embeddings)):
-                sim = np.dot(embeddings[i], embeddings[j]) / (
-                    np.linalg.norm(embeddings[i]) * np.linalg.norm(embeddings[j])
-                )
-                similarities.append(sim)
-        avg_similarity = np.mean(similarities)
-        diversity = 1.0 - avg_similarity
-        return max(0.0, diversity)
+        return self.summary_statistics(papers)[1]
+
+    def summary_statistics(self, papers: List, query_embedding: Optional[np.ndarray] = None) -> Tuple[float, float]:
+        """
+        Mean query relevance and diversity of paper summaries from one pass over their embeddings.
+
+        Diversity is 1 - mean pairwise cosine similarity. For unit rows e_i with sum s,
+        sum_{i != j} e_i.e_j = s.s - sum_i e_i.e_i, so only the running sum is needed and
+        the cost is O(n * dim) instead of O(n^2).
+        Args:
+            papers: Papers with a `summary` attribute
+            query_embedding: Optional query vector for relevance
+        Returns:
+            (average relevance, diversity); relevance is 0.0 without a query
+        """
+        papers = self._sample_papers(papers)
+        n = len(papers)
+        if n == 0:
+            return 0.0, 0.0
+        query = None
+        if query_embedding is not None:
+            query = _normalize_rows(np.asarray(query_embedding, dtype=np.float32)[None, :])[0]
+
+        relevance_sum = 0.0
+        vector_sum = None
+        squared_sum = 0.0
+        for start in range(0, n, self.embedding_chunk_size):
+            chunk = papers[start:start + self.embedding_chunk_size]
+            embeddings = _normalize_rows(self.embed_many([p.summary for p in chunk]))
+            if query is not None:
+                relevance_sum += float((embeddings @ query).sum())
+            chunk_sum = embeddings.sum(axis=0, dtype=np.float64)
+            vector_sum = chunk_sum if vector_sum is None else vector_sum + chunk_sum
+            squared_sum += float(np.einsum("ij,ij->", embeddings, embeddings))
+
+        avg_relevance = relevance_sum / n
+        if n < 2:
+            return avg_relevance, 0.0
+        avg_similarity = (float(vector_sum @ vector_sum) - squared_sum) / (n * (n - 1))
+        return avg_relevance, max(0.0, 1.0 - avg_similarity)
+
+    def _sample_papers(self, papers: List) -> List:
+        papers = list(papers)
+        if self.max_reward_papers and len(papers) > self.max_reward_papers:
+            rng = np.random.default_rng(len(papers))
+            idx = np.sort(rng.choice(len(papers), self.max_reward_papers, replace=False))
+            papers = [papers[i] for i in idx]
+        return papers
 
     def integrate_human_feedback(self, feedback: Dict) -> float:
         self.feedback_history.append(feedback)
@@ -110,5 +206,17 @@ class EnhancedRewardSystem:
         weighted_score = 0.6 * np.mean(relevance_scores) + 0.4 * np.mean(quality_scores)
         return (weighted_score - 0.5) * 2
 
+    @property
+    def model(self):
+        return self.embedder.model
+
     def embed_text(self, text: str) -> np.ndarray:
-        return self.model.encode(text, convert_to_numpy=True)
\ No newline at end of file
+        return self.embedder.embed_text(text)
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        return self.embedder.embed_many(texts)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
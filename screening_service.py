@@ -0,0 +1,319 @@
+import os
+import sys
+import re
+import json
+import time
+import queue
+import argparse
+import threading
+import numpy as np
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from utils.logger import get_logger
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+logger = get_logger("screening_service")
+
+# Configuration
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+CHECKLIST_PATH = os.getenv("PRISMA_CHECKLIST_PATH", "PRISMA_2020_checklist.pdf")
+SCREEN_MAX_BATCH = int(os.getenv("SCREEN_MAX_BATCH", "64"))
+# Longest a request waits for others to join its batch before the batch runs anyway
+SCREEN_MAX_LATENCY_MS = float(os.getenv("SCREEN_MAX_LATENCY_MS", "10"))
+SCREEN_STATS_WINDOW = int(os.getenv("SCREEN_STATS_WINDOW", "10000"))
+MAX_REQUEST_BYTES = 32 * 1024 * 1024
+
+# Full-text URLs must name an arXiv paper: a new-style ('2503.07152v1') or old-style
+# ('cs/0112017') identifier, bare or as an arxiv.org abs/pdf URL
+_ARXIV_ID = r"(?:\d{4}\.\d{4,5}|[a-z-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?"
+_ARXIV_URL = re.compile(rf"(?:https?://(?:www\.|export\.)?arxiv\.org/(?:abs|pdf)/)?(?P<id>{_ARXIV_ID})(?:\.pdf)?")
+
+ABSTRACT_DECISIONS = ["Exclude", "Maybe", "Include"]
+FULLTEXT_DECISIONS = ["Exclude", "Include"]
+
+
+class BatchStats:
+    """Latency and batch-size statistics over the last `window` requests and batches."""
+    def __init__(self, window: int = SCREEN_STATS_WINDOW):
+        self._lock = threading.Lock()
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.requests_per_batch = deque(maxlen=window)
+        self.requests = 0
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+
+    def record_batch(self, latencies_ms: Sequence[float], batch_size: int, failed: bool = False):
+        with self._lock:
+            self.latencies_ms.extend(latencies_ms)
+            self.batch_sizes.append(batch_size)
+            self.requests_per_batch.append(len(latencies_ms))
+            self.requests += len(latencies_ms)
+            self.batches += 1
+            self.items += batch_size
+            self.errors += len(latencies_ms) if failed else 0
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = np.array(self.latencies_ms, dtype=np.float64)
+            sizes = np.array(self.batch_sizes, dtype=np.float64)
+            per_batch = np.array(self.requests_per_batch, dtype=np.float64)
+            summary = {"requests": self.requests, "batches": self.batches, "items": self.items, "errors": self.errors}
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            summary.update(latency_ms_mean=float(latencies.mean()), latency_ms_p50=float(p50),
+                           latency_ms_p95=float(p95), latency_ms_p99=float(p99), latency_ms_max=float(latencies.max()))
+        if len(sizes):
+            summary.update(batch_size_mean=float(sizes.mean()), batch_size_max=int(sizes.max()),
+                           requests_per_batch_mean=float(per_batch.mean()))
+        return summary
+
+
+def arxiv_abs_url(value: Any) -> str:
+    """
+    Normalize an arXiv identifier or arxiv.org abs/pdf URL to its abstract URL.
+    Raises:
+        ValueError for anything else, so clients cannot make the service read local files
+        or fetch arbitrary URLs
+    """
+    match = _ARXIV_URL.fullmatch(value.strip()) if isinstance(value, str) else None
+    if match is None:
+        raise ValueError(f"'url' must be an arXiv identifier or arxiv.org abs/pdf URL, got {value!r}")
+    return f"https://arxiv.org/abs/{match.group('id')}"
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into one call of `fn`. The first queued request starts a
+    batch; requests already waiting or arriving within max_latency_ms of it join until
+    max_batch_size items are collected, then fn runs once on all their items and each
+    request gets its own slice of the results. A request larger than max_batch_size runs as
+    a batch of its own.
+    """
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], max_batch_size: int = SCREEN_MAX_BATCH,
+                 max_latency_ms: float = SCREEN_MAX_LATENCY_MS, name: str = "batcher"):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self.name = name
+        self.stats = BatchStats()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, items: List[Any]) -> Future:
+        """Queue items for the next batch; the future resolves to (results, batch_size)."""
+        future = Future()
+        if not items:
+            future.set_result(([], 0))
+            return future
+        self._queue.put((list(items), future, time.perf_counter()))
+        return future
+
+    def __call__(self, items: List[Any]) -> Tuple[List[Any], int]:
+        return self.submit(items).result()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _loop(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            pending = [request]
+            size = len(request[0])
+            deadline = request[2] + self.max_latency
+            while size < self.max_batch_size:
+                # Past the deadline, requests that are already waiting still join
+                timeout = deadline - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._queue.put(None)
+                    break
+                pending.append(request)
+                size += len(request[0])
+            self._run(pending)
+
+    def _run(self, pending):
+        items = [item for request_items, _, _ in pending for item in request_items]
+        try:
+            results = self.fn(items)
+            error = None
+        except Exception as e:
+            logger.error(f"{self.name}: batch of {len(items)} items failed: {e}")
+            results, error = None, e
+        done = time.perf_counter()
+        start = 0
+        for request_items, future, _ in pending:
+            if error is None:
+                future.set_result((results[start:start + len(request_items)], len(items)))
+            else:
+                future.set_exception(error)
+            start += len(request_items)
+        self.stats.record_batch([(done - arrived) * 1000.0 for _, _, arrived in pending], len(items), error is not None)
+
+
+class ScreeningService:
+    """
+    Abstract and full-text screening with the trained agents. Each endpoint has its own
+    MicroBatcher, so many small concurrent requests share one embedding and Q-network
+    forward pass.
+    """
+    def __init__(self, model_dir: str = MODEL_DIR, checklist_path: str = CHECKLIST_PATH,
+                 max_batch_size: int = SCREEN_MAX_BATCH, max_latency_ms: float = SCREEN_MAX_LATENCY_MS):
+        from agents.title_abstract_filter import TitleAbstractFilterAgent
+        from agents.full_text_agent import FullTextAgent
+        from agents.prisma_checker import PRISMAChecker
+        from rewards.enhanced_reward_system import EnhancedRewardSystem
+        self.abstract_agent = TitleAbstractFilterAgent(model_dir=model_dir, inference_only=True)
+        self.fulltext_agent = FullTextAgent(model_dir=model_dir, inference_only=True)
+        self.prisma_checker = PRISMAChecker(checklist_pdf_path=checklist_path)
+        self.reward_system = EnhancedRewardSystem()
+        self.batchers = {
+            "abstracts": MicroBatcher(self._screen_abstracts, max_batch_size, max_latency_ms, "screen-abstracts"),
+            "fulltext": MicroBatcher(self._screen_full_texts, max_batch_size, max_latency_ms, "screen-fulltext"),
+        }
+
+    def _screen_abstracts(self, abstracts: List[str]) -> List[Dict]:
+        embeds = self.reward_system.embed_many(abstracts)
+        actions, q_values = self.abstract_agent.act_batch(embeds, training=False)
+        scores = self.prisma_checker.evaluate_abstract_rewards(abstracts, actions)
+        return [{"decision": ABSTRACT_DECISIONS[action], "action": action, "score": round(score, 3), "q_values": q.tolist()}
+                for action, score, q in zip(actions.tolist(), scores.tolist(), q_values)]
+
+    def _screen_full_texts(self, documents: List[Tuple[str, int]]) -> List[Dict]:
+        full_texts = [text for text, _ in documents]
+        embeds = self.reward_system.embed_many(full_texts)
+        actions, q_values = self.fulltext_agent.act_batch(embeds, training=False)
+        scores = self.prisma_checker.evaluate_fulltext_rewards(full_texts, actions, None, [count for _, count in documents])
+        return [{"decision": FULLTEXT_DECISIONS[action], "action": action, "score": round(score, 3), "q_values": q.tolist()}
+                for action, score, q in zip(actions.tolist(), scores.tolist(), q_values)]
+
+    def screen_abstracts(self, payload: Dict) -> Dict:
+        """{"abstracts": [str, ...]} -> one result per abstract."""
+        abstracts = payload.get("abstracts")
+        if not isinstance(abstracts, list) or not all(isinstance(text, str) for text in abstracts):
+            raise ValueError("'abstracts' must be a list of strings")
+        return self._submit("abstracts", abstracts)
+
+    def screen_fulltext(self, payload: Dict) -> Dict:
+        """
+        {"documents": [{"text": str} or {"url": str}, optional "citation_count": int]}. URLs must
+        name arXiv papers (see arxiv_abs_url); they are downloaded and parsed on the request
+        thread, before the document joins a batch.
+        """
+        documents = payload.get("documents")
+        if not isinstance(documents, list) or not all(isinstance(doc, dict) and ("text" in doc or "url" in doc) for doc in documents):
+            raise ValueError("'documents' must be a list of objects with 'text' or 'url'")
+        # Validate every URL before downloading any
+        urls = [None if "text" in doc else arxiv_abs_url(doc["url"]) for doc in documents]
+        parsed = {}
+        if any(urls):
+            from utils.full_text_parser import parse_arxiv_pdfs
+            parsed = dict(parse_arxiv_pdfs([url for url in urls if url]))
+        items = [(doc["text"] if url is None else parsed.get(url, ""), int(doc.get("citation_count", 0)))
+                 for doc, url in zip(documents, urls)]
+        return self._submit("fulltext", items)
+
+    def _submit(self, endpoint: str, items: List[Any]) -> Dict:
+        start = time.perf_counter()
+        try:
+            results, batch_size = self.batchers[endpoint](items)
+        except Exception as e:
+            raise RuntimeError(f"Screening batch failed: {e}") from e
+        return {"results": results, "batch_size": batch_size, "latency_ms": round((time.perf_counter() - start) * 1000.0, 3)}
+
+    def stats(self) -> Dict[str, Dict]:
+        return {endpoint: batcher.stats.summary() for endpoint, batcher in self.batchers.items()}
+
+    def close(self):
+        for batcher in self.batchers.values():
+            batcher.close()
+
+
+def make_handler(service: ScreeningService):
+    routes = {"/screen/abstracts": service.screen_abstracts, "/screen/fulltext": service.screen_fulltext}
+
+    class ScreeningHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: Dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send(200, service.stats())
+            else:
+                self._send(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            route = routes.get(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            if route is None or length > MAX_REQUEST_BYTES:
+                self.rfile.read(min(length, MAX_REQUEST_BYTES))
+                self._send(404 if route is None else 413, {"error": f"Cannot handle {self.path} ({length} bytes)"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(payload, dict):
+                    raise ValueError("Request body must be a JSON object")
+                self._send(200, route(payload))
+            except (ValueError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                logger.error(f"Screening request to {self.path} failed: {e}")
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return ScreeningHandler
+
+
+class ScreeningHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Many clients connect at once by design; the default backlog of 5 resets connections
+    request_queue_size = 256
+
+
+def make_server(service: ScreeningService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    return ScreeningHTTPServer((host, port), make_handler(service))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP service for abstract and full-text screening")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=SCREEN_MAX_BATCH, help="Most items per forward pass")
+    parser.add_argument("--max-latency-ms", type=float, default=SCREEN_MAX_LATENCY_MS,
+                        help="Longest a request waits for others to join its batch")
+    args = parser.parse_args()
+
+    service = ScreeningService(max_batch_size=args.max_batch, max_latency_ms=args.max_latency_ms)
+    server = make_server(service, args.host, args.port)
+    logger.info(f"Screening service listening on http://{args.host}:{args.port}")
+    print(f"✅ Screening service on http://{args.host}:{args.port} (POST /screen/abstracts, /screen/fulltext; GET /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        logger.info(f"Final stats: {service.stats()}")
@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pytest
+
+ABSTRACTS = [
+    "Deep reinforcement learning for robot control with policy gradients.",
+    "A survey of graph neural networks for molecule property prediction.",
+    "Reinforcement learning agents learn to play games from pixels.",
+    "Scene graph generation from images with transformers.",
+    "Policy optimization in multi-agent reinforcement learning.",
+    "Protein structure prediction with attention networks.",
+]
+
+
+def arxiv_record(i, abstract, year, categories):
+    return {
+        "id": f"{year % 100:02d}01.{i:05d}",
+        "title": f"Paper {i}",
+        "abstract": abstract,
+        "authors": "Ada Lovelace and Alan Turing",
+        "authors_parsed": [["Lovelace", "Ada", ""], ["Turing", "Alan", ""]],
+        "categories": categories,
+        "versions": [{"version": "v1", "created": f"Mon, 2 Jan {year} 10:00:00 GMT"}],
+        "update_date": f"{year}-01-02",
+    }
+
+
+@pytest.fixture
+def arxiv_dump(tmp_path):
+    """A small arXiv metadata dump (JSON lines) with one malformed and one id-less line."""
+    path = tmp_path / "dump.jsonl"
+    categories = ["cs.LG cs.RO", "cs.LG q-bio.BM", "cs.LG", "cs.CV", "cs.MA cs.LG", "q-bio.BM"]
+    with open(path, "w", encoding="utf-8") as f:
+        for i, (abstract, category) in enumerate(zip(ABSTRACTS, categories)):
+            f.write(json.dumps(arxiv_record(i, abstract, 2015 + i, category)) + "\n")
+            if i == 2:
+                f.write("{not json\n")
+                f.write(json.dumps({"title": "no id"}) + "\n")
+    return str(path)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from utils import ann_index
+from utils.ann_index import IVFIndex, SemanticSearchBackend, assign_clusters, build_corpus_index, spherical_kmeans
+from utils.local_corpus import ingest
+
+
+def normalized(x):
+    return x / np.linalg.norm(x, axis=-1, keepdims=True)
+
+
+def clustered(num_clusters=8, per_cluster=50, dim=16, noise=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = normalized(rng.standard_normal((num_clusters, dim)))
+    labels = np.repeat(np.arange(num_clusters), per_cluster)
+    vectors = normalized(centers[labels] + noise * rng.standard_normal((len(labels), dim))).astype(np.float32)
+    return vectors, labels, centers
+
+
+def brute_force(vectors, queries, k):
+    scores = normalized(queries) @ normalized(vectors).T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def test_spherical_kmeans_recovers_clusters():
+    vectors, labels, centers = clustered()
+    # k-means++ seeding; uniform seeding put two seeds in one cluster here
+    centroids = spherical_kmeans(vectors, 8, iterations=10)
+    np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, rtol=1e-5)
+    assignment = assign_clusters(vectors, centroids, chunk_size=37)
+    # Each true cluster maps to one centroid and each centroid to one cluster
+    mapping = {label: set(assignment[labels == label]) for label in range(8)}
+    assert all(len(found) == 1 for found in mapping.values())
+    assert len(set().union(*mapping.values())) == 8
+    assert (centroids[[next(iter(mapping[label])) for label in range(8)]] * centers).sum(axis=1).min() > 0.99
+
+
+def test_search_probing_every_list_is_exact():
+    vectors, _, _ = clustered(seed=1)
+    queries = np.random.default_rng(2).standard_normal((20, 16))
+    index = IVFIndex.build(vectors, num_lists=8, dtype="float32")
+    ids, scores = index.search(queries, k=5, nprobe=8)
+    np.testing.assert_array_equal(ids, brute_force(vectors, queries, 5))
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+
+def test_search_with_few_probes_finds_cluster_neighbours():
+    vectors, labels, _ = clustered(seed=3)
+    index = IVFIndex.build(vectors, ids=np.arange(len(vectors)) + 1000, num_lists=8)
+    ids, _ = index.search(vectors[::50], k=10, nprobe=1)
+    # Queries are cluster members, so their neighbours lie in the same list
+    assert np.all(labels[ids - 1000] == labels[::50][:, None])
+
+
+def test_missing_neighbours_are_padded_and_index_round_trips(tmp_path):
+    vectors, _, _ = clustered(num_clusters=2, per_cluster=3, seed=4)
+    index = IVFIndex.build(vectors, num_lists=2)
+    ids, scores = index.search(vectors[0], k=10, nprobe=1)
+    assert (ids[0] >= 0).sum() == 3 and np.all(ids[0, 3:] == -1) and np.all(np.isneginf(scores[0, 3:]))
+    index.save(str(tmp_path / "ann"))
+    loaded = IVFIndex.load(str(tmp_path / "ann"))
+    assert isinstance(loaded.vectors, np.memmap) and len(loaded) == 6
+    for a, b in zip(loaded.search(vectors, k=3, nprobe=2), index.search(vectors, k=3, nprobe=2)):
+        np.testing.assert_array_equal(a, b)
+
+
+class KeywordEmbedder:
+    """Embeds text as counts of a few keywords, so similarity is predictable."""
+    KEYWORDS = ["reinforcement", "graph", "protein", "scene", "policy", "networks"]
+
+    def embed_many(self, texts):
+        return np.array([[text.lower().count(word) + 0.01 for word in self.KEYWORDS] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def semantic_backend(arxiv_dump, tmp_path, monkeypatch):
+    monkeypatch.setattr(ann_index, "get_embedding_service", KeywordEmbedder)
+    corpus = ingest(arxiv_dump, str(tmp_path / "corpus"))
+    index = build_corpus_index(corpus, str(tmp_path / "ann"), batch_size=4, num_lists=2)
+    return SemanticSearchBackend(corpus, index, nprobe=2)
+
+
+def test_semantic_backend_ranks_and_filters(semantic_backend):
+    assert semantic_backend.search("protein", max_results=1)[0].title == "Paper 5"
+    top = {paper.title for paper in semantic_backend.search("reinforcement policy", max_results=2)}
+    assert top == {"Paper 0", "Paper 4"}
+    assert [paper.title for paper in semantic_backend.search("reinforcement", from_year=2017, to_year=2017)] == ["Paper 2"]
+    assert {paper.published.year for paper in semantic_backend.search("graph", categories=["cs.LG"], max_results=6)} <= {2015, 2016, 2017, 2019}
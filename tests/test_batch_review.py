@@ -0,0 +1,81 @@
+import csv
+import json
+import pytest
+import batch_review
+from batch_review import load_topics, run_batch, topic_key
+
+
+def fake_review(fail_topics=(), papers=3):
+    """review_topic stand-in that emits one row per paper and can fail after emitting."""
+    calls = []
+
+    def review(topic, resources, emit):
+        calls.append(topic["topic"])
+        for i in range(papers):
+            emit({"Topic": topic["topic"], "FromYear": topic["from_year"], "ToYear": topic["to_year"],
+                  "Title": f"{topic['topic']} paper {i}", "Decision": "Include"})
+            if topic["topic"] in fail_topics and i == 1:
+                raise RuntimeError("interrupted")
+        return {**topic, "query": topic["topic"], "papers": papers, "prisma_score": 0.5}
+    return review, calls
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def topics():
+    return [{"topic": name, "from_year": 2020, "to_year": 2024} for name in ("rl", "nlp", "vision", "graphs")]
+
+
+def test_load_topics_from_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "topics.csv"
+    csv_path.write_text("topic,from_year,to_year\nrl review,2020,2021\n,2000,2001\ndeep learning,,\n", encoding="utf-8")
+    assert load_topics(str(csv_path), 1999, 2005) == [
+        {"topic": "rl review", "from_year": 2020, "to_year": 2021},
+        {"topic": "deep learning", "from_year": 1999, "to_year": 2005},
+    ]
+    jsonl_path = tmp_path / "topics.jsonl"
+    jsonl_path.write_text(json.dumps({"topic": "nlp", "to_year": 2022}) + "\n\n", encoding="utf-8")
+    assert load_topics(str(jsonl_path)) == [{"topic": "nlp", "from_year": 2000, "to_year": 2022}]
+
+
+def test_resume_after_interrupt(tmp_path, topics, monkeypatch):
+    output = str(tmp_path / "reviews.csv")
+    review, calls = fake_review(fail_topics={"vision"})
+    monkeypatch.setattr(batch_review, "review_topic", review)
+    summaries = run_batch(topics, output, workers=2, resources=object())
+    assert sorted(s["topic"] for s in summaries) == ["graphs", "nlp", "rl"]
+    # The failed topic left partial rows behind and is not marked done
+    assert sum(row["Topic"] == "vision" for row in read_rows(output)) == 2
+    with open(output + ".done.jsonl", encoding="utf-8") as f:
+        done = [json.loads(line) for line in f]
+    assert sorted(entry["key"] for entry in done) == sorted(topic_key(t) for t in topics if t["topic"] != "vision")
+
+    review, calls = fake_review()
+    monkeypatch.setattr(batch_review, "review_topic", review)
+    summaries = run_batch(topics, output, workers=2, resources=object())
+    assert calls == ["vision"] and [s["topic"] for s in summaries] == ["vision"]
+    rows = read_rows(output)
+    assert sorted(row["Title"] for row in rows) == sorted(f"{t['topic']} paper {i}" for t in topics for i in range(3))
+    assert list(rows[0]) == batch_review.RESULT_COLUMNS
+
+    # Everything is done: nothing is reviewed and resources are never built
+    assert run_batch(topics, output, resources=None) == []
+
+
+def test_parquet_output_writes_one_file_per_finished_topic(tmp_path, topics, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    output = str(tmp_path / "reviews.parquet")
+    review, _ = fake_review(fail_topics={"nlp"})
+    monkeypatch.setattr(batch_review, "review_topic", review)
+    run_batch(topics, output, workers=2, resources=object())
+    frames = [pd.read_parquet(tmp_path / "reviews.parquet" / name) for name in sorted((tmp_path / "reviews.parquet").iterdir())]
+    assert sorted(frame["Topic"].iloc[0] for frame in frames) == ["graphs", "rl", "vision"]
+    review, calls = fake_review()
+    monkeypatch.setattr(batch_review, "review_topic", review)
+    run_batch(topics, output, workers=2, resources=object())
+    assert calls == ["nlp"] and len(list((tmp_path / "reviews.parquet").iterdir())) == 4
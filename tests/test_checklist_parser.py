@@ -0,0 +1,101 @@
+import json
+import os
+import re
+import numpy as np
+import pytest
+from utils import full_text_parser
+from utils.full_text_parser import CHECKLIST_ITEMS, parse_checklist_pdf, parse_checklist_text
+
+COMPLETE = ["X", "Yes", "✓", "[X]", "[✓]", "Completed", "True", "yes", "x-ray"]
+INCOMPLETE = ["No", "Incomplete", "False", "no", "Notes"]
+OTHER = ["Maybe", "see page 4", "", "N/A", "Partial"]
+
+
+def reference_parse(text):
+    """The per-item search the trie regex replaced: two regex scans per checklist item."""
+    data = {}
+    for item in CHECKLIST_ITEMS:
+        title = item.replace("_", " ").title()
+        if re.search(rf"{title}\s*[:\(\[]*\s*(X|Yes|✓|\[X\]|\[✓\]|Completed|True)", text, re.IGNORECASE):
+            data[item] = 1.0
+        elif re.search(rf"{title}\s*[:\(\[]*\s*(No|Incomplete|False)", text, re.IGNORECASE):
+            data[item] = 0.0
+        else:
+            data[item] = 0.5
+    return data
+
+
+def random_checklist(rng):
+    lines = []
+    for _ in range(rng.integers(0, 60)):
+        title = str(rng.choice(CHECKLIST_ITEMS)).replace("_", " ")
+        title = {0: title.title(), 1: title.upper(), 2: title}[int(rng.integers(3))]
+        separator = str(rng.choice(["", " ", ": ", " (", " [", ":\n", "  "]))
+        status = str(rng.choice(COMPLETE + INCOMPLETE + OTHER))
+        lines.append(f"{title}{separator}{status}")
+    return str(rng.choice(["\n", " ", " | "])).join(lines)
+
+
+def test_trie_regex_matches_per_item_search():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        text = random_checklist(rng)
+        assert parse_checklist_text(text) == reference_parse(text), text
+
+
+@pytest.mark.parametrize("text, item, expected", [
+    # Titles that extend another title must not mark the shorter one
+    ("Certainty Assessment Method: Yes", "certainty_assessment", 0.5),
+    ("Certainty Assessment Method: Yes", "certainty_assessment_method", 1.0),
+    ("Results Synthesized: No\nResults Synthesis: Yes", "results_synthesized", 0.0),
+    # Complete anywhere wins over incomplete
+    ("Funding Reported: No ... Funding Reported [X]", "funding_reported", 1.0),
+])
+def test_overlapping_titles(text, item, expected):
+    assert parse_checklist_text(text)[item] == expected == reference_parse(text)[item]
+
+
+@pytest.fixture
+def fake_pdf(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(full_text_parser, "CHECKLIST_CACHE_DIR", str(cache_dir))
+    calls = []
+
+    def extract(content):
+        calls.append(content)
+        return content.decode("utf-8")
+
+    monkeypatch.setattr(full_text_parser, "extract_text_from_pdf", extract)
+    path = tmp_path / "checklist.pdf"
+    return path, cache_dir, calls
+
+
+def test_checklist_is_cached_by_content(fake_pdf):
+    path, cache_dir, calls = fake_pdf
+    text = " ".join(["filler"] * 60) + " Title Identifiable: Yes"
+    path.write_text(text, encoding="utf-8")
+    first = parse_checklist_pdf(str(path))
+    assert first["title_identifiable"] == 1.0 and len(calls) == 1
+    assert parse_checklist_pdf(str(path)) == first and len(calls) == 1
+    cached = os.listdir(cache_dir)
+    assert len(cached) == 1 and cached[0].endswith(f"-v{full_text_parser.CHECKLIST_PARSER_VERSION}.json")
+
+    # New content is a new cache entry; the old file does not go stale
+    path.write_text(text.replace("Yes", "No"), encoding="utf-8")
+    assert parse_checklist_pdf(str(path))["title_identifiable"] == 0.0 and len(calls) == 2
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_unreadable_cache_is_reparsed(fake_pdf):
+    path, cache_dir, calls = fake_pdf
+    path.write_text(" ".join(["filler"] * 60) + " Funding Reported X", encoding="utf-8")
+    parse_checklist_pdf(str(path))
+    (cache_file,) = os.listdir(cache_dir)
+    (cache_dir / cache_file).write_text("{truncated", encoding="utf-8")
+    assert parse_checklist_pdf(str(path))["funding_reported"] == 1.0 and len(calls) == 2
+    with open(cache_dir / cache_file, encoding="utf-8") as f:
+        assert json.load(f)["funding_reported"] == 1.0
+
+
+def test_missing_pdf_returns_empty(tmp_path):
+    assert parse_checklist_pdf(str(tmp_path / "missing.pdf")) == {}
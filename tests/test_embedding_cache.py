@@ -0,0 +1,81 @@
+import multiprocessing
+import numpy as np
+from utils.embedding_cache import EmbeddingCache
+
+DIM = 8
+ROW_BYTES = DIM * 4
+
+
+def vec(seed):
+    return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+
+def make_cache(tmp_path, rows=4, **kwargs):
+    return EmbeddingCache(str(tmp_path), "model", max_bytes=rows * ROW_BYTES, **kwargs)
+
+
+def test_round_trip_and_persistence(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many(["a", "b"], np.stack([vec(1), vec(2)]))
+    got = cache.get_many(["a", "b", "c"])
+    np.testing.assert_array_equal(got[0], vec(1))
+    np.testing.assert_array_equal(got[1], vec(2))
+    assert got[2] is None
+    cache.flush()
+    reopened = make_cache(tmp_path, read_only=True)
+    np.testing.assert_array_equal(reopened.get_many(["b"])[0], vec(2))
+
+
+def test_lru_eviction_reuses_least_recent_row(tmp_path):
+    cache = make_cache(tmp_path, rows=2)
+    cache.put_many(["a", "b"], np.stack([vec(1), vec(2)]))
+    cache.get_many(["a"])  # "b" is now least recently used
+    cache.put_many(["c"], vec(3)[None])
+    a, b, c = cache.get_many(["a", "b", "c"])
+    np.testing.assert_array_equal(a, vec(1))
+    assert b is None
+    np.testing.assert_array_equal(c, vec(3))
+
+
+def test_second_writer_in_process_set_is_read_only(tmp_path):
+    writer = make_cache(tmp_path)
+    other = make_cache(tmp_path)
+    assert writer.writable
+    assert not other.writable
+    other.put_many(["beta"], vec(2)[None])
+    writer.put_many(["alpha"], vec(1)[None])
+    writer.flush()
+    fresh = make_cache(tmp_path, read_only=True)
+    alpha, beta = fresh.get_many(["alpha", "beta"])
+    np.testing.assert_array_equal(alpha, vec(1))
+    assert beta is None
+
+
+def test_reader_never_gets_vector_of_reused_row(tmp_path):
+    writer = make_cache(tmp_path, rows=1)
+    writer.put_many(["alpha"], vec(1)[None])
+    writer.flush()
+    reader = make_cache(tmp_path, read_only=True)
+    writer.put_many(["beta"], vec(2)[None])  # evicts "alpha" and reuses its row
+    assert reader.get_many(["alpha"]) == [None]
+
+
+def _write_without_flush(cache_dir):
+    cache = EmbeddingCache(cache_dir, "model", max_bytes=1 * ROW_BYTES)
+    cache.put_many(["beta"], vec(2)[None])
+
+
+def test_crash_after_row_reuse_serves_no_stale_mapping(tmp_path):
+    cache = make_cache(tmp_path, rows=1)
+    cache.put_many(["alpha"], vec(1)[None])
+    cache.flush()
+    cache._lock_file.close()  # release the writer lock for the "crashing" process
+    # A writer that reuses alpha's row and exits before its index is flushed
+    process = multiprocessing.get_context("spawn").Process(target=_write_without_flush, args=(str(tmp_path),))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    reopened = make_cache(tmp_path, rows=1, read_only=True)
+    alpha, beta = reopened.get_many(["alpha", "beta"])
+    assert alpha is None
+    np.testing.assert_array_equal(beta, vec(2))
@@ -0,0 +1,92 @@
+import hashlib
+import numpy as np
+import pytest
+from rewards.enhanced_reward_system import EnhancedRewardSystem
+
+METHODOLOGY = ["method", "approach", "algorithm", "framework"]
+RESULTS = ["result", "performance", "evaluation", "experiment"]
+FILLER = ["we", "study", "the", "of", "Graphs", "and", "a", "on", "REsULTS", "Method", "evaluat", "approac",
+          "perform", "frame", "work", "algo", "rithm", "ion", "é", "\U0001f600"]
+PRISMA = {"inclusion_criteria_clear": 1.0, "exclusion_criteria_clear": 0.5, "study_selection_process": 0.8}
+
+
+def random_text(rng):
+    words = list(rng.choice(FILLER, size=rng.integers(0, 12)))
+    if rng.random() < 0.5:
+        words.append(str(rng.choice(METHODOLOGY)))
+    if rng.random() < 0.5:
+        words.append(str(rng.choice(RESULTS)))
+    rng.shuffle(words)
+    # Joining without spaces sometimes builds terms out of fragments
+    return ("" if rng.random() < 0.3 else " ").join(words)
+
+
+def reference_features(text):
+    """The two substring scans that text_features replaced."""
+    lowered = text.lower()
+    return any(word in lowered for word in METHODOLOGY), any(word in lowered for word in RESULTS)
+
+
+def cache_key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+@pytest.fixture
+def reward_system():
+    return EnhancedRewardSystem()
+
+
+def test_text_features_match_substring_scans(reward_system):
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        text = random_text(rng)
+        assert reward_system.text_features(text) == reference_features(text), text
+
+
+@pytest.mark.parametrize("with_ground_truth", [False, True])
+@pytest.mark.parametrize("with_citations", [False, True])
+def test_batch_rewards_match_single_rewards(reward_system, with_ground_truth, with_citations):
+    rng = np.random.default_rng(1)
+    n = 400
+    texts = [random_text(rng) for _ in range(n)]
+    decisions = rng.integers(0, 3, size=n)
+    ground_truths = [None if rng.random() < 0.3 else int(rng.integers(0, 3)) for _ in range(n)] if with_ground_truth else None
+    citations = rng.choice([0, 9, 10, 11, 50], size=n) if with_citations else None
+
+    batch = reward_system.compute_filter_rewards(texts, decisions, PRISMA, ground_truths, citations)
+    single = [
+        reward_system.compute_filter_reward(
+            {"abstract": text, **({"citation_count": int(citations[i])} if with_citations else {})},
+            int(decisions[i]), PRISMA, ground_truths[i] if with_ground_truth else None
+        )
+        for i, text in enumerate(texts)
+    ]
+    np.testing.assert_allclose(batch, single, rtol=0, atol=1e-12)
+
+
+def test_every_decision_and_citation_threshold(reward_system):
+    texts = ["a method with results", "nothing here"]
+    for decision in (0, 1, 2):
+        for citations in (10, 11):
+            for ground_truth in (None, decision, (decision + 1) % 3):
+                batch = reward_system.compute_filter_rewards(texts, [decision] * 2, PRISMA,
+                                                             [ground_truth] * 2, [citations] * 2)
+                single = [reward_system.compute_filter_reward({"abstract": text, "citation_count": citations},
+                                                              decision, PRISMA, ground_truth) for text in texts]
+                np.testing.assert_allclose(batch, single, rtol=0, atol=1e-12)
+
+
+def test_empty_batch(reward_system):
+    assert reward_system.compute_filter_rewards([], [], PRISMA).shape == (0,)
+
+
+def test_feature_cache_evicts_least_recently_used(reward_system):
+    reward_system.feature_cache_size = 3
+    for text in ["method a", "result b", "c"]:
+        reward_system.text_features(text)
+    reward_system.text_features("method a")  # "result b" is now least recently used
+    reward_system.text_features("d")
+    assert list(reward_system._feature_cache) == [cache_key("c"), cache_key("method a"), cache_key("d")]
+    # Evicted and cached texts still report the right features
+    assert reward_system.text_features("result b") == (False, True)
+    assert len(reward_system._feature_cache) == 3
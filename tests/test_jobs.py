@@ -0,0 +1,93 @@
+import threading
+import time
+import pytest
+from utils import jobs
+from utils.jobs import JobManager
+
+
+def wait_finished(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.finished is None:
+        assert time.monotonic() < deadline, f"job {job.id} did not finish"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def manager():
+    return JobManager(max_workers=1, name="test-jobs")
+
+
+def test_job_runs_through_queued_running_done(manager):
+    release = threading.Event()
+    started = threading.Event()
+
+    def review(job, topic, papers=0):
+        started.set()
+        release.wait(5)
+        job.update(total=papers, message=f"reviewing {topic}")
+        for i in range(papers):
+            job.add_row({"Title": f"{topic} {i}"})
+        return {"papers": papers}
+
+    first = manager.submit("review", "rl", review, "rl", papers=3)
+    second = manager.submit("review", "nlp", review, "nlp")
+    assert started.wait(5)
+    assert first.status == "running"
+    # One worker: the second job waits its turn
+    assert second.status == "queued" and second.snapshot()["elapsed"] == 0
+    assert {job.id for job in manager.active("review")} == {first.id, second.id}
+
+    release.set()
+    wait_finished(first)
+    wait_finished(second)
+    snapshot = first.snapshot()
+    assert (snapshot["status"], snapshot["progress"], snapshot["total"]) == ("done", 3, 3)
+    assert snapshot["message"] == "reviewing rl" and snapshot["result"] == {"papers": 3}
+    assert snapshot["rows"] == [{"Title": f"rl {i}"} for i in range(3)] and snapshot["error"] is None
+    assert snapshot["elapsed"] >= 0
+    # Snapshots are copies that later rows do not change
+    first.add_row({"Title": "late"})
+    assert len(snapshot["rows"]) == 3
+    assert manager.active() == []
+
+
+def test_failed_job_records_the_error(manager):
+    def train(job):
+        job.update(progress=1, total=10)
+        raise ValueError("out of memory")
+
+    job = manager.submit("train", "train agents", train)
+    wait_finished(job)
+    snapshot = job.snapshot()
+    assert (snapshot["status"], snapshot["error"], snapshot["progress"]) == ("failed", "out of memory", 1)
+    assert snapshot["result"] is None and not job.active
+
+
+def test_lookup_and_active_by_kind(manager):
+    release = threading.Event()
+    blocked = manager.submit("train", "long", lambda job: release.wait(5))
+    reviews = [manager.submit("review", f"topic {i}", lambda job: None) for i in range(2)]
+    assert manager.get(blocked.id) is blocked and manager.get("missing") is None
+    assert manager.jobs() == [blocked, *reviews]
+    assert manager.jobs([reviews[1].id, "missing", blocked.id]) == [reviews[1], blocked]
+    assert manager.active("train") == [blocked]
+    assert manager.active("review") == reviews
+    release.set()
+    for job in [blocked, *reviews]:
+        wait_finished(job)
+    assert manager.active() == []
+
+
+def test_only_the_newest_finished_jobs_are_kept(manager, monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_FINISHED_JOBS", 2)
+    finished = [manager.submit("review", f"topic {i}", lambda job: None) for i in range(4)]
+    for job in finished:
+        wait_finished(job)
+    release = threading.Event()
+    running = manager.submit("review", "running", lambda job: release.wait(5))
+    # Pruning happens on submit and never drops unfinished jobs
+    assert manager.jobs() == finished[2:] + [running]
+    queued = manager.submit("review", "queued", lambda job: None)
+    assert manager.jobs() == finished[2:] + [running, queued]
+    release.set()
+    wait_finished(queued)
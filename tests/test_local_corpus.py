@@ -0,0 +1,52 @@
+import numpy as np
+from collections import Counter
+from conftest import ABSTRACTS
+from utils.local_corpus import LocalCorpus, ingest, tokenize
+
+
+def reference_bm25(query, documents, k1=1.5, b=0.75):
+    """Okapi BM25 computed document by document."""
+    docs = [Counter(tokenize(doc)) for doc in documents]
+    avg_len = np.mean([sum(doc.values()) for doc in docs])
+    scores = np.zeros(len(docs))
+    for term in set(tokenize(query)):
+        df = sum(term in doc for doc in docs)
+        if not df:
+            continue
+        idf = np.log(1.0 + (len(docs) - df + 0.5) / (df + 0.5))
+        for i, doc in enumerate(docs):
+            tf = doc[term]
+            scores[i] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * sum(doc.values()) / avg_len))
+    return scores
+
+
+def test_ingest_skips_bad_lines_and_round_trips_papers(arxiv_dump, tmp_path):
+    corpus = ingest(arxiv_dump, str(tmp_path / "corpus"))
+    assert len(corpus) == len(ABSTRACTS)
+    paper = corpus.get_papers([3])[0]
+    assert paper.title == "Paper 3" and paper.summary == ABSTRACTS[3]
+    assert paper.published.year == 2018 and paper.categories == ["cs.CV"]
+    assert [a.name for a in paper.authors] == ["Ada Lovelace", "Alan Turing"]
+    assert paper.entry_id == "http://arxiv.org/abs/1801.00003v1"
+    assert len(ingest(arxiv_dump, str(tmp_path / "limited"), limit=2)) == 2
+
+
+def test_bm25_matches_reference(arxiv_dump, tmp_path):
+    corpus = ingest(arxiv_dump, str(tmp_path / "corpus"))
+    documents = [f"Paper {i} {abstract}" for i, abstract in enumerate(ABSTRACTS)]
+    for query in ["reinforcement learning policy", "graph networks", "protein", "unknown words only"]:
+        np.testing.assert_allclose(corpus.bm25_scores(query), reference_bm25(query, documents), rtol=1e-5)
+
+
+def test_search_ranks_and_filters(arxiv_dump, tmp_path):
+    ingest(arxiv_dump, str(tmp_path / "corpus"))
+    corpus = LocalCorpus(str(tmp_path / "corpus"))
+    documents = [f"Paper {i} {abstract}" for i, abstract in enumerate(ABSTRACTS)]
+    expected = np.argsort(-reference_bm25("reinforcement learning", documents), kind="stable")[:3]
+    assert [p.title for p in corpus.search("reinforcement learning", max_results=3)] == [f"Paper {i}" for i in expected]
+    # Years 2015..2020 by document; categories are matched through the CSR lists
+    assert [p.title for p in corpus.search("reinforcement learning", from_year=2016, to_year=2018)] == ["Paper 2"]
+    assert {p.title for p in corpus.search("networks prediction", categories=["q-bio.BM"])} == {"Paper 1", "Paper 5"}
+    assert corpus.search("reinforcement", categories=["math.AG"]) == []
+    mask = corpus.filter_mask(2017, None, ["cs.LG", "cs.CV"])
+    np.testing.assert_array_equal(mask, [False, False, True, True, True, False])
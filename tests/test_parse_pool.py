@@ -0,0 +1,38 @@
+import threading
+from utils.full_text_parser import PDFParsePool
+
+
+def sources(n, prefix="doc"):
+    # Not PDFs: every document parses to an empty text
+    return ((f"{prefix}{i}", b"not a pdf") for i in range(n))
+
+
+def test_imap_yields_every_key():
+    with PDFParsePool(processes=2, timeout=30) as pool:
+        results = dict(pool.imap(sources(5)))
+    assert results == {f"doc{i}": "" for i in range(5)}
+
+
+def test_concurrent_callers_share_the_pool():
+    results = {}
+    with PDFParsePool(processes=2, timeout=30) as pool:
+        def run(prefix):
+            results[prefix] = [key for key, _ in pool.imap(sources(4, prefix))]
+        threads = [threading.Thread(target=run, args=(prefix,)) for prefix in ("a", "b", "c")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+        assert not any(thread.is_alive() for thread in threads)
+    assert {prefix: sorted(keys) for prefix, keys in results.items()} == \
+        {prefix: [f"{prefix}{i}" for i in range(4)] for prefix in ("a", "b", "c")}
+
+
+def test_reentrant_imap_does_not_deadlock():
+    with PDFParsePool(processes=2, timeout=30) as pool:
+        outer = []
+        for key, _ in pool.imap(sources(2, "outer")):
+            outer.append(key)
+            # Parsing from inside the consumer of another imap() must not wait on it
+            assert pool.parse(b"not a pdf") == ""
+    assert sorted(outer) == ["outer0", "outer1"]
@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils import pdf_fetcher
+from utils.pdf_fetcher import fetch_pdf, fetch_pdfs, get_session, pdf_url
+
+
+class ArxivStandIn(ThreadingHTTPServer):
+    """Serves /pdf/<id>.pdf like arxiv.org: 'missing' is 404, 'flaky' fails once with 503."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delay = 0.0
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            attempts = server.requests.count(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            paper_id = self.path[len("/pdf/"):-len(".pdf")]
+            if paper_id == "missing" or (paper_id == "flaky" and attempts == 1):
+                self.send_response(404 if paper_id == "missing" else 503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = f"%PDF-1.4 {paper_id}".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(pdf_fetcher._rate_limiter, "min_interval", 0.0)
+    httpd = ArxivStandIn()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_pdf_url_maps_abstract_urls():
+    assert pdf_url("http://arxiv.org/abs/2503.07152v1") == "http://arxiv.org/pdf/2503.07152v1.pdf"
+    assert pdf_url("http://arxiv.org/pdf/2503.07152v1.pdf") == "http://arxiv.org/pdf/2503.07152v1.pdf"
+
+
+def test_fetch_pdf_retries_server_errors(server):
+    httpd, base = server
+    assert fetch_pdf(f"{base}/abs/flaky") == b"%PDF-1.4 flaky"
+    assert httpd.requests == ["/pdf/flaky.pdf", "/pdf/flaky.pdf"]
+
+
+def test_fetch_pdfs_downloads_concurrently_and_reports_failures(server):
+    httpd, base = server
+    httpd.delay = 0.2
+    ids = [f"{base}/abs/{i}" for i in range(8)] + [f"{base}/abs/missing", f"{base}/abs/0"]
+    start = time.perf_counter()
+    results = dict(fetch_pdfs(ids, max_concurrency=4))
+    elapsed = time.perf_counter() - start
+    assert results == {**{f"{base}/abs/{i}": f"%PDF-1.4 {i}".encode() for i in range(8)}, f"{base}/abs/missing": None}
+    # Duplicates are fetched once, and no more than max_concurrency requests run at a time
+    assert len(httpd.requests) == 9
+    assert 1 < httpd.max_in_flight <= 4
+    assert elapsed < 9 * httpd.delay
+
+
+def test_fetch_pdfs_streams_ids_from_a_growing_queue(server):
+    httpd, base = server
+    ids = queue.Queue()
+
+    def stream():
+        while True:
+            identifier = ids.get()
+            if identifier is None:
+                return
+            yield identifier
+
+    ids.put(f"{base}/abs/0")
+    results = fetch_pdfs(stream(), max_concurrency=2)
+    # The first download is yielded while the feeder is still waiting for more ids
+    assert next(results) == (f"{base}/abs/0", b"%PDF-1.4 0")
+    ids.put(f"{base}/abs/missing")
+    assert next(results) == (f"{base}/abs/missing", None)
+    ids.put(f"{base}/abs/0")
+    ids.put(None)
+    assert list(results) == []
+    assert httpd.requests == ["/pdf/0.pdf", "/pdf/missing.pdf"]
+
+
+def test_session_is_shared():
+    assert get_session() is get_session()
@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from agents.prisma_checker import PRISMAChecker
+from env.prisma_env import AGENTS, PRISMAEnv, PRISMAParallelEnv, ReviewEpisode, VectorPRISMAEnv
+
+DIM = 4
+
+
+def make_episode(num_papers, seed):
+    rng = np.random.default_rng(seed)
+    papers = [SimpleNamespace(title=f"Paper {seed}-{i}", summary=f"A method with results {i}",
+                              authors=[SimpleNamespace(name="A. Author")], entry_id=f"{seed}-{i}")
+              for i in range(num_papers)]
+    # Rewards encode (paper, action) so the tests can tell which entry an env returned
+    abstract_rewards = np.array([[seed + i / 10 + a / 100 for a in range(3)] for i in range(num_papers)]).reshape(-1, 3)
+    fulltext_rewards = -abstract_rewards[:, :2]
+    return ReviewEpisode(f"query {seed}", papers, rng.standard_normal(DIM),
+                         rng.standard_normal((num_papers, DIM)), rng.standard_normal((num_papers, DIM)),
+                         abstract_rewards, fulltext_rewards, np.arange(5) + seed * 10)
+
+
+@pytest.fixture(scope="module")
+def checker():
+    return PRISMAChecker(checklist_pdf_path="missing_checklist.pdf")
+
+
+@pytest.fixture
+def episodes():
+    return [make_episode(3, 1), make_episode(0, 2), make_episode(2, 3)]
+
+
+@pytest.mark.parametrize("env_class", [VectorPRISMAEnv, PRISMAParallelEnv, PRISMAEnv])
+def test_constructors_reject_empty_episode_lists(env_class, checker):
+    for episodes in ([], [make_episode(0, 1)]):
+        with pytest.raises(ValueError, match="non-empty episode"):
+            env_class(episodes, checker)
+
+
+def test_episode_shapes_are_checked():
+    with pytest.raises(ValueError, match="abstract_rewards"):
+        ReviewEpisode("q", [object()], np.zeros(DIM), np.zeros((1, DIM)), np.zeros((1, DIM)),
+                      np.zeros((2, 3)), np.zeros((1, 2)), np.zeros(5))
+
+
+def test_vector_env_steps_through_episodes(episodes, checker):
+    env = VectorPRISMAEnv(episodes, checker, num_envs=4, seed=0)
+    assert len(env.episodes) == 2
+    obs, _ = env.reset(seed=0)
+    assert obs["search"].shape == (4, DIM + 2)
+    for agent in ("title_abstract", "full_text", "prisma_checker"):
+        assert obs[agent].shape == (4, DIM)
+
+    lengths = env.lengths[env.episode_ids].copy()
+    ids = env.episode_ids.copy()
+    actions = {"search": np.full(4, 2), "title_abstract": np.array([0, 1, 2, 1]),
+               "full_text": np.ones(4, dtype=np.int64), "prisma_checker": np.zeros(4, dtype=np.int64)}
+    for step in range(int(lengths.max())):
+        _, rewards, terminations, truncations, infos = env.step(actions)
+        active = step < lengths
+        episode_seeds = np.array([env.episodes[i].query.split()[-1] for i in ids], dtype=float)
+        # Search is rewarded on an episode's first step only, with the chosen action's reward
+        np.testing.assert_array_equal(infos["search_mask"][active], step == 0)
+        if step == 0:
+            np.testing.assert_allclose(rewards["search"], episode_seeds * 10 + 2)
+        else:
+            assert not rewards["search"][active].any()
+        # Screening rewards come from the current paper; full text only for kept papers
+        np.testing.assert_allclose(rewards["title_abstract"][active],
+                                   (episode_seeds + step / 10 + actions["title_abstract"] / 100)[active], rtol=1e-6)
+        kept = actions["title_abstract"] > 0
+        np.testing.assert_array_equal(infos["full_text_mask"], kept)
+        assert not rewards["full_text"][~kept].any()
+        np.testing.assert_allclose(rewards["full_text"][kept & active],
+                                   -(episode_seeds + step / 10 + 0.01)[kept & active], rtol=1e-6)
+        # Episodes terminate after their last paper, where the PRISMA checker is scored
+        done = step == lengths - 1
+        np.testing.assert_array_equal(terminations["search"][active], done[active])
+        assert not truncations["search"].any()
+        finished = done & active
+        assert np.all((rewards["prisma_checker"][finished] >= 0) & (rewards["prisma_checker"][finished] <= 1))
+        assert not rewards["prisma_checker"][active & ~done].any()
+    # Finished episodes were replaced and restart at their first paper
+    assert (env.cursors < env.lengths[env.episode_ids]).all()
+
+
+def test_parallel_env_runs_one_episode(episodes, checker):
+    env = PRISMAParallelEnv(episodes, checker, seed=1)
+    obs, infos = env.reset(seed=1)
+    assert set(obs) == set(AGENTS) and obs["search"].shape == (DIM + 2,)
+    n = len(env.vector_env.episodes[env.vector_env.episode_ids[0]])
+    for step in range(n):
+        assert env.agents == AGENTS
+        obs, rewards, terminations, truncations, infos = env.step({agent: 1 for agent in AGENTS})
+        assert all(terminations[agent] == (step == n - 1) for agent in AGENTS)
+        assert (rewards["search"] != 0) == (step == 0)
+    assert env.agents == []
+    assert 0.0 <= rewards["prisma_checker"] <= 1.0
+
+
+def test_aec_env_turn_order_and_rewards(checker):
+    env = PRISMAEnv([make_episode(3, 1)], checker, seed=0)
+    env.reset(seed=0)
+    assert env.observe("search").shape == (DIM + 2,)
+    order, rewards = [], []
+    for agent in env.agent_iter(max_iter=50):
+        _, reward, termination, truncation, _ = env.last()
+        if termination or truncation:
+            env.step(None)
+            continue
+        order.append(agent)
+        action = {"search": 3, "title_abstract": 2 if len(order) == 3 else 0, "full_text": 1, "prisma_checker": 0}[agent]
+        env.step(action)
+        rewards.append(env.rewards[agent])
+    # Search once, screen three abstracts, read the one kept paper, then score the review
+    assert order == ["search", "title_abstract", "title_abstract", "title_abstract", "full_text", "prisma_checker"]
+    # Only the second paper is kept (action 2), so the full-text agent reads paper 1
+    np.testing.assert_allclose(rewards[:5], [13, 1.0, 1.12, 1.2, -1.11], rtol=1e-6)
+    assert 0.0 <= rewards[5] <= 1.0
+    assert env.agents == []
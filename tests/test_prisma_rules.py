@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+from agents.prisma_checker import PRISMAChecker
+from agents.prisma_rules import PRISMA_RULES, score_rules
+from utils.full_text_parser import CHECKLIST_ITEMS
+
+COLUMNS = ["Title", "Year", "URL", "Decision", "Abstract", "Score", "Authors"]
+ABSTRACTS = ["Background: we study bias.", "Our method has high confidence.", "Results are shown.",
+             "A plain abstract.", "Nothing to see here."]
+
+
+def baseline_items(metadata, results_df, checklist_data=()):
+    """Item scores of the if-chain that PRISMA_RULES replaced; raises where it used to."""
+    text_items = {
+        "abstract_structured": lambda: 0.8 if results_df["Abstract"].str.contains("background|method|result", case=False, regex=True).any() else 0.5,
+        "study_selection_process": lambda: 0.8 if results_df["Decision"].notnull().all() else 0.5,
+        "study_bias_assessment": lambda: 0.8 if any("bias" in abstract.lower() for abstract in results_df["Abstract"]) else 0.5,
+        "certainty_assessment": lambda: 0.7 if any("confidence" in abstract.lower() for abstract in results_df["Abstract"]) else 0.5,
+        "results_study_selection": lambda: 1.0 if not results_df.empty else 0.0,
+        "results_study_characteristics": lambda: 1.0 if results_df["Authors"].notnull().all() else 0.5,
+        "quality_assessment_performed": lambda: 0.8 if results_df["Score"].notnull().all() else 0.5,
+    }
+    metadata_items = {
+        "title_identifiable": 1.0 if metadata.get("query") else 0.0,
+        "eligibility_criteria": 1.0 if metadata.get("inclusion_criteria_clear") else 0.5,
+        "information_sources": 1.0 if metadata.get("databases_searched") else 0.8,
+        "search_strategy_documented": 1.0 if metadata.get("search_action") is not None else 0.0,
+        "inclusion_criteria_clear": 1.0 if metadata.get("inclusion_criteria_clear") else 0.5,
+        "exclusion_criteria_clear": 1.0 if metadata.get("exclusion_criteria_clear") else 0.5,
+        "search_date_reported": 1.0 if metadata.get("from_year") and metadata.get("to_year") else 0.0,
+    }
+    constants = {
+        "protocol_registered": 0.5, "data_collection_process": 0.7, "data_items_listed": 0.6,
+        "effect_measures": 0.5, "synthesis_methods": 0.5, "results_synthesis": 0.6,
+        "results_risk_of_bias": 0.5, "results_certainty_of_evidence": 0.5, "limitations_discussed": 0.7,
+        "funding_reported": 0.5, "results_synthesized": 0.6, "databases_searched": 1.0,
+        "grey_literature_included": 0.5, "language_restrictions": 0.5, "publication_restrictions": 0.5,
+        "data_availability_statement": 0.5, "conflict_of_interest": 0.5, "reviewer_agreement": 0.5,
+        "screening_process_described": 0.8, "data_extraction_systematic": 0.7, "study_flow_diagram": 0.5,
+        "sensitivity_analysis": 0.5, "subgroup_analysis": 0.5, "publication_bias_assessed": 0.5,
+        "certainty_assessment_method": 0.5, "synthesis_exploration": 0.5, "additional_analyses": 0.5,
+    }
+    return {item: text_items[item]() if item in text_items else metadata_items.get(item, constants.get(item))
+            for item in CHECKLIST_ITEMS if item not in checklist_data}
+
+
+def random_review(rng):
+    metadata = {key: rng.choice([None, 0, 1, "x"]) for key in
+                ["query", "inclusion_criteria_clear", "exclusion_criteria_clear", "databases_searched",
+                 "search_action", "from_year", "to_year"]}
+    metadata = {key: value for key, value in metadata.items() if rng.random() < 0.8}
+    n = int(rng.integers(0, 5))
+    rows = [{
+        "Title": f"Paper {i}", "Year": 2020, "URL": f"http://arxiv.org/abs/{i}",
+        "Decision": rng.choice(["Include", "Maybe", None]) if rng.random() < 0.3 else "Include",
+        "Abstract": str(rng.choice(ABSTRACTS)) if rng.random() < 0.9 else None,
+        "Score": float(rng.random()) if rng.random() < 0.9 else np.nan,
+        "Authors": "A. Author" if rng.random() < 0.9 else None,
+    } for i in range(n)]
+    shape = rng.random()
+    if shape < 0.1:
+        df = pd.DataFrame([])  # no rows and no columns
+    elif shape < 0.2:
+        df = pd.DataFrame({column: [] for column in COLUMNS})  # no rows, float columns
+    elif shape < 0.3:
+        df = pd.DataFrame(columns=COLUMNS)  # no rows, object columns
+    else:
+        df = pd.DataFrame(rows, columns=COLUMNS)
+    if rng.random() < 0.1:
+        df = df.drop(columns=[str(rng.choice(["Abstract", "Decision", "Authors", "Score"]))], errors="ignore")
+    return metadata, df
+
+
+def baseline_or_none(metadata, df, checklist_data=()):
+    # Deliberate change: a missing abstract counts as empty text instead of failing the review
+    if "Abstract" in df.columns and len(df):
+        df = df.assign(Abstract=df["Abstract"].fillna(""))
+    try:
+        return baseline_items(metadata, df, checklist_data)
+    except Exception:
+        return None
+
+
+@pytest.fixture(scope="module")
+def reviews():
+    rng = np.random.default_rng(0)
+    return [random_review(rng) for _ in range(500)]
+
+
+def test_rules_cover_the_checklist_in_order():
+    assert [rule.item for rule in PRISMA_RULES] == list(CHECKLIST_ITEMS)
+
+
+def test_rule_scores_match_baseline(reviews):
+    scores = score_rules(reviews)
+    for (metadata, df), row in zip(reviews, scores):
+        expected = baseline_or_none(metadata, df)
+        if expected is None:
+            assert np.isnan(row).all()
+        else:
+            np.testing.assert_array_equal(row, [expected[item] for item in CHECKLIST_ITEMS])
+
+
+@pytest.mark.parametrize("df", [
+    pd.DataFrame([]),
+    pd.DataFrame({column: [] for column in COLUMNS}),
+    pd.DataFrame(columns=COLUMNS),
+    pd.DataFrame([{"Title": "t", "Abstract": "a", "Decision": "Include", "Score": 1.0}]),
+    pd.DataFrame([{"Title": "t", "Abstract": None, "Decision": "Include", "Score": 1.0, "Authors": "x"}]),
+], ids=["no-columns", "zero-rows-float", "zero-rows-object", "missing-authors", "missing-abstract"])
+def test_edge_tables_match_baseline(df):
+    metadata = {"query": "q", "search_action": 0, "from_year": 2000, "to_year": 2025}
+    expected = baseline_or_none(metadata, df)
+    row = score_rules([(metadata, df)])[0]
+    if expected is None:
+        assert np.isnan(row).all()
+    else:
+        np.testing.assert_array_equal(row, [expected[item] for item in CHECKLIST_ITEMS])
+
+
+@pytest.mark.parametrize("checklist_data", [{}, {"results_study_selection": 0.0, "quality_assessment_performed": 1.0}])
+def test_prisma_scores_match_baseline(reviews, checklist_data):
+    checker = PRISMAChecker(checklist_pdf_path="missing_checklist.pdf")
+    checker.checklist_data = checklist_data
+    scores = checker.evaluate_prisma_scores(reviews)
+    for (metadata, df), score in zip(reviews, scores):
+        items = baseline_or_none(metadata, df, checklist_data)
+        # The baseline returned 0.0 for any review it failed to score
+        expected = 0.0 if items is None else checker.reward_system.compute_prisma_reward({**items, **checklist_data})
+        assert score == pytest.approx(expected)
+    assert checker.evaluate_prisma_score([], *reviews[0]) == pytest.approx(scores[0])
@@ -0,0 +1,83 @@
+import numpy as np
+from agents.replay_buffer import PrioritizedReplayBuffer, ReplayBuffer, SumTree
+
+STATE_DIM = 3
+
+
+def transitions(n, start=0):
+    states = np.arange(start, start + n, dtype=np.float32)[:, None].repeat(STATE_DIM, axis=1)
+    return states, np.arange(start, start + n) % 3, np.ones(n, dtype=np.float32), states + 1, np.zeros(n, dtype=bool)
+
+
+def test_ring_buffer_overwrites_oldest():
+    buffer = ReplayBuffer(4, STATE_DIM, seed=0)
+    for state, action, reward, next_state, done in zip(*transitions(6)):
+        buffer.add(state, action, reward, next_state, done)
+    assert len(buffer) == 4 and buffer.pos == 2
+    assert sorted(buffer.states[:, 0].tolist()) == [2, 3, 4, 5]
+    batch = buffer.sample(16)
+    np.testing.assert_array_equal(batch.next_states, batch.states + 1)
+    np.testing.assert_array_equal(batch.weights, np.ones(16))
+
+
+def test_add_batch_matches_add():
+    one, many = ReplayBuffer(5, STATE_DIM), ReplayBuffer(5, STATE_DIM)
+    states, actions, rewards, next_states, dones = transitions(7)
+    dones[::2] = True
+    for transition in zip(states, actions, rewards, next_states, dones):
+        one.add(*transition)
+    many.add_batch(states[:3], actions[:3], rewards[:3], next_states[:3], dones[:3])
+    many.add_batch(states[3:], actions[3:], rewards[3:], next_states[3:], dones[3:])
+    for name in ("states", "actions", "rewards", "dones"):
+        np.testing.assert_array_equal(getattr(one, name), getattr(many, name))
+    live = ~one.dones
+    np.testing.assert_array_equal(one.next_states[live], many.next_states[live])
+    assert (one.pos, one.size) == (many.pos, many.size)
+
+
+def test_terminal_only_buffer_does_not_allocate_next_states():
+    buffer = ReplayBuffer(4, STATE_DIM)
+    states, actions, rewards, next_states, _ = transitions(3)
+    buffer.add_batch(states, actions, rewards, next_states, np.ones(3, dtype=bool))
+    assert buffer.next_states is None
+    batch = buffer.sample(2)
+    np.testing.assert_array_equal(batch.next_states, batch.states)
+
+
+def test_sum_tree_sums_and_finds_prefixes():
+    tree = SumTree(5)
+    priorities = np.array([1.0, 0.0, 2.0, 3.0, 4.0])
+    tree.update(np.arange(5), priorities)
+    assert tree.total == priorities.sum()
+    np.testing.assert_array_equal(tree.get([2, 4]), [2.0, 4.0])
+    # Prefix sums 1 | 1 | 3 | 6 | 10: each value lands in the leaf whose range holds it
+    np.testing.assert_array_equal(tree.find([0.5, 1.0, 1.5, 3.0, 3.5, 6.5, 9.99]), [0, 0, 2, 2, 3, 4, 4])
+    tree.update([4], [0.0])
+    assert tree.total == 6.0
+
+
+def test_sum_tree_with_one_leaf():
+    tree = SumTree(1)
+    tree.update([0], [2.5])
+    assert tree.total == 2.5
+    np.testing.assert_array_equal(tree.find([1.0]), [0])
+
+
+def test_prioritized_sampling_follows_priorities():
+    buffer = PrioritizedReplayBuffer(8, STATE_DIM, alpha=1.0, beta=1.0, beta_increment=0.0, epsilon=0.0, seed=0)
+    buffer.add_batch(*transitions(4))
+    buffer.update_priorities(np.arange(4), np.array([0.0, 1.0, 0.0, 3.0]))
+    batch = buffer.sample(4000)
+    assert set(np.unique(batch.indices)) == {1, 3}
+    assert abs(np.mean(batch.indices == 3) - 0.75) < 0.03
+    # Importance weights undo the sampling bias: rarer transitions weigh more
+    assert batch.weights.max() == 1.0
+    np.testing.assert_allclose(batch.weights[batch.indices == 3], 1 / 3, rtol=1e-5)
+
+
+def test_new_transitions_get_max_priority():
+    buffer = PrioritizedReplayBuffer(4, STATE_DIM, alpha=1.0, epsilon=0.0)
+    buffer.add_batch(*transitions(2))
+    buffer.update_priorities(np.array([0]), np.array([5.0]))
+    idx = buffer.add(*(column[0] for column in transitions(1, start=2)))
+    assert buffer.tree.get([idx])[0] == 5.0
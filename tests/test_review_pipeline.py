@@ -0,0 +1,144 @@
+import re
+import random
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from agents import review_pipeline
+from agents.review_pipeline import ReviewPipeline
+
+
+def paper(i):
+    return SimpleNamespace(entry_id=f"http://arxiv.org/abs/{i}", title=f"Paper {i}", summary=f"abstract {i}",
+                           authors=[SimpleNamespace(name="A. Author")], published=datetime(2020, 1, 1))
+
+
+def index_of(text):
+    """Paper index at the end of an abstract, full text or entry id."""
+    return int(re.findall(r"\d+", text)[-1])
+
+
+class Embedder:
+    def embed_text(self, text):
+        return np.zeros(4, dtype=np.float32)
+
+    def embed_many(self, texts):
+        return np.array([[index_of(text)] for text in texts], dtype=np.float32)
+
+
+class Agent:
+    """Screens by paper index: abstracts i % 3 (Exclude/Maybe/Include), full texts Include if i is even."""
+    def __init__(self, decide):
+        self.decide = decide
+
+    def act(self, state, training=False):
+        return 0
+
+    def act_batch(self, embeds, training=False):
+        return np.array([self.decide(int(e[0])) for e in embeds]), None
+
+
+class Checker:
+    checklist_data = {}
+
+    def evaluate_search_reward(self, papers, query_embedding, prisma_data):
+        return 0.5
+
+    def evaluate_abstract_rewards(self, abstracts, actions, prisma_data=None):
+        return np.full(len(abstracts), 0.4)
+
+    def evaluate_fulltext_rewards(self, texts, actions, ground_truths, citation_counts, prisma_data):
+        return np.full(len(texts), 0.8)
+
+
+def make_pipeline(**kwargs):
+    return ReviewPipeline(Agent(lambda i: 0), Agent(lambda i: i % 3), Agent(lambda i: int(i % 2 == 0)),
+                          Checker(), Embedder(), **kwargs)
+
+
+@pytest.fixture
+def papers(monkeypatch):
+    found = [paper(i) for i in range(30)]
+    monkeypatch.setattr(review_pipeline, "search_arxiv", lambda *args, **kwargs: list(found))
+    return found
+
+
+def run_with_timeout(pipeline, timeout=10.0, **kwargs):
+    out = {}
+    thread = threading.Thread(target=lambda: out.update(result=pipeline.run("rl review", 2020, 2021, **kwargs)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline did not shut down"
+    return out["result"]
+
+
+def test_results_follow_search_order_and_one_parse_call_serves_the_review(papers, monkeypatch):
+    calls = []
+
+    def parse_arxiv_pdfs(identifiers, max_concurrency=1):
+        # Consume ids lazily and finish them out of order, like concurrent downloads
+        calls.append(max_concurrency)
+        pending = []
+        rng = random.Random(0)
+        for identifier in identifiers:
+            pending.append(identifier)
+            if len(pending) >= 3:
+                time.sleep(0.001)
+                finished = pending.pop(rng.randrange(len(pending)))
+                yield finished, f"full text {index_of(finished)}"
+        rng.shuffle(pending)
+        for identifier in pending:
+            yield identifier, f"full text {index_of(identifier)}"
+
+    monkeypatch.setattr(review_pipeline, "parse_arxiv_pdfs", parse_arxiv_pdfs)
+    emitted = []
+    result = run_with_timeout(make_pipeline(fetch_workers=3, screen_batch_size=4, queue_size=2), on_result=emitted.append)
+
+    assert calls == [3]
+    assert list(result.results) == [p.entry_id for p in papers]
+    assert sorted(row["URL"] for row in emitted) == sorted(result.results)
+    for i, p in enumerate(papers):
+        row = result.results[p.entry_id]
+        if i % 3 == 0:
+            assert (row["Stage"], row["Decision"], row["Score"]) == ("title_abstract", "Exclude", 0.4)
+        else:
+            assert (row["Stage"], row["Decision"], row["Score"]) == ("full_text", "Include" if i % 2 == 0 else "Exclude", 0.6)
+
+
+def test_fetch_failure_keeps_abstract_decisions_without_hanging(papers, monkeypatch):
+    def parse_arxiv_pdfs(identifiers, max_concurrency=1):
+        for n, identifier in enumerate(identifiers):
+            if n == 2:
+                raise RuntimeError("connection reset")
+            yield identifier, f"full text {index_of(identifier)}"
+
+    monkeypatch.setattr(review_pipeline, "parse_arxiv_pdfs", parse_arxiv_pdfs)
+    # A queue of one forces the abstract stage to block on the fetch stage after the failure
+    result = run_with_timeout(make_pipeline(screen_batch_size=1, queue_size=1))
+
+    assert list(result.results) == [p.entry_id for p in papers]
+    stages = [row["Stage"] for row in result.results.values()]
+    assert stages.count("full_text") == 2
+    kept = [row for i, row in enumerate(result.results.values()) if i % 3 and row["Stage"] == "title_abstract"]
+    assert kept and {row["Decision"] for row in kept} == {"Maybe", "Include"}
+
+
+def test_screening_failure_is_contained(papers, monkeypatch):
+    monkeypatch.setattr(review_pipeline, "parse_arxiv_pdfs",
+                        lambda identifiers, max_concurrency=1: ((i, "full text 1") for i in identifiers))
+    pipeline = make_pipeline(queue_size=1)
+    pipeline.fulltext_agent.act_batch = lambda embeds, training=False: 1 / 0
+    result = run_with_timeout(pipeline)
+    assert len(result.results) == len(papers)
+    assert {row["Stage"] for row in result.results.values()} == {"title_abstract"}
+
+
+def test_search_failure_returns_no_results(monkeypatch):
+    def search_arxiv(*args, **kwargs):
+        raise RuntimeError("arXiv unavailable")
+
+    monkeypatch.setattr(review_pipeline, "search_arxiv", search_arxiv)
+    result = run_with_timeout(make_pipeline())
+    assert result.papers == [] and result.results == {}
@@ -0,0 +1,122 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from screening_service import MicroBatcher, ScreeningService, arxiv_abs_url, make_server
+
+
+def test_batcher_coalesces_requests_and_slices_results():
+    calls = []
+
+    def fn(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(fn, max_batch_size=100, max_latency_ms=200)
+    try:
+        futures = [batcher.submit([i, i + 100]) for i in range(5)]
+        results = [future.result(timeout=10) for future in futures]
+    finally:
+        batcher.close()
+    assert [items for items, _ in results] == [[i * 10, (i + 100) * 10] for i in range(5)]
+    assert len(calls) == 1 and all(size == 10 for _, size in results)
+    assert batcher.stats.summary()["requests"] == 5
+
+
+def test_batcher_caps_batch_size():
+    sizes = []
+    batcher = MicroBatcher(lambda items: sizes.append(len(items)) or list(items), max_batch_size=4, max_latency_ms=200)
+    try:
+        futures = [batcher.submit([i, i]) for i in range(4)]
+        assert [future.result(timeout=10)[0] for future in futures] == [[i, i] for i in range(4)]
+        # A request larger than the cap runs on its own
+        assert batcher([0] * 9) == ([0] * 9, 9)
+    finally:
+        batcher.close()
+    assert max(sizes[:-1]) <= 4 and sizes[-1] == 9
+
+
+def test_batcher_failure_reaches_every_request():
+    def fn(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(fn, max_latency_ms=50)
+    try:
+        futures = [batcher.submit(["a"]), batcher.submit(["b"])]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="model failed"):
+                future.result(timeout=10)
+        assert batcher([]) == ([], 0)
+    finally:
+        batcher.close()
+    assert batcher.stats.summary()["errors"] == 2
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2503.07152v1", "https://arxiv.org/abs/2503.07152v1"),
+    ("http://arxiv.org/abs/2503.07152v1", "https://arxiv.org/abs/2503.07152v1"),
+    ("https://arxiv.org/pdf/2503.07152.pdf", "https://arxiv.org/abs/2503.07152"),
+    ("cs/0112017", "https://arxiv.org/abs/cs/0112017"),
+])
+def test_arxiv_urls_are_normalized(value, expected):
+    assert arxiv_abs_url(value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    "/etc/passwd", "file:///etc/passwd", "http://169.254.169.254/latest/meta-data",
+    "http://arxiv.org.example.com/abs/2503.07152", "https://arxiv.org/abs/../../etc/passwd", 42,
+])
+def test_other_urls_are_rejected(value):
+    with pytest.raises(ValueError):
+        arxiv_abs_url(value)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # The service without its models: full texts are screened by their length
+    service = ScreeningService.__new__(ScreeningService)
+    service.batchers = {
+        "abstracts": MicroBatcher(lambda items: [len(text) for text in items]),
+        "fulltext": MicroBatcher(lambda documents: [len(text) for text, _ in documents]),
+    }
+    fetched = []
+
+    def parse_arxiv_pdfs(urls):
+        fetched.extend(urls)
+        return [(url, "full text") for url in urls]
+
+    import utils.full_text_parser
+    monkeypatch.setattr(utils.full_text_parser, "parse_arxiv_pdfs", parse_arxiv_pdfs)
+    httpd = make_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", fetched
+    httpd.shutdown()
+    httpd.server_close()
+    service.close()
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_fulltext_endpoint_fetches_arxiv_urls(server):
+    base, fetched = server
+    status, body = post(base + "/screen/fulltext", {"documents": [{"text": "abc"}, {"url": "2503.07152v1"}]})
+    assert status == 200
+    assert body["results"] == [3, len("full text")]
+    assert fetched == ["https://arxiv.org/abs/2503.07152v1"]
+
+
+def test_fulltext_endpoint_rejects_non_arxiv_urls(server):
+    base, fetched = server
+    status, body = post(base + "/screen/fulltext",
+                        {"documents": [{"url": "2503.07152v1"}, {"url": "/etc/passwd"}]})
+    assert status == 400 and "arXiv" in body["error"]
+    assert fetched == []
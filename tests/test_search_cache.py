@@ -0,0 +1,49 @@
+import sqlite3
+import time
+import pytest
+from utils import search_cache
+from utils.search_cache import SearchCache, get_search_cache
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache" / "arxiv_search.sqlite")
+    monkeypatch.setattr(search_cache, "ARXIV_CACHE_PATH", path)
+    monkeypatch.setattr(search_cache, "_cache", None)
+    return path
+
+
+def keys(path):
+    with sqlite3.connect(path) as conn:
+        return {key for key, in conn.execute("SELECT key FROM searches")}
+
+
+def test_expired_entries_are_misses_and_overwritten(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite"), ttl_seconds=60)
+    key = SearchCache.make_key(query="rl", from_year=2020, to_year=2021, max_results=10)
+    assert key == SearchCache.make_key(max_results=10, to_year=2021, from_year=2020, query="rl")
+    assert cache.get(key) is None
+    cache.put(key, [{"entry_id": "a"}])
+    assert cache.get(key) == [{"entry_id": "a"}]
+    cache.ttl_seconds = -1
+    assert cache.get(key) is None
+    cache.ttl_seconds = 60
+    cache.put(key, [{"entry_id": "b"}])
+    assert cache.get(key) == [{"entry_id": "b"}]
+
+
+def test_opening_the_shared_cache_purges_expired_entries(cache_path):
+    old = SearchCache(cache_path)
+    old.put("fresh", [])
+    old.put("stale", [])
+    with old._conn:
+        old._conn.execute("UPDATE searches SET created = ? WHERE key = 'stale'", (time.time() - old.ttl_seconds - 1,))
+
+    cache = get_search_cache()
+    assert cache is get_search_cache()
+    assert keys(cache_path) == {"fresh"}
+
+
+def test_disabled_cache(monkeypatch):
+    monkeypatch.setattr(search_cache, "ARXIV_CACHE_PATH", "")
+    assert get_search_cache() is None
@@ -0,0 +1,160 @@
+import os
+import sys
+import queue
+import time
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import get_logger
+
+logger = get_logger("actor_learner")
+
+AGENT_NAMES = ("search", "title_abstract", "full_text")
+
+
+def _dqn_agents(trainer) -> dict:
+    return {"search": trainer.search_agent.agent, "title_abstract": trainer.abstract_agent.agent,
+            "full_text": trainer.fulltext_agent.agent}
+
+
+def _actor(actor_id, tasks, transitions, policies, epsilons, version, model_dir, checklist_pdf_path, torch_threads):
+    """
+    Actor process: takes training data entries from `tasks`, runs search, PDF parsing,
+    embedding and action selection with its copy of the policy, and pushes the resulting
+    transitions to `transitions`. The policy is refreshed from the learner's shared
+    networks whenever their version changes.
+    """
+    torch.set_num_threads(torch_threads)
+    # The embedding cache has a single writing process; actors only read it
+    import utils.embedding_service as embedding_service
+    embedding_service.EMBEDDING_CACHE_READ_ONLY = True
+    from trainer.train_agents import PRISMAAgentTrainer
+    trainer = PRISMAAgentTrainer(model_dir=model_dir, checklist_pdf_path=checklist_pdf_path)
+    agents = _dqn_agents(trainer)
+    local_version = -1
+    try:
+        while True:
+            data = tasks.get()
+            if data is None:
+                break
+            if version.value != local_version:
+                with version.get_lock():
+                    local_version = version.value
+                    for i, name in enumerate(AGENT_NAMES):
+                        agents[name].q_network.load_state_dict(policies[name].state_dict())
+                        agents[name].epsilon = epsilons[i]
+            try:
+                result = trainer.collect_transitions(data, training=True)
+            except Exception as e:
+                logger.error(f"Actor {actor_id} failed on query '{data.get('query')}': {e}")
+                continue
+            transitions.put((actor_id, result))
+    finally:
+        if trainer.recorder:
+            trainer.recorder.flush()
+        transitions.put((actor_id, None))
+
+
+def run_actor_learner(trainer, training_data: list, num_actors: int = 4, sync_every: int = 50,
+                      updates_per_transition: float = 0.25, start_method: str = "spawn",
+                      actor_torch_threads: int = 1):
+    """
+    Train the trainer's agents with several actor processes feeding one learner.
+
+    Actors run the I/O- and embedding-heavy part of each query in parallel; this process
+    is the learner, inserting their transitions into the agents' replay buffers and running
+    gradient steps whenever a buffer can sample. Every sync_every learner updates the
+    current Q-networks and epsilons are published to the actors through shared memory.
+    Args:
+        trainer: PRISMAAgentTrainer whose agents are trained and saved
+        training_data: Entries for PRISMAAgentTrainer.collect_transitions, one task each
+        num_actors: Actor processes
+        sync_every: Learner updates between policy publications
+        updates_per_transition: Gradient steps per received transition; bounds how far the
+            learner runs ahead of the data while it waits for actors
+        start_method: multiprocessing start method
+        actor_torch_threads: torch intra-op threads per actor
+    """
+    ctx = mp.get_context(start_method)
+    agents = _dqn_agents(trainer)
+    policies = {}
+    for name, agent in agents.items():
+        policies[name] = agent.build_network().eval()
+        policies[name].load_state_dict(agent.q_network.state_dict())
+        policies[name].share_memory()
+    epsilons = ctx.Array("d", [agents[name].epsilon for name in AGENT_NAMES], lock=False)
+    version = ctx.Value("i", 0)
+
+    tasks = ctx.Queue()
+    transitions = ctx.Queue(maxsize=num_actors * 4)
+    for data in training_data:
+        tasks.put(data)
+    for _ in range(num_actors):
+        tasks.put(None)
+
+    actors = [
+        ctx.Process(target=_actor, args=(i, tasks, transitions, policies, epsilons, version, trainer.model_dir,
+                                         trainer.checklist_pdf_path, actor_torch_threads), daemon=True)
+        for i in range(num_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    def publish():
+        with version.get_lock():
+            for i, name in enumerate(AGENT_NAMES):
+                policies[name].load_state_dict(agents[name].q_network.state_dict())
+                epsilons[i] = agents[name].epsilon
+            version.value += 1
+
+    finished = queries = updates = 0
+    update_budget = 0.0
+    prisma_total = 0.0
+    start = time.time()
+    while finished < num_actors:
+        can_train = update_budget >= 1.0 and any(len(agent.memory) >= agent.batch_size for agent in agents.values())
+        try:
+            message = transitions.get_nowait() if can_train else transitions.get(timeout=1.0)
+        except queue.Empty:
+            message = None
+            if not can_train and not any(actor.is_alive() for actor in actors):
+                logger.error("All actors exited without finishing")
+                break
+
+        if message is not None:
+            actor_id, result = message
+            if result is None:
+                finished += 1
+                continue
+            for name in AGENT_NAMES:
+                states, actions, rewards = result[name]
+                if len(actions):
+                    agents[name].remember_batch(states, actions, rewards, states, np.ones(len(actions), dtype=bool))
+                    update_budget += updates_per_transition * len(actions)
+            queries += 1
+            prisma_total += result["prisma_score"]
+            logger.info(f"Learner received query {queries}/{len(training_data)} from actor {actor_id} "
+                        f"({updates} updates, {queries / (time.time() - start):.2f} queries/s)")
+
+        if can_train:
+            for agent in agents.values():
+                agent.replay()
+            updates += 1
+            update_budget -= 1.0
+            if updates % sync_every == 0:
+                publish()
+
+    for actor in actors:
+        actor.join(timeout=10)
+    logger.info(f"Actor/learner training done: {queries} queries, {updates} updates, "
+                f"PRISMA Score={prisma_total / max(queries, 1):.3f}")
+
+    try:
+        trainer.search_agent.save_model()
+        trainer.abstract_agent.save_model()
+        trainer.fulltext_agent.save_model()
+        logger.info("Saved models after actor/learner training")
+    except Exception as e:
+        logger.error(f"Failed to save models after actor/learner training: {e}")
@@ -10,8 +10,10 @@ from agents.full_text_agent import FullTextAgent
 from agents.prisma_checker import PRISMAChecker
 from rewards.enhanced_reward_system import EnhancedRewardSystem
 from utils.arxiv_interface import search_arxiv
-from utils.full_text_parser import parse_arxiv_pdf
+from utils.full_text_parser import parse_arxiv_pdfs
 from utils.logger import get_logger
+from env.prisma_env import ReviewEpisode, VectorPRISMAEnv
+from agents.trajectory_log import TrajectoryRecorder, get_trajectory_recorder, load_into_buffer
 
 # Ensure parent directory is in path for module imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -19,12 +21,13 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 logger = get_logger("prisma_trainer")
 
 class PRISMAAgentTrainer:
-    def __init__(self, model_dir: str = None, checklist_pdf_path: str = None):
+    def __init__(self, model_dir: str = None, checklist_pdf_path: str = None, trajectory_dir: str = None):
         """
         Initialize the trainer with agents, PRISMA checker, and reward system.
         Args:
             model_dir: Directory to save/load models (defaults to env variable or 'models')
             checklist_pdf_path: Path to PRISMA checklist PDF (defaults to env variable or 'PRISMA_2020_checklist.pdf')
+            trajectory_dir: Record transitions to this directory (defaults to TRAJECTORY_DIR; off if unset)
         """
         self.model_dir = model_dir or os.getenv("MODEL_DIR", "models")
         self.checklist_pdf_path = checklist_pdf_path or os.getenv("PRISMA_CHECKLIST_PATH", "PRISMA_2020_checklist.pdf")
@@ -37,16 +40,18 @@ class PRISMAAgentTrainer:
         # Initialize PRISMA checker and reward system
         self.prisma = PRISMAChecker(checklist_pdf_path=self.checklist_pdf_path)
         self.reward_system = EnhancedRewardSystem()
+        self.recorder = TrajectoryRecorder(trajectory_dir) if trajectory_dir else get_trajectory_recorder()
 
         # Create model directory if it doesn't exist
         os.makedirs(self.model_dir, exist_ok=True)
 
-    def train(self, training_data: list, epochs: int = 10):
+    def train(self, training_data: list, epochs: int = 10, on_epoch=None):
         """
         Train agents sequentially with PRISMA checklist-based rewards.
         Args:
             training_data: List of dicts with query, papers, ground truth, etc.
             epochs: Number of training epochs
+            on_epoch: Called with the 1-based epoch number and its average metrics after each epoch
         """
         for epoch in range(epochs):
             total_search_reward = 0.0
@@ -54,6 +59,7 @@ class PRISMAAgentTrainer:
             total_fulltext_reward = 0.0
             total_prisma_score = 0.0
             num_samples = 0
+            reviews = []
 
             for data in training_data:
                 query = data["query"]
@@ -71,6 +77,9 @@ class PRISMAAgentTrainer:
                     search_action = self.search_agent.act(search_state, training=True)
                     search_reward = self.prisma.evaluate_search_reward(papers, query_embedding, human_feedback)
                     self.search_agent.remember(search_state, search_action, search_reward, search_state, True)
+                    if self.recorder:
+                        self.recorder.record("search", search_state, search_action, search_reward, search_state, True,
+                                             {"query": query})
                     self.search_agent.train()
                     total_search_reward += search_reward
                 except Exception as e:
@@ -79,22 +88,25 @@ class PRISMAAgentTrainer:
 
                 # Step 2: Title/Abstract Filter Agent
                 filtered_papers = []
-                results = []
+                results = {}  # entry_id -> result row
                 try:
-                    for i, paper in enumerate(papers):
-                        paper_embed = self.reward_system.embed_text(paper.summary)
+                    abstract_embeds = self.reward_system.embed_many([paper.summary for paper in papers])
+                    for i, (paper, paper_embed) in enumerate(zip(papers, abstract_embeds)):
                         abstract_action = self.abstract_agent.act(paper_embed, training=True)
                         abstract_reward = self.prisma.evaluate_abstract_reward(
                             paper.summary, abstract_action, data["ground_truth_labels"].get(i)
                         )
                         self.abstract_agent.remember(paper_embed, abstract_action, abstract_reward, paper_embed, True)
+                        if self.recorder:
+                            self.recorder.record("title_abstract", paper_embed, abstract_action, abstract_reward,
+                                                 paper_embed, True, {"query": query, "entry_id": paper.entry_id})
                         self.abstract_agent.train()
                         total_abstract_reward += abstract_reward
                         num_samples += 1
 
                         if abstract_action in [1, 2]:  # Maybe or Include
                             filtered_papers.append((paper, i))
-                            results.append({
+                            results[paper.entry_id] = {
                                 "Title": paper.title,
                                 "Year": paper.published.year,
                                 "URL": paper.entry_id,
@@ -102,15 +114,17 @@ class PRISMAAgentTrainer:
                                 "Abstract": paper.summary,
                                 "Score": abstract_reward,
                                 "Authors": ", ".join([a.name for a in paper.authors])
-                            })
+                            }
                 except Exception as e:
                     logger.error(f"Abstract agent processing failed for query '{query}': {e}")
                     continue
 
                 # Step 3: Full Text Agent
                 try:
-                    for paper, idx in filtered_papers:
-                        full_text = parse_arxiv_pdf(paper.entry_id) or paper.summary
+                    filtered_by_id = {paper.entry_id: (paper, idx) for paper, idx in filtered_papers}
+                    for entry_id, full_text in parse_arxiv_pdfs(list(filtered_by_id)):
+                        paper, idx = filtered_by_id[entry_id]
+                        full_text = full_text or paper.summary
                         full_text_embed = self.reward_system.embed_text(full_text)
                         fulltext_action = self.fulltext_agent.act(full_text_embed, training=True)
                         citation_count = paper.citation_count if hasattr(paper, 'citation_count') else 0
@@ -118,37 +132,35 @@ class PRISMAAgentTrainer:
                             full_text, fulltext_action, data["ground_truth_labels"].get(idx), citation_count
                         )
                         self.fulltext_agent.remember(full_text_embed, fulltext_action, fulltext_reward, full_text_embed, True)
+                        if self.recorder:
+                            self.recorder.record("full_text", full_text_embed, fulltext_action, fulltext_reward,
+                                                 full_text_embed, True, {"query": query, "entry_id": entry_id})
                         self.fulltext_agent.train()
                         total_fulltext_reward += fulltext_reward
                         num_samples += 1
 
                         # Update results with full-text decision
-                        for res in results:
-                            if res["Title"] == paper.title:
-                                res["Score"] = round((res["Score"] + fulltext_reward) / 2, 3)
-                                res["Decision"] = "Include" if fulltext_action == 1 else "Exclude"
-                                break
+                        res = results[entry_id]
+                        res["Score"] = round((res["Score"] + fulltext_reward) / 2, 3)
+                        res["Decision"] = "Include" if fulltext_action == 1 else "Exclude"
                 except Exception as e:
                     logger.error(f"Fulltext agent processing failed for query '{query}': {e}")
                     continue
 
-                # Step 4: PRISMA Compliance
-                try:
-                    metadata = {
-                        "query": query,
-                        "modified_query": query,
-                        "from_year": 2000,
-                        "to_year": 2025,
-                        "search_action": search_action,
-                        "inclusion_criteria_clear": 1.0,
-                        "exclusion_criteria_clear": 1.0
-                    }
-                    results_df = pd.DataFrame(results)
-                    prisma_score = self.prisma.evaluate_prisma_score(papers, metadata, results_df)
-                    total_prisma_score += prisma_score
-                except Exception as e:
-                    logger.error(f"PRISMA score evaluation failed for query '{query}': {e}")
-                    continue
+                # Step 4: PRISMA Compliance (scored for the whole epoch at once below)
+                metadata = {
+                    "query": query,
+                    "modified_query": query,
+                    "from_year": 2000,
+                    "to_year": 2025,
+                    "search_action": search_action,
+                    "inclusion_criteria_clear": 1.0,
+                    "exclusion_criteria_clear": 1.0
+                }
+                reviews.append((metadata, pd.DataFrame(list(results.values()))))
+
+            if reviews:
+                total_prisma_score = float(self.prisma.evaluate_prisma_scores(reviews).sum())
 
             # Compute average metrics
             avg_search_reward = total_search_reward / len(training_data) if training_data else 0.0
@@ -165,6 +177,13 @@ class PRISMAAgentTrainer:
                 f"PRISMA Score={avg_prisma_score:.3f}"
             )
 
+            if on_epoch:
+                on_epoch(epoch + 1, {"search_reward": avg_search_reward, "abstract_reward": avg_abstract_reward,
+                                     "fulltext_reward": avg_fulltext_reward, "prisma_score": avg_prisma_score})
+
+            if self.recorder:
+                self.recorder.flush()
+
             # Save models
             try:
                 self.search_agent.save_model()
@@ -174,6 +193,182 @@ class PRISMAAgentTrainer:
             except Exception as e:
                 logger.error(f"Failed to save models for epoch {epoch+1}: {e}")
 
+    def train_vectorized(self, training_data: list, steps: int = 1000, num_envs: int = 64,
+                         full_texts: dict = None, log_every: int = 100):
+        """
+        Train agents on VectorPRISMAEnv, stepping num_envs review episodes per update.
+        Embeddings and rewards are computed once per query, so steps involve no I/O.
+        Args:
+            training_data: List of dicts with query, papers, ground truth, etc. (as for train)
+            steps: Number of vectorized environment steps
+            num_envs: Episodes stepped in parallel
+            full_texts: Optional entry_id -> full text for the full-text agent
+            log_every: Log average rewards every this many steps
+        """
+        episodes = [ReviewEpisode.from_training_data(data, self.prisma, full_texts)
+                    for data in training_data if data["papers"]]
+        if not episodes:
+            logger.error("No episodes to train on")
+            return
+        env = VectorPRISMAEnv(episodes, self.prisma, num_envs=num_envs)
+        agents = {"search": self.search_agent, "title_abstract": self.abstract_agent, "full_text": self.fulltext_agent}
+        obs, _ = env.reset()
+        totals = {agent: 0.0 for agent in agents}
+        counts = {agent: 0 for agent in agents}
+        prisma_scores = []
+
+        for step in range(steps):
+            actions = {name: agent.act_batch(obs[name], training=True)[0] for name, agent in agents.items()}
+            actions["prisma_checker"] = np.zeros(num_envs, dtype=np.int64)
+            next_obs, rewards, _, _, infos = env.step(actions)
+
+            # Each decision is stored as a terminal transition, as in train()
+            masks = {"search": infos["search_mask"], "title_abstract": np.ones(num_envs, dtype=bool),
+                     "full_text": infos["full_text_mask"]}
+            for name, agent in agents.items():
+                mask = masks[name]
+                if mask.any():
+                    states = obs[name][mask]
+                    agent.remember_batch(states, actions[name][mask], rewards[name][mask], states, np.ones(int(mask.sum()), dtype=bool))
+                    if self.recorder:
+                        self.recorder.record_batch(name, states, actions[name][mask], rewards[name][mask], states,
+                                                   np.ones(int(mask.sum()), dtype=bool))
+                    agent.train()
+                    totals[name] += float(rewards[name][mask].sum())
+                    counts[name] += int(mask.sum())
+            prisma_scores.extend(infos["prisma_score"][~np.isnan(infos["prisma_score"])].tolist())
+            obs = next_obs
+
+            if (step + 1) % log_every == 0 or step + 1 == steps:
+                logger.info(
+                    f"Step {step+1}/{steps}: "
+                    f"Search Reward={totals['search'] / max(counts['search'], 1):.3f}, "
+                    f"Abstract Reward={totals['title_abstract'] / max(counts['title_abstract'], 1):.3f}, "
+                    f"Fulltext Reward={totals['full_text'] / max(counts['full_text'], 1):.3f}, "
+                    f"PRISMA Score={np.mean(prisma_scores) if prisma_scores else 0.0:.3f}"
+                )
+                totals = {agent: 0.0 for agent in agents}
+                counts = {agent: 0 for agent in agents}
+                prisma_scores = []
+
+        if self.recorder:
+            self.recorder.flush()
+        try:
+            self.search_agent.save_model()
+            self.abstract_agent.save_model()
+            self.fulltext_agent.save_model()
+            logger.info("Saved models after vectorized training")
+        except Exception as e:
+            logger.error(f"Failed to save models after vectorized training: {e}")
+
+    def collect_transitions(self, data: dict, training: bool = True) -> dict:
+        """
+        Run one query through the three agents without updating them.
+        Args:
+            data: Training data entry (query, papers, ground truth, ...); if 'papers' is missing
+                they are searched with 'from_year', 'to_year' and 'max_results'
+            training: Use epsilon-greedy exploration
+        Returns:
+            Dict of agent name -> (states, actions, rewards) arrays, plus 'prisma_score'
+        """
+        query = data["query"]
+        papers = data.get("papers")
+        if papers is None:
+            papers = search_arxiv(query, data.get("from_year", 2000), data.get("to_year", 2025), data.get("max_results", 30))
+        empty = lambda dim: (np.zeros((0, dim), dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+        if not papers:
+            logger.warning(f"No papers retrieved for query: {query}")
+            return {"search": empty(386), "title_abstract": empty(384), "full_text": empty(384), "prisma_score": 0.0}
+        ground_truth = data.get("ground_truth_labels", {})
+        human_feedback = data.get("human_feedback", {"relevance": 0.8, "quality": 0.7})
+
+        query_embedding = self.reward_system.embed_text(query)
+        search_state = np.concatenate([query_embedding, [len(papers), 0.0]]).astype(np.float32)
+        search_action = self.search_agent.act(search_state, training=training)
+        search_reward = self.prisma.evaluate_search_reward(papers, query_embedding, human_feedback)
+
+        abstract_embeds = self.reward_system.embed_many([paper.summary for paper in papers])
+        abstract_actions, _ = self.abstract_agent.act_batch(abstract_embeds, training=training)
+        abstract_rewards = self.prisma.evaluate_abstract_rewards(
+            [paper.summary for paper in papers], abstract_actions, [ground_truth.get(i) for i in range(len(papers))]
+        ).astype(np.float32)
+
+        kept = {papers[i].entry_id: i for i in np.flatnonzero(np.isin(abstract_actions, (1, 2)))}
+        full_texts = [(kept[entry_id], full_text) for entry_id, full_text in parse_arxiv_pdfs(list(kept))]
+        full_texts = [(i, full_text or papers[i].summary) for i, full_text in full_texts]
+        if full_texts:
+            fulltext_embeds = self.reward_system.embed_many([full_text for _, full_text in full_texts])
+            fulltext_actions, _ = self.fulltext_agent.act_batch(fulltext_embeds, training=training)
+        else:
+            fulltext_embeds, fulltext_actions = np.zeros((0, 384), dtype=np.float32), np.zeros(0, dtype=np.int64)
+        fulltext_rewards = self.prisma.evaluate_fulltext_rewards(
+            [full_text for _, full_text in full_texts], fulltext_actions,
+            [ground_truth.get(i) for i, _ in full_texts],
+            [getattr(papers[i], "citation_count", 0) for i, _ in full_texts]
+        ).astype(np.float32)
+
+        decisions = dict(zip((i for i, _ in full_texts), fulltext_actions.tolist()))
+        results = [{
+            "Title": papers[i].title,
+            "Abstract": papers[i].summary,
+            "Authors": ", ".join(a.name for a in papers[i].authors),
+            "Decision": "Include" if decisions.get(i) == 1 else "Exclude" if i in decisions else "Maybe",
+            "Score": float(abstract_rewards[i])
+        } for i in kept.values()]
+        metadata = {
+            "query": query,
+            "modified_query": query,
+            "from_year": data.get("from_year", 2000),
+            "to_year": data.get("to_year", 2025),
+            "search_action": search_action,
+            "inclusion_criteria_clear": 1.0,
+            "exclusion_criteria_clear": 1.0
+        }
+        prisma_score = self.prisma.evaluate_prisma_score(papers, metadata, pd.DataFrame(results))
+
+        transitions = {
+            "search": (search_state[None, :], np.array([search_action], dtype=np.int64), np.array([search_reward], dtype=np.float32)),
+            "title_abstract": (np.asarray(abstract_embeds, dtype=np.float32), abstract_actions, abstract_rewards),
+            "full_text": (np.asarray(fulltext_embeds, dtype=np.float32), fulltext_actions, fulltext_rewards),
+        }
+        if self.recorder:
+            for name, (states, actions, rewards) in transitions.items():
+                self.recorder.record_batch(name, states, actions, rewards, states, np.ones(len(actions), dtype=bool),
+                                           [{"query": query}] * len(actions))
+        transitions["prisma_score"] = float(prisma_score)
+        return transitions
+
+    def train_actor_learner(self, training_data: list, epochs: int = 1, num_actors: int = 4, **kwargs):
+        """Train with actor processes collecting transitions for this learner; see trainer.actor_learner."""
+        from trainer.actor_learner import run_actor_learner
+        run_actor_learner(self, training_data * epochs, num_actors=num_actors, **kwargs)
+
+    def train_offline(self, trajectory_dir: str, updates: int = 1000, log_every: int = 100):
+        """
+        Train agents from transitions recorded by a TrajectoryRecorder, with no search,
+        embedding or PDF work.
+        Args:
+            trajectory_dir: Log directory written by a previous train or inference run
+            updates: Gradient steps per agent
+            log_every: Log progress every this many updates
+        """
+        agents = {"search": self.search_agent, "title_abstract": self.abstract_agent, "full_text": self.fulltext_agent}
+        loaded = {name: load_into_buffer(agent.agent.memory, trajectory_dir, name) for name, agent in agents.items()}
+        for update in range(updates):
+            for name, agent in agents.items():
+                if loaded[name]:
+                    agent.train()
+            if (update + 1) % log_every == 0 or update + 1 == updates:
+                logger.info(f"Offline update {update+1}/{updates}")
+
+        try:
+            self.search_agent.save_model()
+            self.abstract_agent.save_model()
+            self.fulltext_agent.save_model()
+            logger.info("Saved models after offline training")
+        except Exception as e:
+            logger.error(f"Failed to save models after offline training: {e}")
+
 if __name__ == "__main__":
     # Initialize trainer
     trainer = PRISMAAgentTrainer()
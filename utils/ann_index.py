@@ -0,0 +1,223 @@
+import os
+import json
+import argparse
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from utils.embedding_service import get_embedding_service
+from utils.logger import get_logger
+
+logger = get_logger("ann_index")
+
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR", os.path.join("data", "arxiv_ann"))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def spherical_kmeans(vectors: np.ndarray, num_clusters: int, iterations: int = 10,
+                     seed: int = 0, chunk_size: int = 65536) -> np.ndarray:
+    """
+    Cluster unit vectors by cosine similarity.
+    Args:
+        vectors: Normalized float32 matrix (n, dim)
+        num_clusters: Number of centroids
+        iterations: Lloyd iterations
+        seed: Random seed for initialization
+        chunk_size: Rows assigned per matrix product, bounding memory
+    Returns:
+        Normalized centroid matrix (num_clusters, dim)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = _kmeans_plus_plus(vectors, num_clusters, rng)
+    for _ in range(iterations):
+        assignment = assign_clusters(vectors, centroids, chunk_size)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=num_clusters)
+        nonempty = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[nonempty]
+        centroids[nonempty] = np.add.reduceat(vectors[order], starts, axis=0)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = _normalize(centroids)
+    return centroids
+
+
+def _kmeans_plus_plus(vectors: np.ndarray, num_clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    k-means++ seeding with cosine distance: each centroid is drawn with probability
+    proportional to the squared distance to the nearest centroid drawn so far. Uniform
+    seeding often puts two seeds in one cluster, which Lloyd iterations do not undo. Seeds
+    are drawn from a sample of at most max(10000, 16 rows per cluster), so seeding costs
+    about one iteration.
+    """
+    sample_size = max(10000, 16 * num_clusters)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = np.empty((num_clusters, vectors.shape[1]), dtype=np.float32)
+    centroids[0] = vectors[rng.integers(len(vectors))]
+    distances = np.maximum(1.0 - vectors @ centroids[0], 0.0)
+    for i in range(1, num_clusters):
+        cumulative = np.cumsum(distances.astype(np.float64) ** 2)
+        if cumulative[-1] > 0:
+            row = min(int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side="right")), len(vectors) - 1)
+        else:
+            row = rng.integers(len(vectors))
+        centroids[i] = vectors[row]
+        np.minimum(distances, np.maximum(1.0 - vectors @ centroids[i], 0.0), out=distances)
+    return centroids
+
+
+def assign_clusters(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(np.asarray(vectors[i:i + chunk_size], dtype=np.float32) @ centroids.T, axis=1)
+        for i in range(0, len(vectors), chunk_size)
+    ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+
+class IVFIndex:
+    """
+    Inverted-file index for cosine similarity search. Vectors are grouped by their nearest
+    k-means centroid; a query scans only the nprobe closest lists and scores those
+    candidates exactly. All arrays are NumPy and are memory-mapped when loaded from disk.
+    """
+    def __init__(self, centroids: np.ndarray, vectors: np.ndarray, ids: np.ndarray, offsets: np.ndarray):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.centroids.shape[1]
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, ids: Optional[np.ndarray] = None, num_lists: Optional[int] = None,
+              train_size: int = 100000, iterations: int = 10, dtype: str = "float16") -> "IVFIndex":
+        """
+        Build an index.
+        Args:
+            vectors: Embedding matrix (n, dim); normalized internally
+            ids: External id of each row (defaults to row numbers)
+            num_lists: Number of inverted lists (defaults to ~4 * sqrt(n))
+            train_size: Rows sampled to train the centroids
+            iterations: k-means iterations
+            dtype: Storage dtype of the vectors ('float16' halves memory)
+        Returns:
+            The index
+        """
+        vectors = _normalize(vectors)
+        n = len(vectors)
+        ids = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        num_lists = max(1, min(n, num_lists or int(4 * np.sqrt(n))))
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(n, min(n, train_size), replace=False)] if n > train_size else vectors
+        centroids = spherical_kmeans(sample, num_lists, iterations)
+        assignment = assign_clusters(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.zeros(num_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=num_lists), out=offsets[1:])
+        return cls(centroids, vectors[order].astype(dtype), ids[order], offsets)
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar vectors for each query.
+        Args:
+            queries: Query vector (dim,) or matrix (q, dim)
+            k: Neighbours per query
+            nprobe: Inverted lists scanned per query
+        Returns:
+            (ids, scores) arrays of shape (q, k), best first; missing slots have id -1
+        """
+        queries = _normalize(np.atleast_2d(queries))
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        out_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        out_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for q, (query, lists) in enumerate(zip(queries, probes)):
+            rows = np.concatenate([np.arange(self.offsets[l], self.offsets[l + 1]) for l in lists])
+            if not len(rows):
+                continue
+            scores = np.asarray(self.vectors[rows], dtype=np.float32) @ query
+            top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            out_ids[q, :len(top)] = self.ids[rows[top]]
+            out_scores[q, :len(top)] = scores[top]
+        return out_ids, out_scores
+
+    def save(self, index_dir: str):
+        os.makedirs(index_dir, exist_ok=True)
+        for name in ("centroids", "vectors", "ids", "offsets"):
+            np.save(os.path.join(index_dir, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(index_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"size": len(self), "dim": self.dim, "num_lists": len(self.centroids)}, f)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "IVFIndex":
+        load = lambda name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+        return cls(np.asarray(load("centroids")), load("vectors"), np.asarray(load("ids")), np.asarray(load("offsets")))
+
+
+def build_corpus_index(corpus, index_dir: str, batch_size: int = 4096, **build_kwargs) -> IVFIndex:
+    """
+    Embed every abstract of a LocalCorpus (through the shared, disk-cached embedding
+    service) and build an IVFIndex keyed by corpus document id.
+    """
+    embedder = get_embedding_service()
+    chunks = []
+    for start in range(0, len(corpus), batch_size):
+        papers = corpus.get_papers(range(start, min(start + batch_size, len(corpus))))
+        chunks.append(embedder.embed_many([f"{p.title}. {p.summary}" for p in papers]).astype(np.float16))
+        logger.info(f"Embedded {start + len(papers)}/{len(corpus)} abstracts")
+    index = IVFIndex.build(np.concatenate(chunks), **build_kwargs)
+    index.save(index_dir)
+    logger.info(f"Saved IVF index with {len(index)} vectors and {len(index.centroids)} lists to {index_dir}")
+    return index
+
+
+class SemanticSearchBackend:
+    """
+    search_arxiv backend that retrieves papers from a LocalCorpus by embedding similarity
+    to the query, using an IVFIndex built by build_corpus_index.
+    """
+    def __init__(self, corpus, index: IVFIndex, nprobe: int = 16, oversample: int = 4):
+        self.corpus = corpus
+        self.index = index
+        self.nprobe = nprobe
+        self.oversample = oversample
+        self.embedder = get_embedding_service()
+
+    def search(self, query: str, from_year: Optional[int] = None, to_year: Optional[int] = None,
+               max_results: int = 10, categories: Optional[Sequence[str]] = None) -> List:
+        """
+        Returns:
+            arxiv.Result objects most similar to the query that pass the filters, best first
+        """
+        query_vector = self.embedder.embed_many([query])[0]
+        mask = self.corpus.filter_mask(from_year, to_year, categories)
+        k = max_results * self.oversample
+        while True:
+            ids, _ = self.index.search(query_vector, k=k, nprobe=self.nprobe)
+            ids = ids[0][ids[0] >= 0]
+            kept = ids[mask[ids]][:max_results]
+            # Filters can reject most neighbours; widen the candidate set once if needed
+            if len(kept) >= max_results or k >= max_results * self.oversample * 16 or len(ids) < k:
+                break
+            k *= 16
+        return self.corpus.get_papers(kept)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an IVF index over a local arXiv corpus")
+    parser.add_argument("corpus_dir")
+    parser.add_argument("index_dir", nargs="?", default=ANN_INDEX_DIR)
+    parser.add_argument("--num-lists", type=int, default=None)
+    args = parser.parse_args()
+
+    from utils.local_corpus import LocalCorpus
+    build_corpus_index(LocalCorpus(args.corpus_dir), args.index_dir, num_lists=args.num_lists)
@@ -1,16 +1,98 @@
+import os
+import threading
 import arxiv
 from datetime import datetime
+from typing import Dict
+from utils.search_cache import SearchCache, get_search_cache
+from utils.pdf_fetcher import RateLimiter
+from utils.logger import get_logger
+
+logger = get_logger("arxiv_interface")
+
+ARXIV_PAGE_SIZE = int(os.getenv("ARXIV_PAGE_SIZE", "100"))
+ARXIV_DELAY_SECONDS = float(os.getenv("ARXIV_DELAY_SECONDS", "3"))
+# "arxiv" queries the live API; "local" searches the offline corpus in LOCAL_CORPUS_DIR with
+# BM25; "semantic" retrieves from the same corpus through the embedding index in ANN_INDEX_DIR
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "arxiv")
+LOCAL_CORPUS_DIR = os.getenv("LOCAL_CORPUS_DIR", os.path.join("data", "arxiv_corpus"))
+
+_clients = {}
+_client_lock = threading.Lock()
+# One limiter for every API request from every thread and client; arxiv.Client's own delay
+# is tracked per client without locking, so concurrent searches would ignore it
+_api_rate_limiter = RateLimiter(ARXIV_DELAY_SECONDS)
+
+
+class _RateLimitedClient(arxiv.Client):
+    def _parse_feed(self, url: str, first_page: bool = True, _try_index: int = 0):
+        # Called once per page request and again for each retry
+        _api_rate_limiter.wait()
+        return super()._parse_feed(url, first_page=first_page, _try_index=_try_index)
+
+
+def _get_client(page_size: int) -> arxiv.Client:
+    with _client_lock:
+        client = _clients.get(page_size)
+        if client is None:
+            client = _RateLimitedClient(page_size=page_size, delay_seconds=0, num_retries=3)
+            _clients[page_size] = client
+        return client
+
+
+def date_filtered_query(query, from_year, to_year):
+    """Restrict a query to papers first submitted between from_year and to_year (inclusive)."""
+    return f"({query}) AND submittedDate:[{int(from_year)}01010000 TO {int(to_year)}12312359]"
+
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    Return the configured search backend: None for the live arXiv API, otherwise an
+    object with search(query, from_year, to_year, max_results) such as LocalCorpus.
+    """
+    global _backend
+    if _backend is None and SEARCH_BACKEND in ("local", "semantic"):
+        from utils.local_corpus import LocalCorpus
+        corpus = LocalCorpus(LOCAL_CORPUS_DIR)
+        logger.info(f"Using local corpus {LOCAL_CORPUS_DIR} ({len(corpus)} papers)")
+        if SEARCH_BACKEND == "semantic":
+            from utils.ann_index import ANN_INDEX_DIR, IVFIndex, SemanticSearchBackend
+            _backend = SemanticSearchBackend(corpus, IVFIndex.load(ANN_INDEX_DIR))
+        else:
+            _backend = corpus
+    return _backend
+
+
+def set_search_backend(backend):
+    """Route search_arxiv through backend (None restores the live arXiv API)."""
+    global _backend
+    _backend = backend
+
+
+def search_arxiv(query, from_year, to_year, max_results=10, use_cache=True):
+    backend = get_search_backend()
+    if backend is not None:
+        return backend.search(query, from_year, to_year, max_results)
+
+    key = SearchCache.make_key(query=query, from_year=int(from_year), to_year=int(to_year), max_results=max_results)
+    cache = get_search_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"Search cache hit for '{query}' ({len(cached)} papers)")
+            return [result_from_dict(d) for d in cached]
 
-def search_arxiv(query, from_year, to_year, max_results=10):
-    client = arxiv.Client()
     search = arxiv.Search(
-        query=query,
+        query=date_filtered_query(query, from_year, to_year),
         max_results=max_results,
         sort_by=arxiv.SortCriterion.Relevance,
         sort_order=arxiv.SortOrder.Descending
     )
 
     results = []
+    client = _get_client(max(1, min(max_results, ARXIV_PAGE_SIZE)))
     for paper in client.results(search):
         pub_year = paper.published.year
         if from_year <= pub_year <= to_year:
@@ -18,4 +100,43 @@ def search_arxiv(query, from_year, to_year, max_results=10):
         if len(results) >= max_results:
             break
 
-    return results
\ No newline at end of file
+    if cache is not None:
+        cache.put(key, [result_to_dict(paper) for paper in results])
+    return results
+
+
+def result_to_dict(paper: arxiv.Result) -> Dict:
+    return {
+        "entry_id": paper.entry_id,
+        "updated": paper.updated.isoformat(),
+        "published": paper.published.isoformat(),
+        "title": paper.title,
+        "authors": [a.name for a in paper.authors],
+        "summary": paper.summary,
+        "comment": paper.comment,
+        "journal_ref": paper.journal_ref,
+        "doi": paper.doi,
+        "primary_category": paper.primary_category,
+        "categories": list(paper.categories),
+        "links": [
+            {"href": link.href, "title": link.title, "rel": link.rel, "content_type": link.content_type}
+            for link in paper.links
+        ]
+    }
+
+
+def result_from_dict(data: Dict) -> arxiv.Result:
+    return arxiv.Result(
+        entry_id=data["entry_id"],
+        updated=datetime.fromisoformat(data["updated"]),
+        published=datetime.fromisoformat(data["published"]),
+        title=data.get("title", ""),
+        authors=[arxiv.Result.Author(name) for name in data.get("authors", [])],
+        summary=data.get("summary", ""),
+        comment=data.get("comment") or "",
+        journal_ref=data.get("journal_ref") or "",
+        doi=data.get("doi") or "",
+        primary_category=data.get("primary_category", ""),
+        categories=data.get("categories", []),
+        links=[arxiv.Result.Link(**link) for link in data.get("links", [])]
+    )
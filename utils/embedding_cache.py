@@ -0,0 +1,233 @@
+import os
+import re
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+from utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger("embedding_cache")
+
+
+def text_key(text: str, model_name: str) -> str:
+    """Content address of an embedding: SHA-1 over model name and text."""
+    return hashlib.sha1(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _try_lock(f) -> bool:
+    """Take a non-blocking exclusive lock on an open file; False if another process holds it."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+class EmbeddingCache:
+    """
+    Disk-backed embedding store. Vectors live in a preallocated memory-mapped matrix
+    (vectors.bin) and every row carries the digest of the key it holds (keys.bin). When
+    the matrix is full the least recently used rows are reused. The row digests are
+    written together with each vector and checked on every read, so a row reused by
+    another process or left half-written by a crash is a miss rather than a wrong vector.
+    The key -> row index is rebuilt from them on load; index.npz only keeps the LRU order.
+
+    The cache is safe to share between threads. Only one process writes to a cache
+    directory: the first to take writer.lock. Caches opened by other processes, or by a
+    process forked from the writer, are read-only.
+    """
+    def __init__(self, cache_dir: str, model_name: str, max_bytes: int = 512 * 1024 * 1024,
+                 dtype: str = "float32", read_only: bool = False, flush_every: int = 1000):
+        """
+        Args:
+            cache_dir: Root cache directory (one sub-directory per model)
+            model_name: Embedding model name, part of every key
+            max_bytes: Size cap of the vector matrix
+            dtype: Storage dtype, 'float32' or 'float16'
+            read_only: Never write vectors or the index
+            flush_every: Persist the LRU order after this many insertions
+        """
+        self.model_name = model_name
+        self.dir = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+        self.dtype = np.dtype(dtype)
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+        self.flush_every = flush_every
+        self.vectors_path = os.path.join(self.dir, "vectors.bin")
+        self.keys_path = os.path.join(self.dir, "keys.bin")
+        self.index_path = os.path.join(self.dir, "index.npz")
+
+        self.dim = None
+        self.capacity = 0
+        self._vectors = None
+        self._keys = None  # row -> 20-byte key digest, all zero for free rows
+        self._index = OrderedDict()  # key -> row, least recently used first
+        self._free = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._writer_pid = None
+        self.hits = 0
+        self.misses = 0
+        if not read_only:
+            self._acquire_writer()
+        self._load()
+
+    def __len__(self):
+        return len(self._index)
+
+    def _acquire_writer(self):
+        os.makedirs(self.dir, exist_ok=True)
+        lock_file = open(os.path.join(self.dir, "writer.lock"), "a+")
+        if _try_lock(lock_file):
+            self._lock_file = lock_file
+            self._writer_pid = os.getpid()
+        else:
+            lock_file.close()
+            self.read_only = True
+            logger.info(f"Embedding cache {self.dir} is written by another process; opening it read-only")
+
+    @property
+    def writable(self) -> bool:
+        # A forked child inherits the writer's lock and mappings but must not write
+        return not self.read_only and self._writer_pid == os.getpid()
+
+    def _load(self):
+        if not all(os.path.exists(path) for path in (self.index_path, self.vectors_path, self.keys_path)):
+            return
+        try:
+            index = np.load(self.index_path)
+            dim, capacity = int(index["dim"]), int(index["capacity"])
+            if np.dtype(str(index["dtype"])) != self.dtype:
+                logger.warning(f"Embedding cache {self.dir} uses dtype {index['dtype']}, ignoring it")
+                return
+            self._open(dim, capacity)
+            stored = {int(row): digest.tobytes().hex() for row, digest in enumerate(np.array(self._keys)) if digest.any()}
+            # Rows missing from the saved LRU order (written after the last flush) count as oldest
+            ordered = [(key.decode("ascii"), int(row)) for key, row in zip(index["keys"], index["rows"])
+                       if stored.get(int(row)) == key.decode("ascii")]
+            known = {row for _, row in ordered}
+            self._index.update((key, row) for row, key in stored.items() if row not in known)
+            self._index.update(ordered)
+            self._free = sorted(set(range(capacity)) - set(self._index.values()), reverse=True)
+            logger.info(f"Loaded embedding cache {self.dir} with {len(self._index)} vectors")
+        except Exception as e:
+            logger.error(f"Failed to load embedding cache {self.dir}: {e}")
+            self._vectors = None
+            self._keys = None
+            self._index.clear()
+            self._free = []
+
+    def _open(self, dim: int, capacity: int):
+        self.dim = dim
+        self.capacity = capacity
+        mode = "r" if self.read_only else "r+"
+        for path, size in ((self.vectors_path, capacity * dim * self.dtype.itemsize), (self.keys_path, capacity * 20)):
+            if not os.path.exists(path) or (not self.read_only and os.path.getsize(path) != size):
+                # New cache, or one from before row digests were stored: start empty
+                os.makedirs(self.dir, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.truncate(size)
+        self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode=mode, shape=(capacity, dim))
+        self._keys = np.memmap(self.keys_path, dtype=np.uint8, mode=mode, shape=(capacity, 20))
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors.
+        Args:
+            texts: Texts to look up
+        Returns:
+            List aligned with texts holding a float32 vector or None for each miss
+        """
+        out = []
+        with self._lock:
+            for text in texts:
+                key = text_key(text, self.model_name)
+                row = self._index.get(key)
+                vector = None
+                if row is not None and self._vectors is not None:
+                    digest = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+                    # Check the row digest before and after copying: the writer may reuse the row meanwhile
+                    if np.array_equal(self._keys[row], digest):
+                        vector = np.array(self._vectors[row], dtype=np.float32)
+                        if not np.array_equal(self._keys[row], digest):
+                            vector = None
+                    if vector is None:
+                        del self._index[key]
+                        if self.writable:
+                            self._free.append(row)
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self._index.move_to_end(key)
+                    self.hits += 1
+                out.append(vector)
+        return out
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray):
+        """
+        Store vectors for texts, evicting least recently used rows when full.
+        Args:
+            texts: Texts the vectors were computed from
+            vectors: Matrix of shape (len(texts), dim)
+        """
+        if not self.writable or not len(texts):
+            return
+        vectors = np.asarray(vectors)
+        with self._lock:
+            if self._vectors is None:
+                dim = vectors.shape[1]
+                capacity = max(1, self.max_bytes // (dim * self.dtype.itemsize))
+                self._open(dim, capacity)
+                self._keys[:] = 0
+                self._free = list(range(capacity - 1, -1, -1))
+                self._flush()
+            for text, vector in zip(texts, vectors):
+                key = text_key(text, self.model_name)
+                row = self._index.get(key)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        _, row = self._index.popitem(last=False)
+                # Clear the digest first so readers never pair it with a half-written vector
+                self._keys[row] = 0
+                self._vectors[row] = vector
+                self._keys[row] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+                self._index[key] = row
+                self._index.move_to_end(key)
+                self._pending += 1
+            if self._pending >= self.flush_every:
+                self._flush()
+
+    def flush(self):
+        """Persist vectors, row digests and the LRU order to disk."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.writable or self._vectors is None:
+            return
+        self._vectors.flush()
+        self._keys.flush()
+        tmp_path = self.index_path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            keys=np.array(list(self._index.keys()), dtype="S40"),
+            rows=np.array(list(self._index.values()), dtype=np.int64),
+            dim=self.dim,
+            capacity=self.capacity,
+            dtype=self.dtype.name
+        )
+        os.replace(tmp_path, self.index_path)
+        self._pending = 0
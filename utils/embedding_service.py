@@ -0,0 +1,210 @@
+import os
+import time
+import atexit
+import argparse
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from utils.embedding_cache import EmbeddingCache
+from utils.logger import get_logger
+
+logger = get_logger("embedding_service")
+
+DEFAULT_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# 'torch' (reference), 'int8' (dynamically quantized Linear layers) or 'onnx' (onnxruntime)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Optional ONNX file inside the model repo, e.g. 'onnx/model_qint8_avx512_vnni.onnx'
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "")
+BACKENDS = ("torch", "int8", "onnx")
+# Set EMBEDDING_CACHE_DIR to an empty string to disable the on-disk cache
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(".cache", "embeddings"))
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")
+# Only one process writes a cache directory (see EmbeddingCache); set to 1 to never be that process
+EMBEDDING_CACHE_READ_ONLY = os.getenv("EMBEDDING_CACHE_READ_ONLY", "0") == "1"
+
+
+class EmbeddingService:
+    """
+    Wraps a single SentenceTransformer instance. The model is loaded on first use,
+    so constructing the service is cheap; use get_embedding_service() to share one
+    instance across the whole process. With a cache attached, texts that were embedded
+    before are served from disk without touching the model.
+
+    The backend selects how the same model runs: 'torch' is the reference, 'int8'
+    quantizes its Linear layers for faster CPU inference and 'onnx' runs it with
+    onnxruntime. Use check_backend_agreement() to verify a backend against 'torch'.
+    """
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, batch_size: int = DEFAULT_BATCH_SIZE,
+                 cache: Optional[EmbeddingCache] = None, backend: str = EMBEDDING_BACKEND):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {BACKENDS})")
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache = cache
+        self.backend = backend
+        self._model = None
+        self._lock = threading.Lock()
+        # Fast tokenizers raise "Already borrowed" when one instance is called from two threads
+        self._encode_lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    logger.info(f"Loading embedding model {self.model_name} ({self.backend} backend)")
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
+        from sentence_transformers import SentenceTransformer
+        if self.backend == "onnx":
+            model_kwargs = {"file_name": EMBEDDING_ONNX_FILE} if EMBEDDING_ONNX_FILE else None
+            return SentenceTransformer(self.model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+        if self.backend == "int8":
+            import torch
+            model = SentenceTransformer(self.model_name, device="cpu")
+            return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return SentenceTransformer(self.model_name)
+
+    @property
+    def dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed_text(self, text: str) -> np.ndarray:
+        """
+        Embed a single string.
+        Args:
+            text: Text to embed
+        Returns:
+            1-D float32 embedding
+        """
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Embed a list of strings in batched forward passes.
+        Args:
+            texts: Texts to embed
+            batch_size: Encoder batch size (defaults to the service batch size)
+        Returns:
+            Float32 matrix of shape (len(texts), dim)
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if self.cache is None:
+            return self._encode(texts, batch_size)
+
+        cached = self.cache.get_many(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            # Encode each distinct missing text once
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = self._encode(unique, batch_size)
+            self.cache.put_many(unique, encoded)
+            by_text = dict(zip(unique, encoded))
+            for i in missing:
+                cached[i] = by_text[texts[i]]
+        return np.stack(cached).astype(np.float32, copy=False)
+
+    def _encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        model = self.model
+        with self._encode_lock:
+            embeddings = model.encode(
+                texts,
+                batch_size=batch_size or self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: str = DEFAULT_MODEL_NAME, backend: str = EMBEDDING_BACKEND) -> EmbeddingService:
+    """Return the process-wide EmbeddingService for model_name and backend, creating it on first call."""
+    with _services_lock:
+        service = _services.get((model_name, backend))
+        if service is None:
+            cache = None
+            if EMBEDDING_CACHE_DIR:
+                # Approximate backends get their own cache so they never serve reference vectors or vice versa
+                cache = EmbeddingCache(
+                    EMBEDDING_CACHE_DIR, model_name if backend == "torch" else f"{model_name}@{backend}",
+                    max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+                    dtype=EMBEDDING_CACHE_DTYPE,
+                    read_only=EMBEDDING_CACHE_READ_ONLY
+                )
+                atexit.register(cache.flush)
+            service = EmbeddingService(model_name, cache=cache, backend=backend)
+            _services[(model_name, backend)] = service
+        return service
+
+
+def embed_many(texts: List[str]) -> np.ndarray:
+    return get_embedding_service().embed_many(texts)
+
+
+SAMPLE_TEXTS = [
+    "A systematic review of deep reinforcement learning for recommender systems.",
+    "We propose a transformer-based model for abstractive summarization of scientific articles.",
+    "Randomized controlled trial of a mobile health intervention for type 2 diabetes.",
+    "Graph neural networks for molecular property prediction: a benchmark study.",
+    "This meta-analysis pools 42 studies on the effect of sleep deprivation on working memory.",
+    "Federated learning with differential privacy guarantees for medical imaging.",
+    "We evaluate large language models on multi-step mathematical reasoning tasks.",
+    "Risk of bias was assessed with the Cochrane tool and heterogeneity with the I2 statistic.",
+]
+
+
+def check_backend_agreement(backend: str, model_name: str = DEFAULT_MODEL_NAME, texts: Optional[Sequence[str]] = None,
+                            min_cosine: float = 0.99) -> Dict[str, float]:
+    """
+    Compare a backend's embeddings against the reference torch model (caches bypassed).
+    Args:
+        backend: Backend to check
+        model_name: Embedding model
+        texts: Texts to embed (defaults to SAMPLE_TEXTS)
+        min_cosine: Lowest acceptable per-text cosine similarity
+    Returns:
+        Dict with min/mean cosine similarity and texts per second for both backends
+    Raises:
+        ValueError: If any text falls below min_cosine
+    """
+    texts = list(texts or SAMPLE_TEXTS)
+    report = {}
+    embeddings = {}
+    for name in ("torch", backend):
+        service = EmbeddingService(model_name, backend=name)
+        service.model
+        start = time.perf_counter()
+        vectors = service.embed_many(texts)
+        report[f"{name}_texts_per_sec"] = len(texts) / (time.perf_counter() - start)
+        embeddings[name] = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    cosine = (embeddings["torch"] * embeddings[backend]).sum(axis=1)
+    report["min_cosine"] = float(cosine.min())
+    report["mean_cosine"] = float(cosine.mean())
+    logger.info(f"Backend {backend} vs torch on {len(texts)} texts: {report}")
+    if report["min_cosine"] < min_cosine:
+        raise ValueError(f"Backend {backend} min cosine {report['min_cosine']:.4f} is below {min_cosine}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check an embedding backend against the reference model")
+    parser.add_argument("backend", choices=BACKENDS)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--texts", default=None, help="File with one text per line (defaults to built-in samples)")
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    args = parser.parse_args()
+
+    texts = None
+    if args.texts:
+        with open(args.texts, "r", encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    print(check_backend_agreement(args.backend, args.model, texts, args.min_cosine))
@@ -0,0 +1,142 @@
+import os
+import re
+import gzip
+import threading
+from typing import Optional
+from utils.logger import get_logger
+
+logger = get_logger("full_text_cache")
+
+# Set FULL_TEXT_CACHE_DIR to an empty string to disable the cache
+FULL_TEXT_CACHE_DIR = os.getenv("FULL_TEXT_CACHE_DIR", os.path.join(".cache", "full_text"))
+FULL_TEXT_CACHE_MAX_MB = int(os.getenv("FULL_TEXT_CACHE_MAX_MB", "1024"))
+FULL_TEXT_CACHE_KEEP_PDF = os.getenv("FULL_TEXT_CACHE_KEEP_PDF", "0") == "1"
+
+_NEW_STYLE_ID = re.compile(r"(\d{4}\.\d{4,5})(v\d+)?")
+_OLD_STYLE_ID = re.compile(r"([a-z\-]+(?:\.[A-Z]{2})?/\d{7})(v\d+)?")
+
+
+def normalize_arxiv_id(identifier: str) -> Optional[str]:
+    """
+    Extract the arXiv ID and version from a URL or bare ID.
+    Args:
+        identifier: e.g. 'http://arxiv.org/abs/2503.07152v1', 'arxiv.org/pdf/cs/0101001v2.pdf'
+    Returns:
+        '2503.07152v1' / 'cs/0101001v2' (no version suffix if none was given), or None
+    """
+    match = _NEW_STYLE_ID.search(identifier) or _OLD_STYLE_ID.search(identifier)
+    if not match:
+        return None
+    return match.group(1) + (match.group(2) or "")
+
+
+class FullTextCache:
+    """
+    Extracted full texts (gzip-compressed) and optionally raw PDFs, keyed by arXiv ID and
+    version. Reads refresh a file's mtime, and the least recently used files are removed
+    once the directory grows past max_bytes.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024, keep_pdf: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.keep_pdf = keep_pdf
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.is_file())
+
+    def _path(self, identifier: str, suffix: str) -> Optional[str]:
+        arxiv_id = normalize_arxiv_id(identifier)
+        if arxiv_id is None:
+            return None
+        return os.path.join(self.cache_dir, arxiv_id.replace("/", "_") + suffix)
+
+    def _read(self, path: Optional[str]) -> Optional[bytes]:
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError as e:
+            logger.error(f"Failed to read cache file {path}: {e}")
+            return None
+
+    def get_text(self, identifier: str) -> Optional[str]:
+        data = self._read(self._path(identifier, ".txt.gz"))
+        if data is None:
+            return None
+        try:
+            return gzip.decompress(data).decode("utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"Corrupt full-text cache entry for {identifier}: {e}")
+            return None
+
+    def get_pdf(self, identifier: str) -> Optional[bytes]:
+        return self._read(self._path(identifier, ".pdf"))
+
+    def put(self, identifier: str, text: str, pdf_bytes: Optional[bytes] = None):
+        """
+        Store extracted text (and the raw PDF when keep_pdf is set). Empty texts are not cached
+        so that failed extractions are retried.
+        """
+        if not text:
+            return
+        path = self._path(identifier, ".txt.gz")
+        if path is None:
+            return
+        self._write(path, gzip.compress(text.encode("utf-8")))
+        if self.keep_pdf and pdf_bytes:
+            self._write(self._path(identifier, ".pdf"), pdf_bytes)
+        self._evict()
+
+    def _write(self, path: str, data: bytes):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._size += len(data) - old_size
+        except OSError as e:
+            logger.error(f"Failed to write cache file {path}: {e}")
+
+    def _evict(self):
+        with self._lock:
+            if self._size <= self.max_bytes:
+                return
+            entries = sorted(
+                (entry for entry in os.scandir(self.cache_dir) if entry.is_file() and not entry.name.endswith(".tmp")),
+                key=lambda entry: entry.stat().st_mtime
+            )
+            # Evict down to 90% of the cap so that eviction does not run on every write
+            target = int(self.max_bytes * 0.9)
+            for entry in entries:
+                if self._size <= target:
+                    break
+                try:
+                    size = entry.stat().st_size
+                    os.unlink(entry.path)
+                    self._size -= size
+                except OSError:
+                    continue
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_full_text_cache() -> Optional[FullTextCache]:
+    """Return the process-wide full-text cache, or None if it is disabled."""
+    global _cache
+    if not FULL_TEXT_CACHE_DIR:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = FullTextCache(
+                FULL_TEXT_CACHE_DIR,
+                max_bytes=FULL_TEXT_CACHE_MAX_MB * 1024 * 1024,
+                keep_pdf=FULL_TEXT_CACHE_KEEP_PDF
+            )
+        return _cache
@@ -1,17 +1,40 @@
-import PyPDF2
-import pdfplumber
-import requests
+import io
 import os
-import tempfile
 import re
-from typing import Dict, Optional
+import json
+import hashlib
+import time
+import atexit
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+from contextlib import closing
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+from utils.pdf_fetcher import fetch_pdf, imap_unordered, PDF_MAX_CONCURRENCY
+from utils.full_text_cache import get_full_text_cache
 from utils.logger import get_logger
 
 logger = get_logger("full_text_parser")
 
+# Full texts only feed a sentence embedding and keyword checks, so extraction stops once
+# this many words have been read (0 disables the budget) or the references section starts
+FULL_TEXT_MAX_WORDS = int(os.getenv("FULL_TEXT_MAX_WORDS", "8000"))
+_REFERENCES_HEADING = re.compile(r"^\s*(?:\d+\.?\s*)?(?:references|bibliography)\s*$", re.IGNORECASE | re.MULTILINE)
+
+# Parsing runs in worker processes when PDF_PARSE_WORKERS > 0 (see PDFParsePool)
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", "0"))
+PDF_PARSE_TIMEOUT = float(os.getenv("PDF_PARSE_TIMEOUT", "60"))
+PDF_PARSE_MAX_MEMORY_MB = int(os.getenv("PDF_PARSE_MAX_MEMORY_MB", "1024"))
+PDF_PARSE_TASKS_PER_WORKER = int(os.getenv("PDF_PARSE_TASKS_PER_WORKER", "50"))
+PDF_PARSE_START_METHOD = os.getenv(
+    "PDF_PARSE_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
 def parse_arxiv_pdf(identifier: str) -> str:
     """
-    Parse a PDF from an arXiv URL or local file path and extract text.
+    Parse a PDF from an arXiv URL or local file path and extract text. arXiv texts are
+    served from the local full-text cache when present and stored there after parsing.
     Args:
         identifier: arXiv URL (e.g., 'http://arxiv.org/abs/2503.07152v1') or local file path
     Returns:
@@ -20,43 +43,16 @@ def parse_arxiv_pdf(identifier: str) -> str:
     try:
         if identifier.startswith("http"):
             # Handle arXiv URL
-            if not identifier.endswith(".pdf"):
-                identifier = identifier.replace("abs", "pdf") + ".pdf"
-            response = requests.get(identifier, timeout=10)
-            response.raise_for_status()
-
-            temp_file_path = None
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                    temp_file.write(response.content)
-                    temp_file_path = temp_file.name
-
-                text = extract_text_from_pdf(temp_file_path)
-                if not text or len(text.split()) < 50:  # Validate text quality
-                    logger.warning(f"Insufficient text extracted from {identifier}, trying fallback parser")
-                    text = extract_text_with_fallback(temp_file_path)
-            finally:
-                if temp_file_path and os.path.exists(temp_file_path):
-                    try:
-                        os.unlink(temp_file_path)
-                    except Exception as e:
-                        logger.error(f"Failed to delete temporary file {temp_file_path}: {e}")
-
-            if text:
-                logger.info(f"Successfully parsed PDF for {identifier}")
-                return text.strip()
-            else:
-                logger.error(f"No usable text extracted from {identifier}")
-                return ""
+            cached = _cached_text(identifier)
+            if cached is not None:
+                return cached
+            return _parse_and_cache(fetch_pdf(identifier), identifier)
         else:
             # Handle local file path
             if not os.path.exists(identifier):
                 logger.error(f"Local PDF file not found: {identifier}")
                 return ""
-            text = extract_text_from_pdf(identifier)
-            if not text or len(text.split()) < 50:
-                logger.warning(f"Insufficient text extracted from {identifier}, trying fallback parser")
-                text = extract_text_with_fallback(identifier)
+            text = extract_text(identifier)
             if text:
                 logger.info(f"Successfully parsed local PDF: {identifier}")
                 return text.strip()
@@ -67,50 +63,472 @@ def parse_arxiv_pdf(identifier: str) -> str:
         logger.error(f"Failed to parse PDF {identifier}: {e}")
         return ""
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+def parse_arxiv_pdfs(identifiers: Iterable[str], max_concurrency: int = PDF_MAX_CONCURRENCY,
+                     pool: Optional["PDFParsePool"] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Parse many PDFs, downloading arXiv URLs concurrently over a pooled session. Identifiers
+    are consumed lazily, so a single call can serve a stream of URLs that is still growing.
+    Args:
+        identifiers: arXiv URLs or local file paths
+        max_concurrency: Number of downloads in flight
+        pool: Parse pool to use; defaults to the shared pool if PDF_PARSE_WORKERS > 0,
+            otherwise documents are parsed one at a time in this process
+    Yields:
+        (identifier, extracted text) in completion order; text is empty if parsing fails
+    """
+    pool = pool or get_parse_pool()
+
+    def load(identifier):
+        # (cached text, source to parse, downloaded bytes to cache)
+        if not identifier.startswith("http"):
+            if os.path.exists(identifier):
+                return None, identifier, None
+            logger.error(f"Local PDF file not found: {identifier}")
+            return "", None, None
+        cached = _cached_text(identifier)
+        if cached is not None:
+            return cached, None, None
+        content = fetch_pdf(identifier)
+        return None, content, content
+
+    def parse(loaded):
+        identifier, result, error = loaded
+        if error is not None:
+            logger.error(f"Failed to download PDF {identifier}: {error}")
+            return ""
+        text, source, content = result
+        if text is not None:
+            return text
+        text = _check_text(pool.parse(source) if pool is not None else extract_text(source), identifier)
+        if content is not None:
+            _store_text(identifier, text, content)
+        return text
+
+    loaded = imap_unordered(load, identifiers, max_concurrency, unique=True)
+    for (identifier, _, _), text, error in imap_unordered(parse, loaded, pool.processes if pool is not None else 1):
+        if error is not None:
+            logger.error(f"Failed to parse PDF {identifier}: {error}")
+        yield identifier, text or ""
+
+def _cached_text(identifier: str) -> Optional[str]:
+    cache = get_full_text_cache()
+    if cache is None:
+        return None
+    text = cache.get_text(identifier)
+    if text is None:
+        pdf_bytes = cache.get_pdf(identifier)
+        if pdf_bytes is not None:
+            text = _parse_and_cache(pdf_bytes, identifier)
+    return text
+
+def _store_text(identifier: str, text: str, content: bytes):
+    cache = get_full_text_cache()
+    if cache is not None:
+        cache.put(identifier, text, content)
+
+def _parse_and_cache(content: bytes, identifier: str) -> str:
+    text = _check_text(extract_text(content), identifier)
+    _store_text(identifier, text, content)
+    return text
+
+def _check_text(text: str, identifier: str) -> str:
+    if text:
+        logger.info(f"Successfully parsed PDF for {identifier}")
+        return text
+    else:
+        logger.error(f"No usable text extracted from {identifier}")
+        return ""
+
+def iter_pdf_pages(source: Union[str, bytes]) -> Iterator[str]:
+    """
+    Yield the text of each page in order. Pages are read with PyPDF2; pdfplumber is only
+    opened for pages where PyPDF2 returned no text.
+    Args:
+        source: Path to a PDF file or the PDF bytes
+    Yields:
+        Page text (empty string for pages neither parser could read)
+    """
+    import PyPDF2
+    import pdfplumber
+    stream = io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+    plumber = None
+    try:
+        reader = PyPDF2.PdfReader(stream)
+        for page_number, page in enumerate(reader.pages):
+            try:
+                page_text = page.extract_text() or ""
+            except Exception as e:
+                logger.warning(f"PyPDF2 failed on page {page_number + 1}: {e}")
+                page_text = ""
+            if not page_text.strip():
+                try:
+                    if plumber is None:
+                        plumber = pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+                    page_text = plumber.pages[page_number].extract_text() or ""
+                except Exception as e:
+                    logger.warning(f"pdfplumber failed on page {page_number + 1}: {e}")
+                    page_text = ""
+            yield page_text
+    finally:
+        if plumber is not None:
+            plumber.close()
+        stream.close()
+
+def extract_text(source: Union[str, bytes], max_words: int = FULL_TEXT_MAX_WORDS,
+                 stop_at_references: bool = True) -> str:
+    """
+    Extract text page by page until the word budget is met.
+    Args:
+        source: Path to a PDF file or the PDF bytes
+        max_words: Stop after the page on which this many words have been read (0 for no limit)
+        stop_at_references: Stop at a 'References'/'Bibliography' heading
+    Returns:
+        Extracted text or empty string if extraction fails
+    """
+    pages = []
+    num_words = 0
+    try:
+        with closing(iter_pdf_pages(source)) as page_iter:
+            for page_text in page_iter:
+                if stop_at_references and num_words:
+                    heading = _REFERENCES_HEADING.search(page_text)
+                    if heading:
+                        pages.append(page_text[:heading.start()])
+                        break
+                pages.append(page_text)
+                num_words += len(page_text.split())
+                if max_words and num_words >= max_words:
+                    break
+    except Exception as e:
+        logger.error(f"Failed to extract text from PDF: {e}")
+    return "\n".join(page for page in pages if page).strip()
+
+def extract_text_from_pdf(source: Union[str, bytes]) -> str:
     """
     Extract text from a PDF file using PyPDF2.
     Args:
-        pdf_path: Path to the PDF file
+        source: Path to the PDF file or the PDF bytes
     Returns:
         Extracted text or empty string if extraction fails
     """
+    import PyPDF2
     try:
-        with open(pdf_path, "rb") as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            return text.strip()
+        stream = io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+        with stream:
+            reader = PyPDF2.PdfReader(stream)
+            pages = [page.extract_text() for page in reader.pages]
+            return "\n".join(page for page in pages if page).strip()
     except Exception as e:
-        logger.error(f"PyPDF2 failed to extract text from {pdf_path}: {e}")
+        logger.error(f"PyPDF2 failed to extract text from {_describe(source)}: {e}")
         return ""
 
-def extract_text_with_fallback(pdf_path: str) -> str:
+def extract_text_with_fallback(source: Union[str, bytes]) -> str:
     """
     Fallback text extraction using pdfplumber.
     Args:
-        pdf_path: Path to the PDF file
+        source: Path to the PDF file or the PDF bytes
     Returns:
         Extracted text or empty string if extraction fails
     """
+    import pdfplumber
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            return text.strip()
+        with pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source) as pdf:
+            pages = [page.extract_text() for page in pdf.pages]
+            return "\n".join(page for page in pages if page).strip()
     except Exception as e:
-        logger.error(f"pdfplumber failed to extract text from {pdf_path}: {e}")
+        logger.error(f"pdfplumber failed to extract text from {_describe(source)}: {e}")
         return ""
 
+def _describe(source: Union[str, bytes]) -> str:
+    return f"<{len(source)} bytes>" if isinstance(source, bytes) else source
+
+_PARSERS = {
+    "extract_text": extract_text,
+    "extract_text_from_pdf": extract_text_from_pdf,
+    "extract_text_with_fallback": extract_text_with_fallback,
+}
+
+def _parse_worker(conn, max_memory_bytes: int, max_tasks: int):
+    if max_memory_bytes:
+        try:
+            import resource
+            # The cap is relative to the worker's address space after start-up
+            with open("/proc/self/statm") as f:
+                current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+            limit = current + max_memory_bytes
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Could not cap PDF worker memory: {e}")
+    for _ in range(max_tasks):
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        method, source, kwargs = task
+        try:
+            text = _PARSERS[method](source, **kwargs)
+        except MemoryError:
+            text = ""
+        conn.send(text)
+    conn.close()
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.tasks = 0
+
+class PDFParsePool:
+    """
+    Parses PDFs in worker processes so that CPU-bound extraction scales across cores.
+    A document that runs past `timeout` seconds has its worker killed and yields an empty
+    text, each worker's address space is capped at `max_memory_mb` above its start-up size,
+    and workers are replaced after `max_tasks_per_worker` documents.
+
+    The pool is shared between threads: each imap() call borrows idle workers and returns
+    them as their documents finish. Workers are started with PDF_PARSE_START_METHOD
+    (forkserver where available) since forking a threaded process can copy held locks.
+    """
+    def __init__(self, processes: Optional[int] = None, timeout: float = PDF_PARSE_TIMEOUT,
+                 max_memory_mb: int = PDF_PARSE_MAX_MEMORY_MB,
+                 max_tasks_per_worker: int = PDF_PARSE_TASKS_PER_WORKER,
+                 start_method: str = PDF_PARSE_START_METHOD):
+        self.processes = processes or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._context = multiprocessing.get_context(start_method)
+        self._idle = []
+        self._num_workers = 0
+        # Guards only _idle and _num_workers; never held while parsing or yielding
+        self._cond = threading.Condition()
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_parse_worker,
+            args=(child_conn, self.max_memory_bytes, self.max_tasks_per_worker),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _replace(self, worker: _Worker, kill: bool = False) -> _Worker:
+        if kill and worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=1)
+        worker.conn.close()
+        return self._spawn()
+
+    def _take(self, block: bool) -> Optional[_Worker]:
+        """Borrow an idle worker, starting one if the pool is not full; None if none is free and not block."""
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._num_workers < self.processes:
+                    self._num_workers += 1
+                    break
+                if not block:
+                    return None
+                self._cond.wait()
+        try:
+            return self._spawn()
+        except Exception:
+            with self._cond:
+                self._num_workers -= 1
+                self._cond.notify()
+            raise
+
+    def _give_back(self, worker: _Worker):
+        with self._cond:
+            self._idle.append(worker)
+            self._cond.notify()
+
+    def imap(self, sources: Iterable[Tuple[str, Union[str, bytes]]], method: str = "extract_text",
+             **kwargs) -> Iterator[Tuple[str, str]]:
+        """
+        Parse documents across the workers.
+        Args:
+            sources: (key, path or PDF bytes) pairs, consumed lazily
+            method: One of 'extract_text', 'extract_text_from_pdf', 'extract_text_with_fallback'
+            **kwargs: Extra arguments for the parser
+        Yields:
+            (key, text) in completion order; text is empty on timeout, crash or failure
+        """
+        sources = iter(sources)
+        busy = {}
+        pending = None
+        exhausted = False
+        try:
+            while True:
+                while not exhausted:
+                    if pending is None:
+                        try:
+                            pending = next(sources)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                    # Wait for a worker only when this call has nothing in flight to collect
+                    worker = self._take(block=not busy)
+                    if worker is None:
+                        break
+                    key, source = pending
+                    pending = None
+                    try:
+                        worker.conn.send((method, source, kwargs))
+                    except Exception:
+                        self._give_back(worker)
+                        raise
+                    busy[worker.conn] = (worker, key, time.monotonic() + self.timeout)
+                if not busy:
+                    break
+
+                next_deadline = min(deadline for _, _, deadline in busy.values())
+                for conn in wait(list(busy), timeout=max(0.0, next_deadline - time.monotonic())):
+                    worker, key, _ = busy.pop(conn)
+                    try:
+                        text = conn.recv()
+                    except (EOFError, OSError):
+                        logger.error(f"PDF worker crashed while parsing {key}")
+                        text = ""
+                        worker = self._replace(worker)
+                    else:
+                        worker.tasks += 1
+                        if worker.tasks >= self.max_tasks_per_worker:
+                            worker = self._replace(worker)
+                    self._give_back(worker)
+                    yield key, text
+
+                now = time.monotonic()
+                for conn, (worker, key, deadline) in list(busy.items()):
+                    if deadline <= now:
+                        logger.error(f"Parsing {key} exceeded {self.timeout}s, killing worker")
+                        del busy[conn]
+                        self._give_back(self._replace(worker, kill=True))
+                        yield key, ""
+        finally:
+            # Workers still holding a task (consumer stopped early) would return stale results
+            for worker, _, _ in busy.values():
+                self._give_back(self._replace(worker, kill=True))
+
+    def parse(self, source: Union[str, bytes], method: str = "extract_text", **kwargs) -> str:
+        """Parse a single document in a worker process."""
+        for _, text in self.imap([(None, source)], method, **kwargs):
+            return text
+        return ""
+
+    def close(self):
+        """Stop the idle workers; workers busy in other threads are stopped when given back and closed again."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._num_workers -= len(idle)
+        for worker in idle:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.process.kill()
+            worker.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+def get_parse_pool() -> Optional[PDFParsePool]:
+    """Return the shared parse pool, or None when PDF_PARSE_WORKERS is 0."""
+    global _parse_pool
+    if PDF_PARSE_WORKERS <= 0:
+        return None
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = PDFParsePool(processes=PDF_PARSE_WORKERS)
+            atexit.register(_parse_pool.close)
+        return _parse_pool
+
+# PRISMA 2020 checklist items
+CHECKLIST_ITEMS = [
+    "title_identifiable", "abstract_structured", "protocol_registered",
+    "eligibility_criteria", "information_sources", "search_strategy_documented",
+    "study_selection_process", "data_collection_process", "data_items_listed",
+    "effect_measures", "synthesis_methods", "study_bias_assessment",
+    "certainty_assessment", "results_study_selection", "results_study_characteristics",
+    "results_synthesis", "results_risk_of_bias", "results_certainty_of_evidence",
+    "limitations_discussed", "funding_reported", "inclusion_criteria_clear",
+    "exclusion_criteria_clear", "quality_assessment_performed", "results_synthesized",
+    "search_date_reported", "databases_searched", "grey_literature_included",
+    "language_restrictions", "publication_restrictions", "data_availability_statement",
+    "conflict_of_interest", "reviewer_agreement", "screening_process_described",
+    "data_extraction_systematic", "study_flow_diagram", "sensitivity_analysis",
+    "subgroup_analysis", "publication_bias_assessed", "certainty_assessment_method",
+    "synthesis_exploration", "additional_analyses"
+]
+_COMPLETE = ("X", "Yes", "✓", r"\[X\]", r"\[✓\]", "Completed", "True")
+_INCOMPLETE = ("No", "Incomplete", "False")
+_ITEM_BY_TITLE = {item.replace("_", " ").title().lower(): item for item in CHECKLIST_ITEMS}
+
+def _trie_pattern(words) -> str:
+    """Regex matching any of words, factored by common prefix so a scan fails after one character."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    def build(node):
+        alternatives = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and "" not in node:
+            return alternatives[0]
+        group = "(?:" + "|".join(alternatives) + ")"
+        # Optional tails are greedy, so longer titles are tried before their prefixes
+        return group + "?" if "" in node else group
+    return build(trie)
+
+# One pass finds every "<Item Title> <status>" mark. No title occurs inside another except
+# as a prefix, which the trie handles, so non-overlapping matches miss no marks.
+_CHECKLIST_MARK = re.compile(
+    r"(?P<title>" + _trie_pattern(_ITEM_BY_TITLE) + r")"
+    r"\s*[:\(\[]*\s*(?:(?P<complete>" + "|".join(_COMPLETE) + r")|(?P<incomplete>" + "|".join(_INCOMPLETE) + r"))",
+    re.IGNORECASE
+)
+# Bump when the parsing rules change so cached results are recomputed
+CHECKLIST_PARSER_VERSION = 2
+# Set CHECKLIST_CACHE_DIR to an empty string to disable the cache
+CHECKLIST_CACHE_DIR = os.getenv("CHECKLIST_CACHE_DIR", os.path.join(".cache", "checklists"))
+
+def parse_checklist_text(text: str) -> Dict:
+    """
+    Score every checklist item from checklist text: 1.0 if it is marked complete anywhere,
+    0.0 if it is only marked incomplete, 0.5 if it is not marked.
+    """
+    complete, incomplete = set(), set()
+    for match in _CHECKLIST_MARK.finditer(text):
+        item = _ITEM_BY_TITLE[match.group("title").lower()]
+        (complete if match.group("complete") is not None else incomplete).add(item)
+    return {item: 1.0 if item in complete else 0.0 if item in incomplete else 0.5 for item in CHECKLIST_ITEMS}
+
+def _checklist_cache_path(content: bytes) -> Optional[str]:
+    if not CHECKLIST_CACHE_DIR:
+        return None
+    digest = hashlib.sha1(content).hexdigest()
+    return os.path.join(CHECKLIST_CACHE_DIR, f"{digest}-v{CHECKLIST_PARSER_VERSION}.json")
+
 def parse_checklist_pdf(pdf_path: str) -> Dict:
     """
-    Parse a PRISMA checklist PDF and extract checklist items.
+    Parse a PRISMA checklist PDF and extract checklist items. Results are cached under
+    CHECKLIST_CACHE_DIR by the SHA-1 of the PDF, so unchanged checklists are not re-parsed.
     Args:
         pdf_path: Path to the checklist PDF
     Returns:
@@ -121,47 +539,37 @@ def parse_checklist_pdf(pdf_path: str) -> Dict:
             logger.error(f"Checklist PDF not found: {pdf_path}")
             return {}
 
-        text = extract_text_from_pdf(pdf_path)
+        with open(pdf_path, "rb") as f:
+            content = f.read()
+        cache_path = _checklist_cache_path(content)
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checklist cache {cache_path}: {e}")
+
+        text = extract_text_from_pdf(content)
         if not text or len(text.split()) < 50:
             logger.warning(f"Insufficient text extracted from {pdf_path}, trying fallback parser")
-            text = extract_text_with_fallback(pdf_path)
-        
+            text = extract_text_with_fallback(content)
+
         if not text:
             logger.error(f"No text extracted from checklist PDF: {pdf_path}")
             return {}
 
-        # PRISMA 2020 checklist items
-        checklist_items = [
-            "title_identifiable", "abstract_structured", "protocol_registered",
-            "eligibility_criteria", "information_sources", "search_strategy_documented",
-            "study_selection_process", "data_collection_process", "data_items_listed",
-            "effect_measures", "synthesis_methods", "study_bias_assessment",
-            "certainty_assessment", "results_study_selection", "results_study_characteristics",
-            "results_synthesis", "results_risk_of_bias", "results_certainty_of_evidence",
-            "limitations_discussed", "funding_reported", "inclusion_criteria_clear",
-            "exclusion_criteria_clear", "quality_assessment_performed", "results_synthesized",
-            "search_date_reported", "databases_searched", "grey_literature_included",
-            "language_restrictions", "publication_restrictions", "data_availability_statement",
-            "conflict_of_interest", "reviewer_agreement", "screening_process_described",
-            "data_extraction_systematic", "study_flow_diagram", "sensitivity_analysis",
-            "subgroup_analysis", "publication_bias_assessed", "certainty_assessment_method",
-            "synthesis_exploration", "additional_analyses"
-        ]
-
-        checklist_data = {item: 0.0 for item in checklist_items}
-        # Enhanced regex for detecting completed items
-        for item in checklist_items:
-            # Match item name followed by 'X', 'Yes', '✓', or explicit completion indicators
-            pattern = rf"{item.replace('_', ' ').title()}\s*[:\(\[]*\s*(X|Yes|✓|\[X\]|\[✓\]|Completed|True)"
-            if re.search(pattern, text, re.IGNORECASE):
-                checklist_data[item] = 1.0
-            elif re.search(rf"{item.replace('_', ' ').title()}\s*[:\(\[]*\s*(No|Incomplete|False)", text, re.IGNORECASE):
-                checklist_data[item] = 0.0
-            else:
-                checklist_data[item] = 0.5  # Default for unclear status
-
+        checklist_data = parse_checklist_text(text)
         logger.info(f"Successfully parsed checklist from {pdf_path} with {sum(1 for v in checklist_data.values() if v == 1.0)} items marked complete")
+        if cache_path:
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(checklist_data, f)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logger.warning(f"Could not cache parsed checklist to {cache_path}: {e}")
         return checklist_data
     except Exception as e:
         logger.error(f"Failed to parse checklist PDF {pdf_path}: {e}")
-        return {}
\ No newline at end of file
+        return {}
@@ -0,0 +1,125 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from utils.logger import get_logger
+
+logger = get_logger("jobs")
+
+# Finished jobs kept for polling before the oldest are forgotten
+MAX_FINISHED_JOBS = 200
+
+
+class Job:
+    """
+    State of a background job. The worker thread reports progress and result rows through
+    update() and add_row(); readers take a consistent copy with snapshot().
+    """
+    def __init__(self, kind: str, description: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.description = description
+        self.status = "queued"  # queued -> running -> done | failed
+        self.progress = 0
+        self.total = None
+        self.message = ""
+        self.rows: List[Dict] = []
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def update(self, progress: Optional[int] = None, total: Optional[int] = None, message: Optional[str] = None):
+        with self._lock:
+            if progress is not None:
+                self.progress = progress
+            if total is not None:
+                self.total = total
+            if message is not None:
+                self.message = message
+
+    def add_row(self, row: Dict):
+        """Append a partial result row and count it as progress."""
+        with self._lock:
+            self.rows.append(row)
+            self.progress += 1
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished or time.time()
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "description": self.description,
+                "status": self.status,
+                "progress": self.progress,
+                "total": self.total,
+                "message": self.message,
+                "rows": list(self.rows),
+                "result": self.result,
+                "error": self.error,
+                "created": self.created,
+                "elapsed": end - (self.started or end),
+            }
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool so long reviews and training runs do not block the
+    caller. Jobs are functions taking the Job as their first argument; their return value
+    becomes job.result and an exception marks the job failed.
+    """
+    def __init__(self, max_workers: int = 4, name: str = "jobs"):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, description: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        job = Job(kind, description)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        logger.info(f"Queued {kind} job {job.id}: {description}")
+        return job
+
+    def _run(self, job: Job, fn, args, kwargs):
+        job.status, job.started = "running", time.time()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = "done"
+            logger.info(f"{job.kind} job {job.id} finished in {time.time() - job.started:.1f}s")
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            logger.error(f"{job.kind} job {job.id} failed: {e}")
+        finally:
+            job.finished = time.time()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, job_ids: Optional[Iterable[str]] = None) -> List[Job]:
+        """Jobs with the given ids (all jobs if None), oldest first; unknown ids are skipped."""
+        with self._lock:
+            if job_ids is None:
+                return list(self._jobs.values())
+            return [self._jobs[job_id] for job_id in job_ids if job_id in self._jobs]
+
+    def active(self, kind: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.active and (kind is None or job.kind == kind)]
@@ -0,0 +1,270 @@
+import os
+import re
+import json
+import sqlite3
+import argparse
+import threading
+import numpy as np
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+from utils.arxiv_interface import result_from_dict
+from utils.logger import get_logger
+
+logger = get_logger("local_corpus")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their this to "
+    "was we were which with our can these using based via".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def _parse_record(record: Dict) -> Optional[Dict]:
+    """Map one line of the arXiv metadata dump (Kaggle/OAI JSON format) to result_to_dict's shape."""
+    arxiv_id = record.get("id")
+    if not arxiv_id:
+        return None
+    versions = record.get("versions") or []
+    published = updated = None
+    try:
+        if versions:
+            published = parsedate_to_datetime(versions[0]["created"])
+            updated = parsedate_to_datetime(versions[-1]["created"])
+    except (KeyError, TypeError, ValueError):
+        published = None
+    if published is None:
+        try:
+            published = updated = datetime.strptime(record.get("update_date", ""), "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+    version = versions[-1].get("version", "") if versions else ""
+    if record.get("authors_parsed"):
+        authors = [" ".join(p for p in (parts[1], parts[0]) if p).strip() for parts in record["authors_parsed"]]
+    else:
+        authors = [a.strip() for a in re.split(r",| and ", record.get("authors", "")) if a.strip()]
+    categories = (record.get("categories") or "").split()
+    entry_id = f"http://arxiv.org/abs/{arxiv_id}{version}"
+    return {
+        "entry_id": entry_id,
+        "updated": updated.isoformat(),
+        "published": published.isoformat(),
+        "title": " ".join((record.get("title") or "").split()),
+        "authors": authors,
+        "summary": " ".join((record.get("abstract") or "").split()),
+        "comment": record.get("comments") or "",
+        "journal_ref": record.get("journal-ref") or "",
+        "doi": record.get("doi") or "",
+        "primary_category": categories[0] if categories else "",
+        "categories": categories,
+        "links": [
+            {"href": entry_id, "title": None, "rel": "alternate", "content_type": None},
+            {"href": entry_id.replace("/abs/", "/pdf/"), "title": "pdf", "rel": "related", "content_type": None}
+        ]
+    }
+
+
+def ingest(jsonl_path: str, corpus_dir: str, limit: Optional[int] = None) -> "LocalCorpus":
+    """
+    Build a local corpus from an arXiv metadata dump.
+    Args:
+        jsonl_path: JSON-lines dump (one paper per line, e.g. arxiv-metadata-oai-snapshot.json)
+        corpus_dir: Output directory
+        limit: Stop after this many papers
+    Returns:
+        The opened LocalCorpus
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    db_path = os.path.join(corpus_dir, "papers.sqlite")
+    if os.path.exists(db_path):
+        os.unlink(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE papers (doc_id INTEGER PRIMARY KEY, data TEXT)")
+
+    vocab = {}
+    category_vocab = {}
+    post_terms, post_docs, post_tfs = array("i"), array("i"), array("H")
+    cat_ids, cat_docs = array("i"), array("i")
+    years, doc_lens = array("h"), array("i")
+    rows = []
+    num_docs = 0
+
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if limit is not None and num_docs >= limit:
+                break
+            try:
+                paper = _parse_record(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+            if paper is None:
+                continue
+            doc_id = num_docs
+            counts = Counter(tokenize(f"{paper['title']} {paper['summary']}"))
+            for term, tf in counts.items():
+                post_terms.append(vocab.setdefault(term, len(vocab)))
+                post_docs.append(doc_id)
+                post_tfs.append(min(tf, 65535))
+            for category in paper["categories"]:
+                cat_ids.append(category_vocab.setdefault(category, len(category_vocab)))
+                cat_docs.append(doc_id)
+            years.append(datetime.fromisoformat(paper["published"]).year)
+            doc_lens.append(sum(counts.values()))
+            rows.append((doc_id, json.dumps(paper)))
+            num_docs += 1
+            if len(rows) >= 10000:
+                conn.executemany("INSERT INTO papers VALUES (?, ?)", rows)
+                rows = []
+    if rows:
+        conn.executemany("INSERT INTO papers VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+    def save_csr(name: str, keys: array, docs: array, num_keys: int, values: Optional[array] = None):
+        keys = np.frombuffer(keys, dtype=np.int32)
+        order = np.argsort(keys, kind="stable")
+        np.save(os.path.join(corpus_dir, f"{name}_docs.npy"), np.frombuffer(docs, dtype=np.int32)[order])
+        if values is not None:
+            np.save(os.path.join(corpus_dir, f"{name}_tfs.npy"), np.frombuffer(values, dtype=np.uint16)[order])
+        offsets = np.zeros(num_keys + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=num_keys), out=offsets[1:])
+        np.save(os.path.join(corpus_dir, f"{name}_offsets.npy"), offsets)
+
+    save_csr("postings", post_terms, post_docs, len(vocab), post_tfs)
+    save_csr("categories", cat_ids, cat_docs, len(category_vocab))
+    np.save(os.path.join(corpus_dir, "years.npy"), np.frombuffer(years, dtype=np.int16))
+    np.save(os.path.join(corpus_dir, "doc_lens.npy"), np.frombuffer(doc_lens, dtype=np.int32))
+    with open(os.path.join(corpus_dir, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump({"terms": vocab, "categories": category_vocab}, f)
+    logger.info(f"Ingested {num_docs} papers with {len(vocab)} terms into {corpus_dir}")
+    return LocalCorpus(corpus_dir)
+
+
+class LocalCorpus:
+    """
+    Offline arXiv search over a corpus built by ingest(). Postings are memory-mapped CSR
+    arrays and ranking is Okapi BM25, so queries need no network and run in milliseconds.
+    Results are arxiv.Result objects, like search_arxiv's.
+    """
+    def __init__(self, corpus_dir: str, k1: float = 1.5, b: float = 0.75):
+        self.corpus_dir = corpus_dir
+        self.k1 = k1
+        self.b = b
+        load = lambda name: np.load(os.path.join(corpus_dir, f"{name}.npy"), mmap_mode="r")
+        self.postings_offsets = load("postings_offsets")
+        self.postings_docs = load("postings_docs")
+        self.postings_tfs = load("postings_tfs")
+        self.categories_offsets = load("categories_offsets")
+        self.categories_docs = load("categories_docs")
+        self.years = np.asarray(load("years"))
+        self.doc_lens = np.asarray(load("doc_lens"), dtype=np.float32)
+        with open(os.path.join(corpus_dir, "vocab.json"), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        self.vocab = vocab["terms"]
+        self.category_vocab = vocab["categories"]
+        self.num_docs = len(self.years)
+        self.avg_doc_len = float(self.doc_lens.mean()) if self.num_docs else 0.0
+        self._conn = sqlite3.connect(os.path.join(corpus_dir, "papers.sqlite"), check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.num_docs
+
+    def filter_mask(self, from_year: Optional[int] = None, to_year: Optional[int] = None,
+                    categories: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Boolean mask over documents matching the year range and any of the categories."""
+        mask = np.ones(self.num_docs, dtype=bool)
+        if from_year is not None:
+            mask &= self.years >= from_year
+        if to_year is not None:
+            mask &= self.years <= to_year
+        if categories:
+            in_category = np.zeros(self.num_docs, dtype=bool)
+            for category in categories:
+                cat_id = self.category_vocab.get(category)
+                if cat_id is not None:
+                    start, end = self.categories_offsets[cat_id], self.categories_offsets[cat_id + 1]
+                    in_category[self.categories_docs[start:end]] = True
+            mask &= in_category
+        return mask
+
+    def bm25_scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query (zero for documents sharing no term)."""
+        docs, contributions = [], []
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.postings_offsets[term_id], self.postings_offsets[term_id + 1]
+            term_docs = np.asarray(self.postings_docs[start:end])
+            tfs = np.asarray(self.postings_tfs[start:end], dtype=np.float32)
+            df = end - start
+            idf = np.log(1.0 + (self.num_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_lens[term_docs] / self.avg_doc_len)
+            docs.append(term_docs)
+            contributions.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+        if not docs:
+            return np.zeros(self.num_docs, dtype=np.float32)
+        return np.bincount(np.concatenate(docs), weights=np.concatenate(contributions),
+                           minlength=self.num_docs).astype(np.float32)
+
+    def get_papers(self, doc_ids: Iterable[int]) -> List:
+        doc_ids = [int(d) for d in doc_ids]
+        if not doc_ids:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc_id, data FROM papers WHERE doc_id IN ({','.join('?' * len(doc_ids))})", doc_ids
+            ).fetchall()
+        by_id = {doc_id: data for doc_id, data in rows}
+        return [result_from_dict(json.loads(by_id[d])) for d in doc_ids if d in by_id]
+
+    def search(self, query: str, from_year: Optional[int] = None, to_year: Optional[int] = None,
+               max_results: int = 10, categories: Optional[Sequence[str]] = None) -> List:
+        """
+        Rank papers for a query.
+        Args:
+            query: Free-text query
+            from_year: Earliest publication year (inclusive)
+            to_year: Latest publication year (inclusive)
+            max_results: Number of papers to return
+            categories: Keep only papers in any of these arXiv categories (e.g. ['cs.LG'])
+        Returns:
+            Up to max_results arxiv.Result objects, best first
+        """
+        scores = self.bm25_scores(query)
+        scores[~self.filter_mask(from_year, to_year, categories)] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > max_results:
+            candidates = candidates[np.argpartition(-scores[candidates], max_results - 1)[:max_results]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return self.get_papers(candidates)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query an offline arXiv corpus")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subparsers.add_parser("ingest", help="Ingest an arXiv metadata dump (JSON lines)")
+    ingest_parser.add_argument("dump")
+    ingest_parser.add_argument("corpus_dir")
+    ingest_parser.add_argument("--limit", type=int, default=None)
+    search_parser = subparsers.add_parser("search", help="Query a corpus")
+    search_parser.add_argument("corpus_dir")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--from-year", type=int, default=None)
+    search_parser.add_argument("--to-year", type=int, default=None)
+    search_parser.add_argument("--max-results", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        ingest(args.dump, args.corpus_dir, args.limit)
+    else:
+        corpus = LocalCorpus(args.corpus_dir)
+        for paper in corpus.search(args.query, args.from_year, args.to_year, args.max_results):
+            print(f"{paper.published.year}  {paper.get_short_id()}  {paper.title}")
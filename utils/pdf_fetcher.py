@@ -0,0 +1,177 @@
+import os
+import time
+import queue
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.logger import get_logger
+
+logger = get_logger("pdf_fetcher")
+
+PDF_MAX_CONCURRENCY = int(os.getenv("PDF_MAX_CONCURRENCY", "4"))
+# Minimum spacing between request starts across all threads, to stay polite to arXiv
+PDF_MIN_INTERVAL = float(os.getenv("PDF_MIN_INTERVAL", "0.5"))
+PDF_TIMEOUT = float(os.getenv("PDF_TIMEOUT", "10"))
+PDF_RETRIES = int(os.getenv("PDF_RETRIES", "3"))
+
+
+class RateLimiter:
+    """Spaces out calls to wait() so that consecutive calls are at least min_interval seconds apart."""
+    def __init__(self, min_interval: float = PDF_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+_session = None
+_session_lock = threading.Lock()
+_rate_limiter = RateLimiter()
+
+
+def get_session() -> requests.Session:
+    """
+    Return the shared HTTP session. Connections are pooled and reused across calls, and
+    429/5xx responses are retried with exponential backoff (honouring Retry-After).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=PDF_RETRIES,
+                backoff_factor=1.0,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+                respect_retry_after_header=True
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(PDF_MAX_CONCURRENCY, 10), max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def pdf_url(identifier: str) -> str:
+    """Map an arXiv abstract URL (e.g. 'http://arxiv.org/abs/2503.07152v1') to its PDF URL."""
+    if not identifier.endswith(".pdf"):
+        identifier = identifier.replace("abs", "pdf") + ".pdf"
+    return identifier
+
+
+def fetch_pdf(identifier: str, session: Optional[requests.Session] = None,
+              timeout: float = PDF_TIMEOUT) -> bytes:
+    """
+    Download one PDF through the shared session.
+    Args:
+        identifier: arXiv abstract or PDF URL
+        session: Session to use (defaults to the shared pooled session)
+        timeout: Per-request timeout in seconds
+    Returns:
+        Raw PDF bytes
+    Raises:
+        requests.RequestException if the download fails after retries
+    """
+    session = session or get_session()
+    _rate_limiter.wait()
+    response = session.get(pdf_url(identifier), timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+_END = object()
+
+
+def imap_unordered(fn: Callable[[Any], Any], items: Iterable, max_concurrency: int,
+                   unique: bool = False) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Apply fn to items on a thread pool. Items are pulled lazily by a feeder thread, so they
+    may come from a queue that is still being filled; finished calls are yielded right away,
+    even while the feeder waits for the next item.
+    Args:
+        fn: Function of one item
+        items: Items, consumed lazily
+        max_concurrency: Number of calls running at a time
+        unique: Skip items that were already seen
+    Yields:
+        (item, result, error) in completion order; error is the exception fn raised, or None
+    """
+    results = queue.Queue()
+    slots = threading.BoundedSemaphore(max(1, max_concurrency))
+    stop = threading.Event()
+
+    def run(item):
+        try:
+            results.put((item, fn(item), None))
+        except Exception as e:
+            results.put((item, None, e))
+        finally:
+            slots.release()
+
+    def feed(executor):
+        submitted = 0
+        seen = set()
+        try:
+            for item in items:
+                if unique:
+                    if item in seen:
+                        continue
+                    seen.add(item)
+                slots.acquire()
+                if stop.is_set():
+                    slots.release()
+                    break
+                executor.submit(run, item)
+                submitted += 1
+        except Exception as e:
+            results.put((_END, submitted, e))
+        else:
+            results.put((_END, submitted, None))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        threading.Thread(target=feed, args=(executor,), name="imap-feeder", daemon=True).start()
+        try:
+            finished, submitted, feed_error = 0, None, None
+            while submitted is None or finished < submitted:
+                item, result, error = results.get()
+                if item is _END:
+                    submitted, feed_error = result, error
+                    continue
+                finished += 1
+                yield item, result, error
+            if feed_error is not None:
+                raise feed_error
+        finally:
+            stop.set()
+
+
+def fetch_pdfs(identifiers: Iterable[str], max_concurrency: int = PDF_MAX_CONCURRENCY,
+               session: Optional[requests.Session] = None,
+               timeout: float = PDF_TIMEOUT) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """
+    Download many PDFs concurrently.
+    Args:
+        identifiers: arXiv abstract or PDF URLs, consumed lazily (see imap_unordered)
+        max_concurrency: Number of downloads in flight
+        session: Session to use (defaults to the shared pooled session)
+        timeout: Per-request timeout in seconds
+    Yields:
+        (identifier, pdf bytes) in completion order; bytes are None if the download failed
+    """
+    session = session or get_session()
+    downloads = imap_unordered(lambda identifier: fetch_pdf(identifier, session, timeout),
+                               identifiers, max_concurrency, unique=True)
+    for identifier, content, error in downloads:
+        if error is not None:
+            logger.error(f"Failed to download PDF {identifier}: {error}")
+        yield identifier, content
@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List, Optional
+from utils.logger import get_logger
+
+logger = get_logger("search_cache")
+
+# Set ARXIV_CACHE_PATH to an empty string to disable the cache
+ARXIV_CACHE_PATH = os.getenv("ARXIV_CACHE_PATH", os.path.join(".cache", "arxiv_search.sqlite"))
+ARXIV_CACHE_TTL_HOURS = float(os.getenv("ARXIV_CACHE_TTL_HOURS", "24"))
+
+
+class SearchCache:
+    """
+    SQLite store of search request -> result metadata. Entries older than the TTL are
+    treated as misses and overwritten on the next put; get_search_cache() deletes the
+    remaining expired entries when it opens the cache, so the file does not keep growing.
+    """
+    def __init__(self, db_path: str, ttl_seconds: float = ARXIV_CACHE_TTL_HOURS * 3600):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, created REAL, results TEXT)"
+            )
+
+    @staticmethod
+    def make_key(**params) -> str:
+        return hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            row = self._conn.execute("SELECT created, results FROM searches WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[0] > self.ttl_seconds:
+            return None
+        return json.loads(row[1])
+
+    def put(self, key: str, results: List[Dict]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (key, created, results) VALUES (?, ?, ?)",
+                (key, time.time(), json.dumps(results))
+            )
+
+    def purge_expired(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM searches WHERE created < ?", (time.time() - self.ttl_seconds,))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Return the process-wide search cache, or None if it is disabled or unavailable."""
+    global _cache
+    if not ARXIV_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                cache = SearchCache(ARXIV_CACHE_PATH)
+                cache.purge_expired()
+                _cache = cache
+            except sqlite3.Error as e:
+                logger.error(f"Failed to open search cache {ARXIV_CACHE_PATH}: {e}")
+                return None
+        return _cache
@@ -1,6 +1,4 @@
-from sentence_transformers import SentenceTransformer
-
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from utils.embedding_service import get_embedding_service
 
 def embed_text(text):
-    return model.encode(text, convert_to_numpy=True)
\ No newline at end of file
+    return get_embedding_service().embed_text(text)